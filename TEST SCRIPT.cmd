@@ -11,6 +11,36 @@ python pokedex.py --inputfile input_pokemon.txt --output output.txt pokemon
 
 ECHO write to file expanded
 python pokedex.py --inputfile input_pokemon.txt --output output_pokemon_expand.txt pokemon --expanded
+python pokedex.py --inputdata 1-151 --output output_kanto.txt pokemon
+python pokedex.py --all --format csv --output output_moves.csv move
+
+ECHO async engine
+python pokedex.py --inputfile input_pokemon.txt --engine async --max-in-flight 16 pokemon --expanded
+python pokedex.py --inputfile input_pokemon.txt --concurrency fixed --max-in-flight 8 pokemon --expanded
+
+ECHO cached, second run is served from disk
+python pokedex.py --inputfile input_pokemon.txt --cache-dir .pokecache pokemon
+python pokedex.py --inputfile input_pokemon.txt --cache-dir .pokecache --offline pokemon
+
+ECHO offline snapshot
+python pokedex.py --snapshot pokeapi.sqlite snapshot
+python pokedex.py --inputfile input_pokemon.txt --snapshot pokeapi.sqlite --offline pokemon --expanded
+python pokedex.py --inputfile input_pokemon.txt --snapshot pokeapi.sqlite --offline --parallel process pokemon --expanded
+python pokedex.py --inputfile input_pokemon.txt --stats --metrics-file metrics.json pokemon --expanded
+python pokedex.py --inputfile input_pokemon.txt --index-file index.json pokemon
+python pokedex.py --inputdata move:thunderbolt --index-file index.json --max-level 30 query
+python pokedex.py --inputfile input_pokemon.txt --where "speed>=90" --sort speed:desc --top 10 --aggregate mean,max analytics
+
+ECHO resources
+python pokedex.py --inputdata fire,water type
+python pokedex.py --inputdata eevee --expanded species
+python pokedex.py --inputdata 1 evolution-chain
+python pokedex.py --inputdata pikachu,type:electric,species:pikachu,stat:speed --format csv pokemon
+
+ECHO server
+start python pokedex.py --listen 127.0.0.1:8787 serve
+python pokedexclient.py --url http://127.0.0.1:8787 --expanded pokemon pikachu
 
 ECHO error
-python pokedex.py --inputfile input_error.txt --output output_error.txt move
\ No newline at end of file
+python pokedex.py --inputfile input_error.txt --output output_error.txt move
+python pokedex.py --inputfile input_error.txt --output output_error.txt --keep-going move
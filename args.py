@@ -3,6 +3,8 @@ Module containing the classes relating to arguments in a console command for pok
 """
 import argparse
 
+from pokeretriever.resources import ResourceRegistry
+
 
 class ArgumentParser:
     """
@@ -18,26 +20,187 @@ class ArgumentParser:
         """
         parser = argparse.ArgumentParser()
 
-        parser_mutually_exclusive_group_input = parser.add_mutually_exclusive_group(required=True)
+        parser_mutually_exclusive_group_input = parser.add_mutually_exclusive_group()
 
         parser_mutually_exclusive_group_input.add_argument('--inputfile', type=str, dest='input_file',
-                                                           help="Path of the input file.")
+                                                           help="Path of the input file, or '-' to read from stdin.")
 
         parser_mutually_exclusive_group_input.add_argument('--inputdata', type=str, dest='input_data',
                                                            help="Request data inputted through command line if an "
-                                                                "input file is not used.")
+                                                                "input file is not used. Several names / ids are "
+                                                                "separated by commas, and ranges of ids such as "
+                                                                "'1-151' are expanded.")
+
+        parser_mutually_exclusive_group_input.add_argument('--all', action='store_true', dest='all_entries',
+                                                           help="Request every entry of the mode, listed from the "
+                                                                "api's paginated list endpoint, or from the "
+                                                                "--snapshot if it has them.")
 
         parser.add_argument('--expanded', action='store_true', help='(Optional) Shows additional information'
-                                                                    ' of certain attributes ')
+                                                                    ' of certain attributes: the stats, abilities'
+                                                                    ' and moves of a pokemon, the evolution chain'
+                                                                    ' of a species')
 
         parser.add_argument('--output', type=str, dest='output_file', help='Path of the output')
 
+        parser.add_argument('--format', type=str, dest='output_format', choices=['text', 'jsonl', 'csv', 'msgpack'],
+                            default='text',
+                            help="(Optional) Format of the report: the human readable 'text', json lines, csv with "
+                                 "flattened stat/ability/move rows, or msgpack (requires the msgpack package). "
+                                 "Defaults to 'text'.")
+
+        parser.add_argument('--cache-dir', type=str, dest='cache_dir',
+                            help='(Optional) Directory to cache api responses in between runs.')
+
+        parser.add_argument('--cache-ttl', type=float, dest='cache_ttl', default=7 * 24 * 60 * 60,
+                            help='(Optional) Seconds a cached response stays fresh, 0 to never expire. '
+                                 'Defaults to one week.')
+
+        parser.add_argument('--cache-max-bytes', type=int, dest='cache_max_bytes', default=256 * 1024 * 1024,
+                            help='(Optional) Max size of the cache in bytes, least recently used entries '
+                                 'are evicted past it. Defaults to 256 MiB.')
+
+        parser.add_argument('--offline', action='store_true',
+                            help='(Optional) Only serve responses from the cache, never call the api.')
+
+        parser.add_argument('--snapshot', type=str, dest='snapshot_file',
+                            help="(Optional) Path of a SQLite snapshot of the api. In 'snapshot' mode it is "
+                                 "crawled into, in every other mode responses are served from it.")
+
+        parser.add_argument('--engine', type=str, dest='engine', choices=['thread', 'async'], default='thread',
+                            help="(Optional) Retrieval engine, a thread pool or a single asyncio event loop. "
+                                 "Defaults to 'thread'.")
+
+        parser.add_argument('--max-in-flight', type=int, dest='max_in_flight', default=32,
+                            help='(Optional) Max number of http requests in flight at once, across every request. '
+                                 'Defaults to 32.')
+
+        parser.add_argument('--concurrency', type=str, dest='concurrency', choices=['adaptive', 'fixed'],
+                            default='fixed',
+                            help="(Optional) Only with the thread engine, 'adaptive' tunes the number of http requests "
+                                 "in flight, up to --max-in-flight, from their latency and 429 / 5xx responses. "
+                                 "'fixed' always allows --max-in-flight. Defaults to 'fixed'.")
+
+        parser.add_argument('--base-url', type=str, dest='base_url',
+                            help='(Optional) Url of the api to request, such as a mirror or a local stub. '
+                                 'Defaults to https://pokeapi.co/api/v2/.')
+
+        parser.add_argument('--timeout', type=float, dest='timeout', default=10,
+                            help='(Optional) Seconds to wait for the api before a request is retried. Defaults to 10.')
+
+        parser.add_argument('--retries', type=int, dest='retries', default=3,
+                            help='(Optional) Max number of retries, with exponential backoff, of a request that '
+                                 'timed out or got a 429 / 5xx response. Defaults to 3.')
+
+        parser.add_argument('--rate-limit', type=float, dest='rate_limit',
+                            help='(Optional) Max number of requests per second sent to the api.')
+
+        parser.add_argument('--keep-going', action='store_true', dest='keep_going',
+                            help='(Optional) Keep processing when a request fails, write every successful result, '
+                                 'and print a summary of the failures at the end.')
+
+        parser.add_argument('--journal', type=str, dest='journal_file',
+                            help='(Optional) Path of a checkpoint file recording every completed result as the '
+                                 'batch progresses.')
+
+        parser.add_argument('--resume', action='store_true',
+                            help='(Optional) Resume the batch recorded in --journal: finished results are replayed '
+                                 'from the journal and only the remaining identifiers are requested.')
+
+        parser.add_argument('--order', type=str, dest='order', choices=['input', 'completion'], default='input',
+                            help="(Optional) Write results in input order, or as soon as each one completes. "
+                                 "Defaults to 'input'.")
+
+        parser.add_argument('--parallel', type=str, dest='parallel', choices=['thread', 'process'], default='thread',
+                            help="(Optional) Parse and render results on the thread pool, or in a pool of worker "
+                                 "processes that stream back rendered output. Defaults to 'thread'.")
+
+        parser.add_argument('--workers', type=int, dest='workers',
+                            help='(Optional) Number of requests processed at once by the thread engine, defaults to '
+                                 '--max-in-flight. Number of worker processes with --parallel process, defaults '
+                                 'to the number of cpus.')
+
+        parser.add_argument('--stats', action='store_true',
+                            help='(Optional) Print the time spent in each stage, counters and queue depths to stderr '
+                                 'at the end.')
+
+        parser.add_argument('--metrics-file', type=str, dest='metrics_file',
+                            help='(Optional) Path of a json file to write the stage timings, counters and queue '
+                                 'depths to at the end.')
+
+        parser.add_argument('--index-file', type=str, dest='index_file',
+                            help='(Optional) Path of a reverse index of moves, abilities and types to pokemon. Every '
+                                 'pokemon and ability fetched is added to it, and query mode answers from it.')
+
+        parser.add_argument('--max-level', type=int, dest='max_level',
+                            help='(Optional) In query mode, only list pokemon that learn the move by leveling up '
+                                 'by this level.')
+
+        parser.add_argument('--where', type=str, dest='where', action='append', default=[],
+                            help="(Optional) In analytics mode, only keep pokemon whose stat meets a condition, like "
+                                 "'speed>=100' or 'total<400'. Can be repeated, every condition must hold.")
+
+        parser.add_argument('--sort', type=str, dest='sort',
+                            help="(Optional) In analytics mode, order pokemon by a stat or 'total', like 'speed', or "
+                                 "'speed:desc' for highest first.")
+
+        parser.add_argument('--top', type=int, dest='top',
+                            help='(Optional) In analytics mode, only list the first N pokemon.')
+
+        parser.add_argument('--aggregate', type=str, dest='aggregate',
+                            help="(Optional) In analytics mode, comma separated aggregates of every stat over the "
+                                 "pokemon listed: count, sum, mean, min, max, median, std.")
+
+        parser.add_argument('--listen', type=str, dest='listen', default='127.0.0.1:8787',
+                            help="(Optional) In serve mode, host:port to serve lookups on. Defaults to "
+                                 "'127.0.0.1:8787'.")
+
+        parser.add_argument('--socket', type=str, dest='socket_path',
+                            help='(Optional) In serve mode, path of a unix socket to serve lookups on instead of '
+                                 '--listen.')
+
+        parser.add_argument('--lru-size', type=int, dest='lru_size', default=4096,
+                            help='(Optional) In serve mode, max number of looked up entries kept in memory. '
+                                 'Defaults to 4096.')
+
+        resource_modes = ResourceRegistry.modes()
         parser.add_argument('mode', type=str,
-                            choices=["pokemon", "ability", "move"],
+                            choices=list(resource_modes) + ["snapshot", "query", "analytics", "serve"],
                             help="The mode of the program. Program can provide information about a pokemon for these "
-                                 "options: 'pokemon', 'ability', or 'move')")
+                                 f"options: {', '.join(map(repr, resource_modes))}. An input prefixed with one of "
+                                 "them, like 'type:fire', requests that resource instead. 'snapshot' crawls every "
+                                 "entry of each of them into the --snapshot file. 'query' lists the pokemon of "
+                                 "each 'move:NAME', 'ability:NAME' or 'type:NAME' input from the --index-file. "
+                                 "'analytics' filters, sorts and aggregates the base stats of the input pokemon. "
+                                 "'serve' answers lookups from pokedexclient.py until interrupted.")
 
         kwarg = vars(parser.parse_args())
+        if kwarg['mode'] == 'snapshot':
+            if kwarg['snapshot_file'] is None:
+                parser.error("'snapshot' mode requires --snapshot")
+        elif kwarg['mode'] != 'serve' and kwarg['input_file'] is None and kwarg['input_data'] is None \
+                and not kwarg['all_entries']:
+            parser.error('one of the arguments --inputfile --inputdata --all is required')
+        if kwarg['all_entries'] and kwarg['mode'] in ('query', 'serve', 'snapshot'):
+            parser.error(f"'{kwarg['mode']}' mode cannot be combined with --all")
+        if kwarg['all_entries'] and kwarg['offline'] and kwarg['snapshot_file'] is None:
+            parser.error('--all with --offline requires --snapshot')
+        if kwarg['resume'] and kwarg['journal_file'] is None:
+            parser.error('--resume requires --journal')
+        if kwarg['offline'] and kwarg['cache_dir'] is None and kwarg['snapshot_file'] is None:
+            parser.error('--offline requires --cache-dir or --snapshot')
+        if kwarg['parallel'] == 'process' and kwarg['journal_file'] is not None:
+            parser.error('--parallel process cannot be combined with --journal')
+        if kwarg['parallel'] == 'process' and kwarg['index_file'] is not None:
+            parser.error('--parallel process cannot be combined with --index-file')
+        if kwarg['concurrency'] == 'adaptive' and kwarg['engine'] == 'async':
+            parser.error('--concurrency adaptive requires the thread engine')
+        if kwarg['mode'] == 'query' and kwarg['index_file'] is None:
+            parser.error("'query' mode requires --index-file")
+        if kwarg['mode'] == 'analytics' and kwarg['output_format'] == 'msgpack':
+            parser.error("'analytics' mode writes text, csv or jsonl")
+        if kwarg['mode'] == 'analytics' and kwarg['parallel'] == 'process':
+            parser.error("'analytics' mode cannot be combined with --parallel process")
         return Args(**kwarg)
 
 
@@ -46,8 +209,16 @@ class Args:
     Arguments has the values needed to make a request to get pokemon data.
     """
 
-    def __init__(self, mode: str, input_data: str, expanded: bool,
-                 input_file: str = None, output_file: str = None):
+    def __init__(self, mode: str, input_data: str = None, expanded: bool = False,
+                 input_file: str = None, output_file: str = None, output_format: str = 'text', cache_dir: str = None,
+                 cache_ttl: float = None, cache_max_bytes: int = None, offline: bool = False, snapshot_file: str = None,
+                 engine: str = 'thread', max_in_flight: int = 32, timeout: float = 10, retries: int = 3,
+                 rate_limit: float = None, keep_going: bool = False, journal_file: str = None,
+                 resume: bool = False, order: str = 'input', parallel: str = 'thread', workers: int = None,
+                 base_url: str = None, stats: bool = False, metrics_file: str = None, index_file: str = None,
+                 max_level: int = None, where: list = None, sort: str = None, top: int = None,
+                 aggregate: str = None, listen: str = '127.0.0.1:8787', socket_path: str = None,
+                 lru_size: int = 4096, concurrency: str = 'fixed', all_entries: bool = False):
         """
         Constructor.
 
@@ -56,12 +227,74 @@ class Args:
         :param expanded: bool, extra information
         :param input_file: str, path of input file
         :param output_file: str, data of the output file
+        :param output_format: str, format of the report
+        :param cache_dir: str, directory to cache api responses in
+        :param cache_ttl: float, seconds a cached response stays fresh
+        :param cache_max_bytes: int, max size of the cache in bytes
+        :param offline: bool, only serve responses from the cache
+        :param snapshot_file: str, path of a SQLite snapshot of the api
+        :param engine: str, 'thread' or 'async' retrieval engine
+        :param max_in_flight: int, max number of http requests in flight at once
+        :param timeout: float, seconds to wait for the api before a request is retried
+        :param retries: int, max number of retries of a request
+        :param rate_limit: float, max number of requests per second
+        :param keep_going: bool, keep processing when a request fails
+        :param journal_file: str, path of the checkpoint journal
+        :param resume: bool, resume the batch recorded in the journal
+        :param order: str, 'input' or 'completion' order of the results
+        :param parallel: str, 'thread' or 'process' pool to parse and render on
+        :param workers: int, number of threads or worker processes
+        :param base_url: str, url of the api
+        :param stats: bool, print a summary of the metrics
+        :param metrics_file: str, path of a json file to write the metrics to
+        :param index_file: str, path of the reverse index
+        :param max_level: int, max level a queried move is learned at
+        :param where: list of str, conditions on the stats in analytics mode
+        :param sort: str, stat to order by in analytics mode, with an optional ':desc'
+        :param top: int, max number of pokemon listed in analytics mode
+        :param aggregate: str, comma separated aggregates of the stats in analytics mode
+        :param listen: str, host:port to serve lookups on
+        :param socket_path: str, path of a unix socket to serve lookups on
+        :param lru_size: int, max number of looked up entries kept in memory
+        :param concurrency: str, 'adaptive' or 'fixed' number of http requests in flight
+        :param all_entries: bool, request every entry of the mode
         """
         self.mode = mode
         self.input_data = input_data
         self.expanded = expanded
         self.input_file = input_file
         self.output_file = output_file
+        self.output_format = output_format
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.cache_max_bytes = cache_max_bytes
+        self.offline = offline
+        self.snapshot_file = snapshot_file
+        self.engine = engine
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retries = retries
+        self.rate_limit = rate_limit
+        self.keep_going = keep_going
+        self.journal_file = journal_file
+        self.resume = resume
+        self.order = order
+        self.parallel = parallel
+        self.workers = workers
+        self.base_url = base_url
+        self.stats = stats
+        self.metrics_file = metrics_file
+        self.index_file = index_file
+        self.max_level = max_level
+        self.where = where or []
+        self.sort = sort
+        self.top = top
+        self.aggregate = aggregate
+        self.listen = listen
+        self.socket_path = socket_path
+        self.lru_size = lru_size
+        self.concurrency = concurrency
+        self.all_entries = all_entries
 
     def __str__(self):
         """
@@ -0,0 +1,98 @@
+"""
+Benchmark of stat queries over a full dex of pokemon.
+
+Times a filter, sort, top and aggregate query run on a StatTable against the same query written
+as python loops over the Pokemon objects. Prints one json line, with whether numpy was used.
+
+usage: python benchmarks/bench_analytics.py [--pokemon N] [--repeat N]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from pokeretriever import stattable  # noqa: E402
+from pokeretriever.jsonparser import JSONParser  # noqa: E402
+from pokeretriever.stattable import StatTable  # noqa: E402
+
+
+def loop_query(dex: list) -> tuple:
+    """
+    Fast pokemon with a low total, fastest first, and the mean of each stat, with python loops.
+
+    :param dex: list of Pokemon.
+    :return: a tuple of the names listed and the means.
+    """
+    rows = []
+    for pokemon in dex:
+        stats = dict(pokemon.stats)
+        total = sum(stats.values())
+        if stats['speed'] >= 100 and total < 500:
+            rows.append((pokemon.name, list(stats.values()) + [total]))
+    rows.sort(key=lambda row: row[1][5], reverse=True)
+    rows = rows[:20]
+    return [name for name, _ in rows], [statistics.fmean(column) for column in zip(*(values for _, values in rows))]
+
+
+def table_query(dex: list) -> tuple:
+    """
+    The same query as loop_query, on a StatTable.
+
+    :param dex: list of Pokemon.
+    :return: a tuple of the names listed and the means.
+    """
+    table = StatTable.from_pokemon(dex)
+    table.where('speed>=100').where('total<500').sort('speed', descending=True).top(20)
+    return [name for name, _ in table.selected()], table.aggregate('mean')
+
+
+def best_time(query, dex: list, repeat: int) -> float:
+    """
+    Return the best time in milliseconds of a query.
+
+    :param query: function taking the dex.
+    :param dex: list of Pokemon.
+    :param repeat: number of runs to take the best of.
+    :return: a float.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query(dex)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 3)
+
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pokemon', type=int, default=fixtures.NUM_POKEMON, help='Number of pokemon in the dex.')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of timed runs to take the best of.')
+    arguments = parser.parse_args()
+
+    dex = [JSONParser.parse_json_to_pokemon_not_extended(fixtures.make_pokemon(an_id))
+           for an_id in range(1, arguments.pokemon + 1)]
+    if loop_query(dex)[0] != table_query(dex)[0]:
+        raise AssertionError('StatTable and loop queries disagree')
+
+    table = StatTable.from_pokemon(dex)
+    start = time.perf_counter()
+    table.where('speed>=100').where('total<500').sort('speed', descending=True).top(20).aggregate('mean')
+    query_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    print(json.dumps({'benchmark': 'analytics', 'pokemon': len(dex), 'numpy': stattable.numpy is not None,
+                      'loop_ms': best_time(loop_query, dex, arguments.repeat),
+                      'table_with_build_ms': best_time(table_query, dex, arguments.repeat),
+                      'table_query_ms': query_ms}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark of the cold start of the pokedex, from python -X importtime.
+
+Runs pokedex.py in a fresh interpreter for --help and for an offline run answered from a
+seeded response cache, and adds up the import time of every module the program loads after
+the interpreter's own start up. Prints one json line per run with the median import time, the
+number of modules loaded and the heavy modules that should not have been. Exits with an error
+if a heavy module was loaded or the import time is over its budget, so regressions fail loudly.
+
+usage: python benchmarks/bench_import.py [--repeat N] [--budget-ms MS]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import fixtures  # noqa: E402
+from pokeretriever.cache import ResponseCache  # noqa: E402
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+# Modules only the network, async, analytics, snapshot, server and process paths need.
+HEAVY = ('requests', 'urllib3', 'asyncio', 'ssl', 'numpy', 'sqlite3', 'http.server', 'multiprocessing')
+SCENARIOS = {
+    'help': (['--help'], HEAVY + ('concurrent.futures', 'pokeretriever', 'report')),
+    'offline': (['pokemon', '--inputfile', '{names}', '--offline', '--cache-dir', '{cache}',
+                 '--output', os.devnull], HEAVY)
+}
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Return the cumulative import time of each module imported after the interpreter's start up,
+    that is after the site module.
+
+    :param stderr: the output of python -X importtime.
+    :return: a dict of module name to cumulative microseconds, top level imports first.
+    """
+    modules = {}
+    top_level = {}
+    started = False
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative, indent, name = match.groups()
+        if not started:
+            started = name == 'site' and len(indent) == 1
+            continue
+        modules[name] = int(cumulative)
+        if len(indent) == 1:
+            top_level[name] = int(cumulative)
+    return {'total_us': sum(top_level.values()), 'modules': modules}
+
+
+def run(arguments: list) -> dict:
+    """
+    Run pokedex.py with arguments under -X importtime.
+
+    :param arguments: list of pokedex.py arguments.
+    :return: the dict of parse_importtime.
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(ROOT, 'pokedex.py')] + arguments,
+                               cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'pokedex.py {" ".join(arguments)} exited with {completed.returncode}:\n'
+                           f'{completed.stderr[-2000:]}')
+    return parse_importtime(completed.stderr)
+
+
+def seed(workdir: str, count: int) -> dict:
+    """
+    Write a response cache holding count pokemon, and a file listing them.
+
+    :param workdir: directory to write in.
+    :param count: number of pokemon.
+    :return: a dict of the placeholders in SCENARIOS to the paths.
+    """
+    cache_dir = os.path.join(workdir, 'cache')
+    cache = ResponseCache(cache_dir)
+    names = [fixtures.pokemon_name(an_id) for an_id in range(1, count + 1)]
+    for an_id, name in enumerate(names, start=1):
+        cache.put('pokemon', name, fixtures.make_pokemon(an_id))
+    names_file = os.path.join(workdir, 'names.txt')
+    with open(names_file, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(names))
+    return {'cache': cache_dir, 'names': names_file}
+
+
+def main():
+    """
+    Run the benchmark, print the results and exit with an error on a regression.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs to take the median of.')
+    parser.add_argument('--pokemon', type=int, default=10, help='Number of pokemon of the offline run.')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Max median import time of a run, in milliseconds. No budget by default.')
+    arguments = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = seed(workdir, arguments.pokemon)
+        for scenario, (pokedex_arguments, forbidden) in SCENARIOS.items():
+            pokedex_arguments = [argument.format(**paths) for argument in pokedex_arguments]
+            runs = [run(pokedex_arguments) for _ in range(arguments.repeat)]
+            import_ms = round(statistics.median(result['total_us'] for result in runs) / 1000, 2)
+            modules = runs[-1]['modules']
+            loaded = sorted(module for module in forbidden if module in modules)
+            over_budget = arguments.budget_ms is not None and import_ms > arguments.budget_ms
+            failed = failed or bool(loaded) or over_budget
+            slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+            print(json.dumps({'benchmark': 'import', 'scenario': scenario, 'import_ms': import_ms,
+                              'modules': len(modules), 'forbidden_loaded': loaded, 'over_budget': over_budget,
+                              'slowest_ms': {name: round(us / 1000, 2) for name, us in slowest}}))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
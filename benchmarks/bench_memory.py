@@ -0,0 +1,146 @@
+"""
+Benchmark of the memory held by a full dex of parsed PokedexObjects.
+
+Compares the slotted, interned representation built by JSONParser with the previous
+dict-backed representation, where every pokemon held its own list of tuples and its own
+copy of each Move, Ability and Stat. Prints one json line per mode.
+
+usage: python benchmarks/bench_memory.py [--pokemon N]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from pokeretriever.jsonparser import JSONParser  # noqa: E402
+
+
+class LegacyObject:
+    """
+    Dict-backed stand in for the previous PokedexObject classes.
+    """
+
+    def __init__(self, **fields):
+        """
+        :param fields: attributes of the object.
+        """
+        self.__dict__.update(fields)
+
+
+def legacy_pokemon(data, sub_resources=None):
+    """
+    Build a pokemon the way JSONParser did before slots and interning.
+
+    :param data: Json of the pokemon.
+    :param sub_resources: dict of mode to list of json, for an expanded pokemon.
+    :return: a LegacyObject.
+    """
+    if sub_resources is None:
+        stats = [(stat['stat']['name'], stat['base_stat']) for stat in data['stats']]
+        abilities = [ability['ability']['name'] for ability in data['abilities']]
+        moves = [(move['move']['name'], move['version_group_details'][0]['level_learned_at'])
+                 for move in data['moves']]
+    else:
+        stats = [LegacyObject(name=stat['name'], id=stat['id'], is_battle_only=stat['is_battle_only'])
+                 for stat in sub_resources['stat']]
+        abilities = [LegacyObject(name=ability['name'], id=ability['id'], generation=ability['generation']['name'],
+                                  effect=ability['effect_entries'][0]['effect'],
+                                  effect_short=ability['effect_entries'][0]['short_effect'],
+                                  pokemon=[pokemon['pokemon']['name'] for pokemon in ability['pokemon']])
+                     for ability in sub_resources['ability']]
+        moves = [LegacyObject(name=move['name'], id=move['id'], generation=move['generation']['name'],
+                              accuracy=move['accuracy'], powerpoints=move['pp'], power=move['power'],
+                              type=move['type']['name'], damage_class=move['damage_class']['name'],
+                              effect_short=move['effect_entries'][0]['short_effect'])
+                 for move in sub_resources['move']]
+    return LegacyObject(name=data['name'], id=data['id'], height=data['height'], weight=data['weight'],
+                        stats=stats, types=[a_type['type']['name'] for a_type in data['types']],
+                        abilities=abilities, move=moves, expanded=sub_resources is not None)
+
+
+def compact_pokemon(data, sub_resources=None):
+    """
+    Build a pokemon with the current JSONParser.
+
+    :param data: Json of the pokemon.
+    :param sub_resources: dict of mode to list of json, for an expanded pokemon.
+    :return: a Pokemon.
+    """
+    if sub_resources is None:
+        return JSONParser.parse_json_to_pokemon_not_extended(data)
+    return JSONParser.parse_json_to_pokemon_extended(data, sub_resources)
+
+
+def make_payloads(num_pokemon: int) -> tuple:
+    """
+    Return the text of every pokemon payload and of every sub resource payload.
+
+    :param num_pokemon: number of pokemon in the dex.
+    :return: a tuple of a list of pokemon texts and a dict of (mode, name) to text.
+    """
+    pokemon_texts = [json.dumps(fixtures.make_pokemon(an_id)) for an_id in range(1, num_pokemon + 1)]
+    sub_resource_texts = {}
+    for text in pokemon_texts:
+        for mode, names in JSONParser.get_sub_resource_names(json.loads(text)).items():
+            for name in names:
+                if (mode, name) not in sub_resource_texts:
+                    sub_resource_texts[mode, name] = json.dumps(fixtures.make_resource(mode, name))
+    return pokemon_texts, sub_resource_texts
+
+
+def measure(build, payloads: tuple, expanded: bool) -> int:
+    """
+    Return the bytes still allocated after building a full dex with build.
+
+    Every payload is decoded from text, as it would be from the api, so no strings are
+    shared between payloads unless the builder shares them.
+
+    :param build: function taking the json of a pokemon and its sub resources.
+    :param payloads: tuple returned by make_payloads.
+    :param expanded: build expanded pokemon.
+    :return: an int.
+    """
+    pokemon_texts, sub_resource_texts = payloads
+    JSONParser.interned.clear()
+    gc.collect()
+    tracemalloc.start()
+    dex = []
+    for text in pokemon_texts:
+        data = json.loads(text)
+        sub_resources = None
+        if expanded:
+            sub_resources = {mode: [json.loads(sub_resource_texts[mode, name]) for name in names]
+                             for mode, names in JSONParser.get_sub_resource_names(data).items()}
+        dex.append(build(data, sub_resources))
+        del data, sub_resources
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dex
+    return size
+
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pokemon', type=int, default=fixtures.NUM_POKEMON, help='Number of pokemon in the dex.')
+    arguments = parser.parse_args()
+
+    payloads = make_payloads(arguments.pokemon)
+    for expanded in (False, True):
+        legacy = measure(legacy_pokemon, payloads, expanded)
+        compact = measure(compact_pokemon, payloads, expanded)
+        print(json.dumps({'benchmark': 'memory', 'pokemon': arguments.pokemon, 'expanded': expanded,
+                          'legacy_bytes': legacy, 'compact_bytes': compact,
+                          'reduction': round(1 - compact / legacy, 3)}))
+
+
+if __name__ == '__main__':
+    main()
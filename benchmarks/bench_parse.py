@@ -0,0 +1,136 @@
+"""
+Benchmark of decoding api responses, whole and projected to the fields JSONParser reads.
+
+For each mode, decodes a set of PokeAPI shaped payloads whole, as the retriever parses them, and
+projected by FieldExtractor, as the cache and snapshot store them, and reports the time per
+payload, the peak memory while decoding one payload, the peak memory while decoding and keeping
+every payload, and the bytes kept per document afterwards. Only pokemon are projected, so the
+other modes show what FieldExtractor costs on top of a plain decode. Prints one json line per
+mode.
+
+usage: python benchmarks/bench_parse.py [--count N] [--repeat N]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from pokeretriever import fieldextractor  # noqa: E402
+from pokeretriever.fieldextractor import FieldExtractor  # noqa: E402
+
+GENERATORS = {
+    'pokemon': fixtures.make_pokemon,
+    'move': fixtures.make_move,
+    'ability': fixtures.make_ability,
+    'stat': fixtures.make_stat
+}
+LIMITS = {
+    'pokemon': fixtures.NUM_POKEMON,
+    'move': fixtures.NUM_MOVES,
+    'ability': fixtures.NUM_ABILITIES,
+    'stat': len(fixtures.STAT_NAMES)
+}
+
+
+def full(mode: str, text: bytes):
+    """
+    Decode the whole response, as the retriever does.
+
+    :param mode: mode of the response.
+    :param text: json bytes.
+    :return: the decoded json.
+    """
+    return FieldExtractor.loads(text)
+
+
+def projected(mode: str, text: bytes):
+    """
+    Decode the response and project it if its mode has a projection, as the cache and snapshot do.
+
+    :param mode: mode of the response.
+    :param text: json bytes.
+    :return: the projected json.
+    """
+    return FieldExtractor.extract(mode, FieldExtractor.loads(text))
+
+
+def timed(decode, mode: str, texts: list, repeat: int) -> float:
+    """
+    Return the best time in microseconds to decode one payload.
+
+    :param decode: function taking a mode and json bytes.
+    :param mode: mode of the payloads.
+    :param texts: list of json bytes.
+    :param repeat: number of runs to take the best of.
+    :return: a float.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            decode(mode, text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best / len(texts) * 1e6, 1)
+
+
+def measure(decode, mode: str, texts: list) -> tuple:
+    """
+    Return the largest peak of bytes allocated while decoding one payload, the peak bytes
+    allocated while decoding and keeping every payload, and the bytes kept per decoded document.
+
+    :param decode: function taking a mode and json bytes.
+    :param mode: mode of the payloads.
+    :param texts: list of json bytes.
+    :return: a tuple of three ints.
+    """
+    gc.collect()
+    tracemalloc.start()
+    document_peak = 0
+    for text in texts:
+        tracemalloc.reset_peak()
+        decode(mode, text)
+        document_peak = max(document_peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    gc.collect()
+    tracemalloc.start()
+    documents = [decode(mode, text) for text in texts]
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del documents
+    return document_peak, peak, kept // len(texts)
+
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=200, help='Number of payloads per mode, at most.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs to take the best of.')
+    arguments = parser.parse_args()
+
+    for mode, generate in GENERATORS.items():
+        texts = [json.dumps(generate(an_id)).encode() for an_id in range(1, min(arguments.count, LIMITS[mode]) + 1)]
+        full_document_peak, full_peak, full_kept = measure(full, mode, texts)
+        projected_document_peak, projected_peak, projected_kept = measure(projected, mode, texts)
+        print(json.dumps({'benchmark': 'parse', 'mode': mode, 'payloads': len(texts),
+                          'payload_bytes': sum(map(len, texts)) // len(texts),
+                          'decoder': 'orjson' if fieldextractor.orjson is not None else 'json',
+                          'full_us': timed(full, mode, texts, arguments.repeat),
+                          'projected_us': timed(projected, mode, texts, arguments.repeat),
+                          'full_document_peak_bytes': full_document_peak,
+                          'projected_document_peak_bytes': projected_document_peak,
+                          'full_peak_bytes': full_peak, 'projected_peak_bytes': projected_peak,
+                          'full_kept_bytes': full_kept, 'projected_kept_bytes': projected_kept}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+End to end benchmark of the pokedex against the local stub api.
+
+Starts benchmarks/stubserver.py, then runs pokedex.py in a fresh process for every mode, with
+and without --expanded, over each batch size. Every run goes through PokeDex, the getter and
+the Report, writing the report to the null device. Prints one json line per run with the
+identifiers per second, http fetches per second, p50 / p99 latency of a request and peak RSS,
+so runs of different versions can be compared.
+
+usage: python benchmarks/bench_pokedex.py [--sizes 1,10,100] [--modes pokemon,species] [--engine async]
+       [--latency S] [--jitter S] [--max-concurrent N] [--fixtures DIR] [-- extra pokedex.py arguments]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import fixtures  # noqa: E402
+from pokeretriever.resources import ResourceRegistry  # noqa: E402
+
+MODES = ('pokemon', 'ability', 'move', 'stat', 'type', 'species', 'evolution-chain')
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Return the value below which a fraction of the sorted values fall, by the nearest rank.
+
+    :param values: sorted list of numbers.
+    :param fraction: between 0 and 1.
+    :return: a number, or None if there are no values.
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_child(pokedex_arguments: list):
+    """
+    Run the pokedex in this process, timing every request, and print the measurements as json.
+    Used by run() in a fresh interpreter, so peak RSS belongs to one run.
+
+    :param pokedex_arguments: command line arguments of pokedex.py.
+    """
+    import pokedex
+    from pokedexrequest import AsyncPokedexRequest, PokedexRequest
+
+    latencies = []
+    execute_request = PokedexRequest.execute_request.__func__
+    execute_request_async = AsyncPokedexRequest.execute_request
+
+    def timed(cls, request):
+        start = time.perf_counter()
+        try:
+            return execute_request(cls, request)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    async def timed_async(self, request):
+        start = time.perf_counter()
+        try:
+            return await execute_request_async(self, request)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    PokedexRequest.execute_request = classmethod(timed)
+    AsyncPokedexRequest.execute_request = timed_async
+
+    sys.argv = ['pokedex.py'] + pokedex_arguments
+    start = time.perf_counter()
+    try:
+        pokedex.main()
+        status = 0
+    except SystemExit as e:
+        status = e.code or 0
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(json.dumps({'status': status, 'seconds': elapsed, 'requests': len(latencies),
+                      'p50': percentile(latencies, 0.5), 'p99': percentile(latencies, 0.99),
+                      'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+
+def stub_stats(base_url: str) -> dict:
+    """
+    :param base_url: base url of the stub.
+    :return: the counters of the stub.
+    """
+    with urllib.request.urlopen(base_url.split('/api/')[0] + '/_stats') as response:
+        return json.load(response)
+
+
+def identifiers(mode: str, size: int, counts: dict) -> list:
+    """
+    Return the identifiers of a batch: names, or ids for resources without one. Modes with fewer
+    resources than the batch, like stats and types, repeat them.
+
+    :param mode: mode of the batch.
+    :param size: number of identifiers in the batch.
+    :param counts: dict of mode to number of resources the stub generates.
+    :return: a list of strings.
+    """
+    endpoint = ResourceRegistry.get(mode).endpoint
+    count = max(1, fixtures.resource_count(endpoint, counts))
+    an_ids = [index % count + 1 for index in range(size)]
+    return [fixtures.resource_name(endpoint, an_id) or str(an_id) for an_id in an_ids]
+
+
+def run(base_url: str, mode: str, expanded: bool, size: int, workdir: str, arguments) -> dict:
+    """
+    Run one batch in a fresh process and return its measurements.
+
+    :param base_url: base url of the stub.
+    :param mode: mode of the batch.
+    :param expanded: request expanded pokemon.
+    :param size: number of identifiers in the batch.
+    :param workdir: directory for the input file.
+    :param arguments: parsed arguments of the benchmark.
+    :return: a dict.
+    """
+    input_file = os.path.join(workdir, f'{mode}-{size}.txt')
+    with open(input_file, 'w', encoding='utf-8') as file:
+        file.writelines(identifier + '\n' for identifier in identifiers(mode, size, arguments.counts))
+
+    pokedex_arguments = ['--base-url', base_url, '--inputfile', input_file, '--output', os.devnull,
+                         '--engine', arguments.engine] + arguments.extra + [mode]
+    if expanded:
+        pokedex_arguments.append('--expanded')
+
+    before = stub_stats(base_url)
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'] + pokedex_arguments,
+                               cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    after = stub_stats(base_url)
+    fetches = after['requests'] - before['requests']
+    measured = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    seconds = measured['seconds']
+    return {'benchmark': 'pokedex', 'mode': mode, 'expanded': expanded, 'engine': arguments.engine,
+            'size': size, 'status': measured['status'], 'seconds': round(seconds, 4),
+            'requests_per_sec': round(size / seconds, 1), 'fetches': fetches,
+            'fetches_per_sec': round(fetches / seconds, 1), 'throttled': after['throttled'] - before['throttled'],
+            'p50_ms': None if measured['p50'] is None else round(measured['p50'] * 1000, 2),
+            'p99_ms': None if measured['p99'] is None else round(measured['p99'] * 1000, 2),
+            'peak_rss_kb': measured['peak_rss_kb']}
+
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    if sys.argv[1:2] == ['--child']:
+        run_child(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,10,100,1000,10000', help='Comma separated batch sizes.')
+    parser.add_argument('--modes', default=','.join(MODES), help='Comma separated modes.')
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread', help='Retrieval engine.')
+    parser.add_argument('--latency', type=float, default=0.01, help='Mean seconds each response is delayed by.')
+    parser.add_argument('--jitter', type=float, default=0.005, help='Max seconds added to or taken from the latency.')
+    parser.add_argument('--max-concurrent', type=int, dest='max_concurrent',
+                        help='Max number of requests the stub answers at once, the others get a 429.')
+    parser.add_argument('--fixtures', help='--cache-dir of a recorded run for the stub to replay.')
+    parser.add_argument('extra', nargs=argparse.REMAINDER, help='Extra pokedex.py arguments, after --.')
+    arguments = parser.parse_args()
+    arguments.extra = arguments.extra[1:] if arguments.extra[:1] == ['--'] else arguments.extra
+
+    sizes = [int(size) for size in arguments.sizes.split(',')]
+    # Batches larger than the real api are served generated resources past its last id.
+    arguments.counts = {'pokemon': max(sizes + [fixtures.NUM_POKEMON]), 'move': max(sizes + [fixtures.NUM_MOVES]),
+                        'ability': max(sizes + [fixtures.NUM_ABILITIES])}
+    stub_arguments = [sys.executable, os.path.join(ROOT, 'benchmarks', 'stubserver.py'),
+                      '--latency', str(arguments.latency), '--jitter', str(arguments.jitter),
+                      '--pokemon-count', str(arguments.counts['pokemon']),
+                      '--move-count', str(arguments.counts['move']),
+                      '--ability-count', str(arguments.counts['ability'])]
+    if arguments.max_concurrent is not None:
+        stub_arguments += ['--max-concurrent', str(arguments.max_concurrent)]
+    if arguments.fixtures is not None:
+        stub_arguments += ['--fixtures', arguments.fixtures]
+
+    stub = subprocess.Popen(stub_arguments, stdout=subprocess.PIPE, text=True)
+    try:
+        base_url = json.loads(stub.stdout.readline())['base_url']
+        with tempfile.TemporaryDirectory() as workdir:
+            for mode in arguments.modes.split(','):
+                for expanded in (False, True) if ResourceRegistry.get(mode).expandable else (False,):
+                    for size in sizes:
+                        print(json.dumps(run(base_url, mode, expanded, size, workdir, arguments)), flush=True)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == '__main__':
+    main()
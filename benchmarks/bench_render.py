@@ -0,0 +1,170 @@
+"""
+Benchmark of rendering the expanded pokemon report in output_pokemon_expand.txt.
+
+The sample report is parsed back into PokedexObjects, rendered with the previous
+concatenation based __str__ code, the current __str__ methods and report.Renderer, and each
+result is checked to be byte identical to the sample. Prints one json line per renderer.
+
+usage: python benchmarks/bench_render.py [--copies N] [--repeat N]
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pokeretriever.pokeretriever import Ability, Move, Pokemon, Stat  # noqa: E402
+from report import Renderer  # noqa: E402
+
+SAMPLE = os.path.join(ROOT, 'output_pokemon_expand.txt')
+
+
+def value(text: str):
+    """
+    Convert a rendered field back to the value it was rendered from.
+
+    :param text: rendered value.
+    :return: None, a bool, an int or the text.
+    """
+    if text in ('None', 'True', 'False'):
+        return {'None': None, 'True': True, 'False': False}[text]
+    return int(text) if text.lstrip('-').isdigit() else text
+
+
+def parse_sample(path: str) -> tuple:
+    """
+    Parse the expanded pokemon of a sample report. The report writes pokemon back to back, so
+    each one starts right after the 'Expanded' line of the one before.
+
+    :param path: path of the sample report.
+    :return: a tuple of the list of Pokemon and the rendered text of the report.
+    """
+    with open(path, encoding='latin-1') as file:
+        text = file.read().split('\n', 1)[1]
+    chunks = re.split(r'(?<=\tExpanded: True)(?=Pokemon: )', text)
+    return [parse_pokemon(chunk) for chunk in chunks], text
+
+
+def parse_pokemon(text: str) -> Pokemon:
+    """
+    Parse the text of one expanded pokemon.
+
+    :param text: rendered text of the pokemon.
+    :return: a Pokemon.
+    """
+    lines = text.split('\n')
+
+    def field(index: int) -> str:
+        return lines[index].split(': ', 1)[1]
+
+    name = lines[0][len('Pokemon: '):-1]
+    index = lines.index('\tTypes: ') + 1
+    types = []
+    while lines[index].startswith('\t\t Name: '):
+        types.append(field(index))
+        index += 1
+
+    index += 1
+    stats = []
+    while lines[index] == '\t\t':
+        stats.append(Stat(field(index + 1), value(field(index + 2)), value(field(index + 3))))
+        index += 4
+
+    index += 2
+    abilities = []
+    while lines[index].startswith('\t\tName: '):
+        abilities.append(Ability(field(index), value(field(index + 1)), field(index + 2),
+                                 field(index + 3)[:-len(', ')], field(index + 4),
+                                 lines[index + 5][len('\t\tPokemon: '):].split(' ')))
+        index += 6
+
+    index += 1
+    moves = []
+    while lines[index] == '\t\t':
+        moves.append(Move(*(value(field(index + offset)) if offset in (2, 4, 5, 6) else field(index + offset)
+                            for offset in range(1, 10))))
+        index += 10
+
+    return Pokemon(name, value(field(1)), value(field(2)), value(field(3)), stats, types, abilities, moves,
+                   value(field(index)))
+
+
+def legacy_str(pokemon: Pokemon) -> str:
+    """
+    Render a pokemon with the repeated concatenation the __str__ methods used before.
+
+    :param pokemon: an expanded Pokemon.
+    :return: a String.
+    """
+    def legacy_ability(ability):
+        result = f'\nName: {ability.name}\nId: {ability.id}\nGeneration: {ability.generation}' \
+                 f'\nEffect: {ability.effect.replace(chr(10), " ")}, ' \
+                 f'\nEffect short: {ability.effect_short.replace(chr(10), " ")}\nPokemon:'
+        for pokemon_name in ability.pokemon:
+            result += f' {pokemon_name}'
+        return result
+
+    abilities = ''
+    for ability in pokemon.abilities:
+        abilities += legacy_ability(ability).replace('\n', '\n\t\t')
+    types = ''
+    for a_type in pokemon.types:
+        types += f'\n\t\t Name: {a_type}'
+    stats = ''
+    for stat in pokemon.stats:
+        stats += '\n\t\t' + str(stat).replace('\n', '\n\t\t')
+    moves = ''
+    for move in pokemon.move:
+        moves += '\n\t\t' + str(move).replace('\n', '\n\t\t')
+    return f'Pokemon: {pokemon.name} \n\tID: {pokemon.id}\n\tHeight: {pokemon.height}' \
+           f'\n\tWeight: {pokemon.weight}\n\tTypes: {types}\n\tStats: {stats}\n\t--------- ' \
+           f'\n\tAbilities: {abilities}\n\tMoves: {moves}\n\tExpanded: {pokemon.expanded}'
+
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--copies', type=int, default=100, help='Number of times the sample is in the report.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs, the best one is reported.')
+    arguments = parser.parse_args()
+
+    list_of_pokemon, expected = parse_sample(SAMPLE)
+    renderer = Renderer()
+
+    def with_renderer(stream):
+        for pokemon in list_of_pokemon:
+            renderer.write(stream, pokemon)
+
+    candidates = {
+        'legacy_concatenation': lambda stream: [stream.write(legacy_str(pokemon)) for pokemon in list_of_pokemon],
+        'str': lambda stream: [stream.write(str(pokemon)) for pokemon in list_of_pokemon],
+        'renderer': with_renderer
+    }
+    for name, render in candidates.items():
+        check = io.StringIO()
+        render(check)
+        if check.getvalue() != expected:
+            sys.exit(f'{name} output differs from {SAMPLE}')
+
+        best = float('inf')
+        for _ in range(arguments.repeat):
+            stream = io.StringIO()
+            start = time.perf_counter()
+            for _ in range(arguments.copies):
+                render(stream)
+            best = min(best, time.perf_counter() - start)
+        rendered = arguments.copies * len(list_of_pokemon)
+        print(json.dumps({'benchmark': 'render', 'renderer': name, 'pokemon': rendered,
+                          'moves': sum(len(pokemon.move) for pokemon in list_of_pokemon),
+                          'seconds': round(best, 6), 'pokemon_per_second': round(rendered / best, 1)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+"""
+Module contains functions that generate PokeAPI shaped json for the benchmarks.
+
+The payloads follow the layout of the real api responses (including the large
+moves[].version_group_details and game_indices arrays the parser never reads), so
+benchmarks exercise realistic sizes without network access.
+"""
+import random
+
+STAT_NAMES = ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed']
+TYPE_NAMES = ['normal', 'fire', 'water', 'electric', 'grass', 'ice', 'fighting', 'poison', 'ground',
+              'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy']
+NUM_POKEMON = 898
+NUM_MOVES = 826
+NUM_ABILITIES = 267
+VERSION_GROUPS = 18
+SPECIES_PER_CHAIN = 3
+
+
+def named(name: str, mode: str, an_id: int) -> dict:
+    """
+    Return a named api resource reference.
+
+    :param name: name of the resource.
+    :param mode: mode of the resource.
+    :param an_id: id of the resource.
+    :return: a dict.
+    """
+    return {'name': name, 'url': f'https://pokeapi.co/api/v2/{mode}/{an_id}/'}
+
+
+def pokemon_name(an_id: int) -> str:
+    """
+    :param an_id: id of the pokemon.
+    :return: name of the pokemon.
+    """
+    return f'pokemon-{an_id}'
+
+
+def move_name(an_id: int) -> str:
+    """
+    :param an_id: id of the move.
+    :return: name of the move.
+    """
+    return f'move-{an_id}'
+
+
+def ability_name(an_id: int) -> str:
+    """
+    :param an_id: id of the ability.
+    :return: name of the ability.
+    """
+    return f'ability-{an_id}'
+
+
+def version_group_detail(level: int, group: int) -> dict:
+    """
+    Return how a pokemon learns a move in a version group. Like the api, moves learned from a
+    machine are at level 0.
+
+    :param level: level the move is learned at, 0 if it is not learned by leveling up.
+    :param group: id of the version group.
+    :return: a dict.
+    """
+    method = named('level-up', 'move-learn-method', 1) if level else named('machine', 'move-learn-method', 4)
+    return {'level_learned_at': level, 'move_learn_method': method,
+            'version_group': named(f'version-group-{group}', 'version-group', group)}
+
+
+def make_pokemon(an_id: int, num_moves: int = 80) -> dict:
+    """
+    Return the json of a pokemon.
+
+    :param an_id: id of the pokemon.
+    :param num_moves: number of moves the pokemon learns.
+    :return: a dict.
+    """
+    rng = random.Random(an_id)
+    move_ids = rng.sample(range(1, NUM_MOVES + 1), num_moves)
+    return {
+        'id': an_id,
+        'name': pokemon_name(an_id),
+        'height': rng.randint(1, 200),
+        'weight': rng.randint(1, 9999),
+        'base_experience': rng.randint(30, 300),
+        'order': an_id,
+        'is_default': True,
+        'abilities': [{'ability': named(ability_name(ability_id), 'ability', ability_id),
+                       'is_hidden': slot == 3, 'slot': slot}
+                      for slot, ability_id in enumerate(rng.sample(range(1, NUM_ABILITIES + 1), 2), start=1)],
+        'forms': [named(pokemon_name(an_id), 'pokemon-form', an_id)],
+        'game_indices': [{'game_index': an_id, 'version': named(f'version-{version}', 'version', version)}
+                         for version in range(1, 21)],
+        'held_items': [],
+        'moves': [{'move': named(move_name(move_id), 'move', move_id),
+                   'version_group_details': [
+                       version_group_detail(rng.choice([0, 0, 1, rng.randint(1, 100)]), group)
+                       for group in range(1, rng.randint(2, VERSION_GROUPS))]}
+                  for move_id in move_ids],
+        'species': named(pokemon_name(an_id), 'pokemon-species', an_id),
+        'sprites': {'front_default': f'https://raw.githubusercontent.com/PokeAPI/sprites/master/{an_id}.png'},
+        'stats': [{'base_stat': rng.randint(5, 255), 'effort': 0, 'stat': named(name, 'stat', stat_id)}
+                  for stat_id, name in enumerate(STAT_NAMES, start=1)],
+        'types': [{'slot': slot, 'type': named(name, 'type', TYPE_NAMES.index(name) + 1)}
+                  for slot, name in enumerate(rng.sample(TYPE_NAMES, rng.randint(1, 2)), start=1)]
+    }
+
+
+def make_move(an_id: int) -> dict:
+    """
+    Return the json of a move.
+
+    :param an_id: id of the move.
+    :return: a dict.
+    """
+    rng = random.Random(-an_id)
+    damage_class = rng.choice(['physical', 'special', 'status'])
+    effect = f'Inflicts regular damage and has a {rng.randint(1, 100)}% chance to lower the target\'s stats.'
+    return {
+        'id': an_id,
+        'name': move_name(an_id),
+        'accuracy': rng.choice([None, 70, 85, 90, 95, 100]),
+        'pp': rng.choice([5, 10, 15, 20, 25, 30, 35, 40]),
+        'power': None if damage_class == 'status' else rng.randint(10, 150),
+        'priority': 0,
+        'type': named(rng.choice(TYPE_NAMES), 'type', 1),
+        'damage_class': named(damage_class, 'move-damage-class', 1),
+        'generation': named(f'generation-{rng.choice(["i", "ii", "iii", "iv", "v"])}', 'generation', 1),
+        'effect_entries': [{'effect': effect * 3, 'short_effect': effect, 'language': named('en', 'language', 9)}],
+        'flavor_text_entries': [{'flavor_text': effect, 'language': named('en', 'language', 9),
+                                 'version_group': named(f'version-group-{group}', 'version-group', group)}
+                                for group in range(1, VERSION_GROUPS)]
+    }
+
+
+def make_ability(an_id: int) -> dict:
+    """
+    Return the json of an ability.
+
+    :param an_id: id of the ability.
+    :return: a dict.
+    """
+    rng = random.Random(an_id * 7919)
+    effect = f'This Pokemon has a {rng.randint(1, 100)}% chance to do something when hit.'
+    return {
+        'id': an_id,
+        'name': ability_name(an_id),
+        'is_main_series': True,
+        'generation': named(f'generation-{rng.choice(["iii", "iv", "v"])}', 'generation', 3),
+        'effect_entries': [{'effect': effect * 4, 'short_effect': effect, 'language': named('en', 'language', 9)}],
+        'pokemon': [{'is_hidden': False, 'slot': 1, 'pokemon': named(pokemon_name(pokemon_id), 'pokemon', pokemon_id)}
+                    for pokemon_id in rng.sample(range(1, NUM_POKEMON + 1), rng.randint(1, 40))]
+    }
+
+
+def make_stat(an_id: int) -> dict:
+    """
+    Return the json of a stat.
+
+    :param an_id: id of the stat.
+    :return: a dict.
+    """
+    return {'id': an_id, 'name': STAT_NAMES[an_id - 1], 'game_index': an_id, 'is_battle_only': False}
+
+
+def make_type(an_id: int) -> dict:
+    """
+    Return the json of a type.
+
+    :param an_id: id of the type.
+    :return: a dict.
+    """
+    rng = random.Random(an_id * 104729)
+    relations = {relation: [named(name, 'type', TYPE_NAMES.index(name) + 1)
+                            for name in rng.sample(TYPE_NAMES, rng.randint(0, most))]
+                 for relation, most in (('double_damage_to', 4), ('half_damage_to', 4), ('no_damage_to', 1),
+                                        ('double_damage_from', 4), ('half_damage_from', 4), ('no_damage_from', 1))}
+    return {
+        'id': an_id,
+        'name': TYPE_NAMES[an_id - 1],
+        'generation': named('generation-i', 'generation', 1),
+        'move_damage_class': named(rng.choice(['physical', 'special']), 'move-damage-class', 2),
+        'damage_relations': relations,
+        'game_indices': [{'game_index': an_id, 'generation': named('generation-i', 'generation', 1)}],
+        'moves': [named(move_name(move_id), 'move', move_id) for move_id in rng.sample(range(1, NUM_MOVES + 1), 40)],
+        'pokemon': [{'slot': 1, 'pokemon': named(pokemon_name(pokemon_id), 'pokemon', pokemon_id)}
+                    for pokemon_id in rng.sample(range(1, NUM_POKEMON + 1), 60)]
+    }
+
+
+def make_species(an_id: int) -> dict:
+    """
+    Return the json of a species. Every species has the name of its pokemon, and every
+    SPECIES_PER_CHAIN species in a row evolve from one another, in one evolution chain.
+
+    :param an_id: id of the species.
+    :return: a dict.
+    """
+    rng = random.Random(an_id * 15485863)
+    chain_id = (an_id - 1) // SPECIES_PER_CHAIN + 1
+    first = (an_id - 1) % SPECIES_PER_CHAIN == 0
+    return {
+        'id': an_id,
+        'name': pokemon_name(an_id),
+        'order': an_id,
+        'generation': named(f'generation-{rng.choice(["i", "ii", "iii", "iv", "v"])}', 'generation', 1),
+        'color': named(rng.choice(['red', 'blue', 'green', 'yellow', 'brown']), 'pokemon-color', 1),
+        'habitat': rng.choice([None, named(rng.choice(['forest', 'cave', 'sea']), 'pokemon-habitat', 1)]),
+        'capture_rate': rng.choice([3, 45, 90, 120, 190, 255]),
+        'is_legendary': rng.random() < 0.05,
+        'is_mythical': False,
+        'evolves_from_species': None if first else named(pokemon_name(an_id - 1), 'pokemon-species', an_id - 1),
+        'evolution_chain': {'url': f'https://pokeapi.co/api/v2/evolution-chain/{chain_id}/'},
+        'varieties': [{'is_default': True, 'pokemon': named(pokemon_name(an_id), 'pokemon', an_id)}],
+        'flavor_text_entries': [{'flavor_text': f'Species {an_id} lives in the wild.',
+                                 'language': named('en', 'language', 9), 'version': named('red', 'version', 1)}]
+    }
+
+
+def make_evolution_chain(an_id: int, num_species: int = NUM_POKEMON) -> dict:
+    """
+    Return the json of an evolution chain, its species evolving from one another by level up.
+
+    :param an_id: id of the evolution chain.
+    :param num_species: number of species, the last chain holding the remainder.
+    :return: a dict.
+    """
+    first = (an_id - 1) * SPECIES_PER_CHAIN + 1
+    link = None
+    for species_id in reversed(range(first, min(first + SPECIES_PER_CHAIN, num_species + 1))):
+        details = [] if species_id == first else [{'min_level': 16 * (species_id - first), 'item': None,
+                                                   'trigger': named('level-up', 'evolution-trigger', 1)}]
+        link = {'is_baby': False, 'species': named(pokemon_name(species_id), 'pokemon-species', species_id),
+                'evolution_details': details, 'evolves_to': [] if link is None else [link]}
+    return {'id': an_id, 'baby_trigger_item': None, 'chain': link}
+
+
+def resource_count(mode: str, counts: dict = None) -> int:
+    """
+    Return the number of resources of a mode. Stats and types have a fixed count, species one per
+    pokemon and evolution chains one per SPECIES_PER_CHAIN species.
+
+    :param mode: mode of the resources.
+    :param counts: dict of mode to number of resources, overriding the real counts of the api.
+    :return: an int, 0 for an unknown mode.
+    """
+    counts = counts or {}
+    if mode == 'stat':
+        return len(STAT_NAMES)
+    if mode == 'type':
+        return len(TYPE_NAMES)
+    if mode == 'pokemon-species':
+        return counts.get(mode, counts.get('pokemon', NUM_POKEMON))
+    if mode == 'evolution-chain':
+        return -(-resource_count('pokemon-species', counts) // SPECIES_PER_CHAIN)
+    defaults = {'pokemon': NUM_POKEMON, 'move': NUM_MOVES, 'ability': NUM_ABILITIES}
+    return counts.get(mode, defaults.get(mode, 0))
+
+
+def resource_name(mode: str, an_id: int):
+    """
+    :param mode: mode of the resource.
+    :param an_id: id of the resource.
+    :return: name of the resource, None for evolution chains which have none.
+    """
+    if mode == 'stat':
+        return STAT_NAMES[an_id - 1]
+    if mode == 'type':
+        return TYPE_NAMES[an_id - 1]
+    if mode == 'pokemon-species':
+        return pokemon_name(an_id)
+    if mode == 'evolution-chain':
+        return None
+    return f'{mode}-{an_id}'
+
+
+def make_resource(mode: str, identifier, counts: dict = None):
+    """
+    Return the json of any resource by name or id, or None if it does not exist.
+
+    :param mode: mode of the resource.
+    :param identifier: name / id of the resource.
+    :param counts: dict of mode to number of resources, overriding the real counts of the api.
+    :return: a dict, or None.
+    """
+    identifier = str(identifier).strip().lower()
+    makers = {'pokemon': make_pokemon, 'move': make_move, 'ability': make_ability, 'stat': make_stat,
+              'type': make_type, 'pokemon-species': make_species,
+              'evolution-chain': lambda an_id: make_evolution_chain(an_id, resource_count('pokemon-species', counts))}
+    if mode not in makers:
+        return None
+    make, count = makers[mode], resource_count(mode, counts)
+    if mode == 'stat' and identifier in STAT_NAMES:
+        return make_stat(STAT_NAMES.index(identifier) + 1)
+    if mode == 'type' and identifier in TYPE_NAMES:
+        return make_type(TYPE_NAMES.index(identifier) + 1)
+    an_id = identifier.rsplit('-', 1)[-1]
+    if not an_id.isdigit() or not 1 <= int(an_id) <= count:
+        return None
+    if not identifier.isdigit() and make(int(an_id)).get('name') != identifier:
+        return None
+    return make(int(an_id))
@@ -0,0 +1,294 @@
+"""
+Local stand in for PokeAPI, for benchmarks that must not depend on the network.
+
+Serves /api/v2/{mode}/{name or id}/ and the paginated /api/v2/{mode}/?offset=&limit= list
+endpoints, with a configurable latency and jitter per response. Responses are replayed from a
+recorded --cache-dir of an earlier run against the real api when --fixtures is given, and
+generated by benchmarks.fixtures otherwise. Every response has an ETag and conditional requests
+are answered 304 Not Modified, without a Content-Length like most real servers. With
+--max-concurrent, requests beyond that many at once are answered 429 Too Many Requests, like a
+throttling api. GET /_stats returns the request counters.
+
+Prints one json line with the base url to pass to --base-url once it is listening.
+
+usage: python benchmarks/stubserver.py [--port N] [--latency S] [--jitter S] [--max-concurrent N]
+       [--fixtures DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from pokeretriever.cache import ResponseCache  # noqa: E402
+
+
+class FixtureStore:
+    """
+    Encoded response bodies by mode and identifier, recorded or generated on first use.
+    """
+
+    def __init__(self, fixtures_dir: str = None, counts: dict = None):
+        """
+        Constructor.
+
+        :param fixtures_dir: --cache-dir of a recorded run, or None to generate every response.
+        :param counts: dict of mode to number of generated resources.
+        """
+        self.recorded = ResponseCache(fixtures_dir) if fixtures_dir is not None else None
+        self.counts = dict(counts or {})
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def get(self, mode: str, identifier: str):
+        """
+        Return the body and ETag of a resource, or None if it does not exist.
+
+        :param mode: mode of the resource.
+        :param identifier: name / id of the resource.
+        :return: a tuple of bytes and a string, or None.
+        """
+        key = (mode, identifier.lower())
+        with self._lock:
+            found = self._bodies.get(key)
+        if found is not None:
+            return found
+
+        data = self.recorded.get(mode, identifier) if self.recorded is not None else None
+        if data is None:
+            data = fixtures.make_resource(mode, identifier, self.counts)
+        if data is None:
+            return None
+        body = json.dumps(data).encode()
+        found = (body, '"' + hashlib.md5(body).hexdigest() + '"')
+        with self._lock:
+            self._bodies[key] = found
+        return found
+
+    def count(self, mode: str) -> int:
+        """
+        :param mode: mode of the resources.
+        :return: the number of resources of a mode.
+        """
+        return fixtures.resource_count(mode, self.counts)
+
+    def list_page(self, mode: str, offset: int, limit: int) -> bytes:
+        """
+        Return the body of a page of the list endpoint of a mode. Like the api, evolution chains are
+        listed by url only.
+
+        :param mode: mode of the resources.
+        :param offset: index of the first resource of the page.
+        :param limit: max number of resources in the page.
+        :return: bytes.
+        """
+        count = self.count(mode)
+        ids = range(offset + 1, min(offset + limit, count) + 1)
+        results = []
+        for an_id in ids:
+            name = fixtures.resource_name(mode, an_id)
+            url = f'/api/v2/{mode}/{an_id}/'
+            results.append({'url': url} if name is None else {'name': name, 'url': url})
+        return json.dumps({'count': count, 'results': results}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers one keep-alive connection to the StubServer.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        """
+        Disable Nagle's algorithm, so small responses are not held back waiting for an ack.
+        """
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        """
+        Requests are counted, not logged.
+        """
+
+    def do_GET(self):
+        """
+        Answer a resource, list or stats request.
+        """
+        server = self.server
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        if parts == ['_stats']:
+            self.respond(200, json.dumps(server.stats()).encode())
+            return
+
+        server.count('requests')
+        if not server.enter():
+            server.count('throttled')
+            self.respond(429, b'Too Many Requests')
+            return
+        try:
+            server.delay()
+        finally:
+            server.leave()
+        if len(parts) == 3 and parts[:2] == ['api', 'v2']:
+            query = parse_qs(url.query)
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', ['20'])[0])
+            self.respond(200, server.store.list_page(parts[2], offset, limit))
+            return
+
+        found = server.store.get(parts[2], parts[3]) if len(parts) == 4 and parts[:2] == ['api', 'v2'] else None
+        if found is None:
+            server.count('not_found')
+            self.respond(404, b'Not Found')
+            return
+
+        body, etag = found
+        if self.headers.get('If-None-Match') == etag:
+            server.count('not_modified')
+            self.respond(304, b'', etag)
+            return
+        self.respond(200, body, etag)
+
+    def respond(self, status: int, body: bytes, etag: str = None):
+        """
+        Send a response.
+
+        :param status: http status.
+        :param body: bytes of the body.
+        :param etag: ETag header, if any.
+        """
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        # A 304 has no body, so clients must not wait for one on the keep-alive connection.
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded http server answering like PokeAPI.
+    """
+    daemon_threads = True
+    # The default listen backlog of 5 overflows at --max-in-flight 32, stalling connects for a SYN
+    # retry of about a second that would dominate the measured latency.
+    request_queue_size = 1024
+
+    def __init__(self, address: tuple, store: FixtureStore, latency: float = 0, jitter: float = 0,
+                 seed: int = None, max_concurrent: int = None):
+        """
+        Constructor.
+
+        :param address: tuple of host and port, port 0 picks a free port.
+        :param store: the FixtureStore responses come from.
+        :param latency: mean seconds every response is delayed by.
+        :param jitter: max seconds added to or taken from the latency, uniformly.
+        :param seed: seed of the jitter.
+        :param max_concurrent: max number of requests answered at once, None for no limit.
+        """
+        super().__init__(address, StubHandler)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.counters = {'requests': 0, 'not_found': 0, 'not_modified': 0, 'throttled': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """
+        :return: the url to pass to --base-url.
+        """
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/api/v2/'
+
+    def delay(self):
+        """
+        Wait for the configured latency and jitter.
+        """
+        with self._lock:
+            delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def enter(self) -> bool:
+        """
+        Count one more request being answered, unless max_concurrent already are.
+        :return: False if the request must be throttled.
+        """
+        with self._lock:
+            if self.max_concurrent is not None and self.active >= self.max_concurrent:
+                return False
+            self.active += 1
+            return True
+
+    def leave(self):
+        """
+        Count one less request being answered.
+        """
+        with self._lock:
+            self.active -= 1
+
+    def count(self, counter: str):
+        """
+        :param counter: key of the counter to increment.
+        """
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self) -> dict:
+        """
+        :return: a copy of the counters.
+        """
+        with self._lock:
+            return dict(self.counters)
+
+
+def main():
+    """
+    Run the server until interrupted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=0, help='Port to listen on, a free one by default.')
+    parser.add_argument('--latency', type=float, default=0.01, help='Mean seconds each response is delayed by.')
+    parser.add_argument('--jitter', type=float, default=0.005, help='Max seconds added to or taken from the latency.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the jitter.')
+    parser.add_argument('--max-concurrent', type=int, dest='max_concurrent',
+                        help='Max number of requests answered at once, the others get a 429. No limit by default.')
+    parser.add_argument('--fixtures', help='--cache-dir of a recorded run to replay responses from.')
+    for mode in ('pokemon', 'move', 'ability'):
+        parser.add_argument(f'--{mode}-count', type=int, dest=mode,
+                            help=f'Number of {mode} resources generated, the real count by default.')
+    arguments = parser.parse_args()
+
+    counts = {mode: getattr(arguments, mode) for mode in ('pokemon', 'move', 'ability')
+              if getattr(arguments, mode) is not None}
+    server = StubServer((arguments.host, arguments.port), FixtureStore(arguments.fixtures, counts),
+                        arguments.latency, arguments.jitter, arguments.seed, arguments.max_concurrent)
+    print(json.dumps({'base_url': server.base_url}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
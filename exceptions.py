@@ -21,3 +21,60 @@ class InvalidObjectException(Exception):
         :return: String representation of this instance.
         """
         return f'Invalid Object: "{self.name}"'
+
+
+class CacheMissException(InvalidObjectException):
+    """
+    Custom exception class for entries missing from the cache in offline mode.
+    """
+
+    def __str__(self):
+        """
+        toString method.
+        :return: String representation of this instance.
+        """
+        return f'Not in cache (offline): "{self.name}"'
+
+
+class RequestFailedException(Exception):
+    """
+    Custom exception class for requests the api could not answer, even after retrying.
+    """
+    def __init__(self, name: str, reason):
+        """
+        Constructor.
+        :param name: name / id of the entry requested.
+        :param reason: status code or error of the last attempt.
+        """
+        super().__init__()
+        self.name = name
+        self.reason = reason
+
+    def __str__(self):
+        """
+        toString method.
+        :return: String representation of this instance.
+        """
+        return f'Request failed: "{self.name}" ({self.reason})'
+
+
+class MalformedObjectException(InvalidObjectException):
+    """
+    Custom exception class for entries whose json does not have the shape the parser reads.
+    """
+    def __init__(self, name: str, reason):
+        """
+        Constructor.
+        :param name: name / id of the entry.
+        :param reason: the error the parser raised, kept as text so the exception can be pickled.
+        """
+        super().__init__(name)
+        self.reason = f'{type(reason).__name__}: {reason}' if isinstance(reason, Exception) else str(reason)
+        self.args = (name, self.reason)
+
+    def __str__(self):
+        """
+        toString method.
+        :return: String representation of this instance.
+        """
+        return f'Malformed Object: "{self.name}" ({self.reason})'
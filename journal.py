@@ -0,0 +1,106 @@
+"""
+Module containing class to checkpoint the results of a batch so it can be resumed.
+"""
+import json
+
+from pokeretriever.resources import ResourceRegistry
+
+
+class Journal:
+    """
+    Append only json lines file recording every completed PokedexObject of a batch.
+
+    Each line holds the mode, class and fields of one object, flushed as soon as it is written, so a
+    batch that dies keeps everything it finished. A resumed batch replays the recorded objects
+    instead of requesting them again.
+    """
+    CLASSES = ResourceRegistry.classes()
+    MODES = ResourceRegistry.class_modes()
+
+    def __init__(self, path: str):
+        """
+        Constructor.
+
+        :param path: path of the journal file.
+        """
+        self.path = path
+        self.file = None
+
+    def entries(self):
+        """
+        Yield every complete entry recorded in the journal, skipping a line cut short by a crash.
+        :return: a generator of dicts.
+        """
+        try:
+            file = open(self.path, mode='r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and entry.get('class') in self.CLASSES:
+                    yield entry
+
+    def completed(self) -> set:
+        """
+        Return the mode and name, and the mode and id, of every recorded object, the name lower case.
+        A name or id only counts as done in the mode it was recorded in, as stat 1 is not pokemon 1.
+        :return: a set of (mode, string) tuples.
+        """
+        keys = set()
+        for entry in self.entries():
+            keys.add((entry['mode'], str(entry['fields']['name']).lower()))
+            keys.add((entry['mode'], str(entry['fields']['id'])))
+        return keys
+
+    def replay(self):
+        """
+        Yield every recorded object.
+        :return: a generator of PokedexObjects.
+        """
+        for entry in self.entries():
+            yield self.CLASSES[entry['class']].from_dict(entry['fields'])
+
+    def open(self, resume: bool):
+        """
+        Open the journal for recording.
+
+        :param resume: keep the recorded entries if True, otherwise start an empty journal.
+        """
+        self.file = open(self.path, mode='a' if resume else 'w', encoding='utf-8')
+        if resume:
+            # Terminate a line cut short by a crash, so the next entry starts on its own line.
+            self.file.write('\n')
+
+    def record(self, pokedexobject):
+        """
+        Append an object to the journal and flush it to disk.
+
+        :param pokedexobject: a PokedexObject.
+        """
+        name = type(pokedexobject).__name__
+        self.file.write(json.dumps({'mode': self.MODES[name], 'class': name, 'fields': pokedexobject.to_dict()},
+                                   separators=(',', ':')) + '\n')
+        self.file.flush()
+
+    def journaled(self, pokedexobjects):
+        """
+        Record each object of the iterable as it passes through.
+
+        :param pokedexobjects: iterable of PokedexObjects.
+        :return: a generator of the same PokedexObjects.
+        """
+        for pokedexobject in pokedexobjects:
+            self.record(pokedexobject)
+            yield pokedexobject
+
+    def close(self):
+        """
+        Close the journal.
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -1,31 +1,194 @@
 """
 Module containing class to handle requests from api.
 """
-import requests
+import collections
 import concurrent
 import concurrent.futures
 
-from pokedexrequest import PokedexRequest
+from pokedexrequest import AsyncPokedexRequest, PokedexRequest
+from pokeretriever.metrics import Metrics
+from pokeretriever.pokeapiretriever import PokeApiRetriever
+from pokeretriever.scheduler import FetchScheduler
+from pokeretriever.transport import ConcurrencyController
+
+
+def get_execute_request(pokedex_request, keep_going: bool, fetch_only: bool):
+    """
+    Return the method of a PokedexRequest or AsyncPokedexRequest each request is executed with.
+
+    :param pokedex_request: a PokedexRequest or AsyncPokedexRequest.
+    :param keep_going: return FailedRequests instead of raising.
+    :param fetch_only: return ResolvedRequests instead of PokedexObjects.
+    :return: a method taking a Request.
+    """
+    if fetch_only:
+        return pokedex_request.fetch_request_or_fail if keep_going else pokedex_request.fetch_request
+    return pokedex_request.execute_request_or_fail if keep_going else pokedex_request.execute_request
 
 
 class PokeApiGetter:
     """
-    downloads poke api and maps num_threads based on how many you want to pass in
+    downloads poke api and maps num_threads based on how many you want to pass in.
+    Every http fetch, including the sub resources of expanded pokemon, runs on one FetchScheduler
+    of max_in_flight threads owned by the getter. When adaptive, a ConcurrencyController set on
+    the transport for the batch tunes how many of them send at once from the api's responses.
     """
 
-    def __init__(self, list_of_requests: list, num_threads: int):
+    def __init__(self, list_of_requests, num_threads: int, max_in_flight: int = 32, in_order: bool = True,
+                 keep_going: bool = False, fetch_only: bool = False, adaptive: bool = False):
         """
-        :param list_of_requests: a list of requests
-        :param num_threads: Max number of threads the session can use.
+        :param list_of_requests: an iterable of requests
+        :param num_threads: Max number of requests processed at once.
+        :param max_in_flight: Max number of http fetches running at once, across every request.
+        :param in_order: Yield results in input order if True, otherwise in completion order.
+        :param keep_going: Yield a FailedRequest for requests that fail instead of raising.
+        :param fetch_only: Yield a ResolvedRequest for each request, leaving the parsing to the caller.
+        :param adaptive: Tune the number of http requests in flight, up to max_in_flight, from their
+        latency and 429 / 5xx responses.
         """
         self.requests = list_of_requests
         self.max_threads = num_threads
+        self.max_in_flight = max_in_flight
+        self.in_order = in_order
+        self.keep_going = keep_going
+        self.fetch_only = fetch_only
+        self.adaptive = adaptive
+        self.coalescer = None
+        self.controller = None
+
+    def get_pokedexobjects_from_api(self):
+        """
+        Yield the PokedexObject processed from each request as soon as it is ready.
+
+        Only a window of requests twice the size of the thread pool is in progress at once, so
+        memory stays flat however many requests there are.
+        :return: generator of PokedexObjects.
+        """
+        transport = PokeApiRetriever.transport
+        if self.adaptive:
+            self.controller = transport.controller = ConcurrencyController(self.max_in_flight)
+        try:
+            yield from self._get_pokedexobjects(transport.create_session())
+        finally:
+            if self.adaptive:
+                transport.controller = None
+
+    def _get_pokedexobjects(self, session):
+        """
+        Execute a bounded window of requests on the thread pool.
+
+        :param session: session used for every fetch.
+        :return: generator of PokedexObjects.
+        """
+        with session, FetchScheduler(session, self.max_in_flight) as scheduler:
+            self.coalescer = scheduler.coalescer
+            execute_request = get_execute_request(PokedexRequest(scheduler), self.keep_going, self.fetch_only)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+                window = self.max_threads * 2
+                if self.in_order:
+                    pending = collections.deque()
+                    for request in self.requests:
+                        pending.append(executor.submit(execute_request, request))
+                        Metrics.depth('requests', len(pending))
+                        if len(pending) >= window:
+                            yield pending.popleft().result()
+                    while pending:
+                        yield pending.popleft().result()
+                else:
+                    pending = set()
+                    for request in self.requests:
+                        pending.add(executor.submit(execute_request, request))
+                        Metrics.depth('requests', len(pending))
+                        while len(pending) >= window:
+                            done, pending = concurrent.futures.wait(
+                                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                            for future in done:
+                                yield future.result()
+                    for future in concurrent.futures.as_completed(pending):
+                        yield future.result()
+
+
+class AsyncPokeApiGetter:
+    """
+    Downloads from poke api on a single asyncio event loop, with a global limit of requests in flight.
+    """
+
+    def __init__(self, list_of_requests, max_in_flight: int, in_order: bool = True, keep_going: bool = False,
+                 fetch_only: bool = False):
+        """
+        :param list_of_requests: an iterable of requests
+        :param max_in_flight: Max number of http requests in flight at once, across every request.
+        :param in_order: Yield results in input order if True, otherwise in completion order.
+        :param keep_going: Yield a FailedRequest for requests that fail instead of raising.
+        :param fetch_only: Yield a ResolvedRequest for each request, leaving the parsing to the caller.
+        """
+        self.requests = list_of_requests
+        self.max_in_flight = max_in_flight
+        self.in_order = in_order
+        self.keep_going = keep_going
+        self.fetch_only = fetch_only
+        self.coalescer = None
+        self.controller = None
 
     def get_pokedexobjects_from_api(self):
         """
-        Return a list of PokedexObjects processed from each request in the list.
-        :return: list of PokedexObjects.
+        Yield the PokedexObject processed from each request as soon as it is ready.
+
+        The event loop only runs while the caller waits for the next result.
+        :return: generator of PokedexObjects.
         """
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_threads) as executor:
-            with requests.Session() as session:
-                return list(executor.map(PokedexRequest(session).execute_request, self.requests))
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+        results = self._get_pokedexobjects()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _get_pokedexobjects(self):
+        """
+        Execute a bounded window of requests concurrently on the running event loop.
+        :return: async generator of PokedexObjects.
+        """
+        import asyncio
+
+        from pokeretriever.asyncpokeapiretriever import AsyncPokeApiRetriever
+
+        retriever = AsyncPokeApiRetriever(self.max_in_flight)
+        pokedex_request = AsyncPokedexRequest(retriever)
+        self.coalescer = pokedex_request.coalescer
+        execute_request = get_execute_request(pokedex_request, self.keep_going, self.fetch_only)
+        window = self.max_in_flight * 2
+        pending = collections.deque() if self.in_order else set()
+        try:
+            for request in self.requests:
+                task = asyncio.ensure_future(execute_request(request))
+                Metrics.depth('requests', len(pending) + 1)
+                if self.in_order:
+                    pending.append(task)
+                    if len(pending) >= window:
+                        yield await pending.popleft()
+                else:
+                    pending.add(task)
+                    while len(pending) >= window:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for finished in done:
+                            yield finished.result()
+
+            if self.in_order:
+                while pending:
+                    yield await pending.popleft()
+            else:
+                for finished in asyncio.as_completed(pending):
+                    yield await finished
+        finally:
+            for task in pending:
+                task.cancel()
+            await retriever.close()
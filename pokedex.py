@@ -1,35 +1,48 @@
 """
 this module contains the pokedex class.
+
+Everything past argument parsing is imported by the method that needs it, so --help and runs
+answered from the cache or snapshot do not pay for the http, asyncio, numpy or server modules.
 """
 import errno
-import multiprocessing
+import itertools
+import os
+import re
 import sys
 
 import args
-from exceptions import InvalidObjectException
-from pokeapigetter import PokeApiGetter
-from pokedexrequest import Request
-from report import Report
+from exceptions import InvalidObjectException, RequestFailedException
 
 
 class PokeDex:
     """
     Represents a pokedex, Drives the program.
     """
+    ID_RANGE = re.compile(r'^(\d+)\s*-\s*(\d+)$')
+
     def __init__(self):
         """
         Constructor.
         """
         self.pokedex_objects = None
         self.arguments = None
+        self.failures = []
+        self.processed = 0
 
     def get_poke_list(self):
         """
-        Return a list of pokemon names from file.
-        :return: a list of pokemon names from file.
+        Return an iterator of pokemon names from the input data, file, stdin if the file is '-', or
+        every entry of the mode with --all.
+        :return: an iterator of pokemon names.
         """
-        if self.arguments.input_file is None:
-            poke_list = [self.arguments.input_data]
+        if self.arguments.all_entries:
+            poke_list = self.list_all('pokemon' if self.arguments.mode == 'analytics' else self.arguments.mode)
+
+        elif self.arguments.input_file is None:
+            poke_list = self.unique_identifiers(self.arguments.input_data.split(','))
+
+        elif self.arguments.input_file == '-':
+            poke_list = self.read_identifiers(sys.stdin)
 
         else:
             try:
@@ -43,15 +56,252 @@ class PokeDex:
                 sys.exit(1)
         return poke_list
 
+    def list_all(self, mode: str):
+        """
+        Yield the name of every entry of a mode, from the snapshot if it has them, otherwise from the
+        paginated list endpoint of the api. Every page after the first is fetched concurrently, and
+        names are yielded as soon as their page arrives.
+
+        :param mode: mode of the entries, a string.
+        :return: a generator of names.
+        """
+        from pokeretriever.pokeapiretriever import PokeApiRetriever
+        from pokeretriever.resources import ResourceRegistry
+        from pokeretriever.scheduler import FetchScheduler
+
+        endpoint = ResourceRegistry.get(mode).endpoint
+        snapshot = PokeApiRetriever.snapshot
+        if snapshot is not None and (self.arguments.offline or snapshot.count(endpoint)):
+            yield from snapshot.names(endpoint)
+            return
+        session = PokeApiRetriever.transport.create_session()
+        with session, FetchScheduler(session, self.arguments.max_in_flight) as scheduler:
+            yield from scheduler.list_names(endpoint)
+
+    def set_up_cache(self):
+        """
+        Configures the response cache and snapshot from the arguments, if they are requested.
+        """
+        from pokeretriever.pokeapiretriever import PokeApiRetriever
+
+        if self.arguments.cache_dir is not None:
+            from pokeretriever.cache import ResponseCache
+
+            ttl = self.arguments.cache_ttl or None
+            PokeApiRetriever.cache = ResponseCache(self.arguments.cache_dir, ttl, self.arguments.cache_max_bytes)
+
+        if self.arguments.snapshot_file is not None and self.arguments.mode != 'snapshot':
+            from pokeretriever.snapshot import SnapshotStore
+
+            PokeApiRetriever.snapshot = SnapshotStore(self.arguments.snapshot_file)
+
+        PokeApiRetriever.offline = self.arguments.offline
+
+    def set_up_transport(self):
+        """
+        Configures the http transport from the arguments, with a connection pool sized to the
+        number of requests in flight.
+        """
+        from pokeretriever.pokeapiretriever import PokeApiRetriever
+        from pokeretriever.transport import Transport
+
+        if self.arguments.base_url is not None:
+            PokeApiRetriever.BASE_URL = self.arguments.base_url
+        PokeApiRetriever.transport = Transport(pool_size=self.arguments.max_in_flight,
+                                               timeout=self.arguments.timeout,
+                                               retries=self.arguments.retries,
+                                               rate_limit=self.arguments.rate_limit)
+
+    def set_up_index(self):
+        """
+        Loads the reverse index from the arguments, if one is requested, and has JSONParser add every
+        pokemon and ability it parses to it outside of query mode.
+
+        :return: a ReverseIndex, or None.
+        """
+        if self.arguments.index_file is None:
+            return None
+        from pokeretriever.jsonparser import JSONParser
+        from pokeretriever.reverseindex import ReverseIndex
+
+        index = ReverseIndex.load(self.arguments.index_file)
+        if self.arguments.mode != 'query':
+            JSONParser.index = index
+        return index
+
+    def run_queries(self, index):
+        """
+        Answers each 'kind:name' input from the reverse index.
+
+        :param index: the ReverseIndex.
+        """
+        from pokeretriever.reverseindex import ReverseIndex
+        from report import Report
+
+        queries = []
+        for query in self.get_poke_list():
+            kind, _, name = query.partition(':')
+            kind = kind.strip().lower()
+            if kind not in ReverseIndex.KINDS or not name.strip():
+                print(f'Invalid query: "{query}", expected one of ' +
+                      ', '.join(f"'{kind}:NAME'" for kind in ReverseIndex.KINDS))
+                sys.exit(2)
+            queries.append((kind, name.strip().lower()))
+
+        Report.query_report(((kind, name, index.query(kind, name, self.arguments.max_level))
+                             for kind, name in queries), self.arguments.output_file)
+
+    def serve(self):
+        """
+        Serves lookups with a warm session and cache until interrupted.
+        """
+        from server import LookupService, PokedexServer
+
+        service = LookupService(self.arguments.max_in_flight, self.arguments.lru_size)
+        server = PokedexServer(service, self.arguments.listen, self.arguments.socket_path)
+        print(f'Serving lookups on {server.address}', file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            service.close()
+
+    def build_snapshot(self):
+        """
+        Crawls every entry of the api into the snapshot file.
+        """
+        from pokeretriever.pokeapiretriever import PokeApiRetriever
+        from pokeretriever.scheduler import FetchScheduler
+        from pokeretriever.snapshot import SnapshotBuilder, SnapshotStore
+
+        store = SnapshotStore(self.arguments.snapshot_file)
+        session = PokeApiRetriever.transport.create_session()
+        with session, FetchScheduler(session, self.arguments.max_in_flight) as scheduler:
+            builder = SnapshotBuilder(store, scheduler)
+            for mode in SnapshotStore.MODES:
+                print(f'Snapshot {mode}: {builder.build(mode)} entries')
+
+    def collect_failures(self, results):
+        """
+        Yield the PokedexObjects of the results, setting the FailedRequests aside.
+
+        :param results: iterable of PokedexObjects, Rendered and FailedRequests.
+        :return: a generator of PokedexObjects and Rendered.
+        """
+        from pokedexrequest import FailedRequest
+        from report import Rendered
+
+        for result in results:
+            self.processed += result.count if isinstance(result, Rendered) else 1
+            if isinstance(result, FailedRequest):
+                self.failures.append(result)
+            else:
+                yield result
+
+    def report_failures(self):
+        """
+        Print a summary of the failed requests to stderr, and exit with an error if there are any.
+        """
+        if not self.failures:
+            return
+        print(f'Failed {len(self.failures)} of {self.processed} requests:', file=sys.stderr)
+        for failure in self.failures:
+            print(f'\t{failure}', file=sys.stderr)
+        sys.exit(2)
+
+    def report_metrics(self, coalescer, controller=None):
+        """
+        Add the cache, coalescer and concurrency counters to the metrics, then print them and write
+        them to the metrics file, as requested.
+
+        :param coalescer: the RequestCoalescer of the batch, or None.
+        :param controller: the ConcurrencyController of the batch, or None.
+        """
+        import json
+
+        from pokeretriever.metrics import Metrics
+        from pokeretriever.pokeapiretriever import PokeApiRetriever
+
+        cache = PokeApiRetriever.cache
+        if cache is not None:
+            for counter in ('hits', 'misses', 'revalidated', 'bytes_saved'):
+                Metrics.count(f'cache.{counter}', getattr(cache, counter))
+        if coalescer is not None:
+            Metrics.count('coalescer.requested', coalescer.requested)
+            Metrics.count('coalescer.saved', coalescer.saved)
+        if controller is not None:
+            for counter, value in controller.stats().items():
+                Metrics.count(f'concurrency.{counter}', value)
+        Metrics.count('requests.processed', self.processed)
+        Metrics.count('requests.failed', len(self.failures))
+
+        if self.arguments.stats:
+            print(Metrics.summary(), file=sys.stderr)
+        if self.arguments.metrics_file is not None:
+            with open(self.arguments.metrics_file, 'w', encoding='utf-8') as file:
+                json.dump(Metrics.to_dict(), file, indent=2)
+
+    def check_analytics(self):
+        """
+        Checks the analytics options before anything is fetched, exiting if one is invalid.
+        """
+        from pokeretriever.stattable import StatTable
+
+        try:
+            for condition in self.arguments.where:
+                StatTable.parse_condition(condition)
+            for function in self.get_aggregates():
+                if function not in StatTable.AGGREGATES:
+                    raise ValueError(f'Unknown aggregate: "{function}", expected one of '
+                                     f'{", ".join(StatTable.AGGREGATES)}')
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+
+    def get_aggregates(self):
+        """
+        :return: the list of aggregates requested in analytics mode.
+        """
+        if not self.arguments.aggregate:
+            return []
+        return [function.strip().lower() for function in self.arguments.aggregate.split(',') if function.strip()]
+
+    def execute_analytics(self):
+        """
+        Loads the base stats of the pokemon into a StatTable, then filters, sorts and aggregates them.
+        """
+        from pokeretriever.stattable import StatTable
+        from report import Report
+
+        table = StatTable.from_pokemon(self.pokedex_objects)
+        try:
+            for condition in self.arguments.where:
+                table.where(condition)
+            if self.arguments.sort is not None:
+                column, _, direction = self.arguments.sort.lower().partition(':')
+                table.sort(column.strip(), direction.strip() == 'desc')
+            if self.arguments.top is not None:
+                table.top(self.arguments.top)
+            aggregates = {function: table.aggregate(function) for function in self.get_aggregates()}
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        Report.analytics_report(table, aggregates, self.arguments.output_file, self.arguments.output_format)
+
     def execute_report(self):
         """
         Formats the report.
         """
+        if self.arguments.mode == 'analytics':
+            self.execute_analytics()
+            return
+
+        from report import Report
+
         if self.arguments.output_file is None:
-            Report.console_report(self.pokedex_objects)
+            Report.console_report(self.pokedex_objects, self.arguments.output_format)
 
         else:
-            Report.file_output_report(self.pokedex_objects, self.arguments.output_file)
+            Report.file_output_report(self.pokedex_objects, self.arguments.output_file, self.arguments.output_format)
 
     def start(self):
         """
@@ -59,28 +309,190 @@ class PokeDex:
         :return: none.
         """
         self.arguments = args.ArgumentParser.set_parser()
+        from pokeretriever.metrics import Metrics
+
+        if self.arguments.stats or self.arguments.metrics_file is not None:
+            Metrics.enable()
+
+        self.set_up_cache()
+        self.set_up_transport()
+        index = self.set_up_index()
+
+        if self.arguments.mode == 'serve':
+            try:
+                self.serve()
+            finally:
+                if index is not None:
+                    index.save()
+            return
+
+        if self.arguments.mode == 'query':
+            if not len(index):
+                print('Index file not found or empty')
+                sys.exit(1)
+            self.run_queries(index)
+            return
+
+        if self.arguments.mode == 'snapshot':
+            try:
+                self.build_snapshot()
+            except RequestFailedException as e:
+                print(e)
+                sys.exit(2)
+            return
+
+        if self.arguments.mode == 'analytics':
+            self.check_analytics()
 
         poke_list = self.get_poke_list()
 
-        requests = []
+        from pokedexrequest import Request
 
-        for item in poke_list:
-            requests.append(Request(self.arguments.mode, item, self.arguments.expanded, 4))
+        # Requests are created lazily, as the getter's window of in progress requests frees up.
+        # Analytics only needs the base stats of non expanded pokemon.
+        if self.arguments.mode == 'analytics':
+            pokedex_requests = (Request('pokemon', item, False) for item in poke_list)
+        else:
+            pokedex_requests = (self.make_request(item) for item in poke_list)
 
-        api_call = PokeApiGetter(requests, multiprocessing.cpu_count())
+        journal = None
+        if self.arguments.journal_file is not None:
+            from journal import Journal
 
+            journal = Journal(self.arguments.journal_file)
+            if self.arguments.resume:
+                completed = journal.completed()
+                pokedex_requests = (request for request in pokedex_requests
+                                    if (request.mode, request.identifier.strip().lower()) not in completed)
+            journal.open(self.arguments.resume)
+
+        in_order = self.arguments.order == 'input'
+        keep_going = self.arguments.keep_going
+        in_processes = self.arguments.parallel == 'process'
+        if self.arguments.engine == 'async':
+            from pokeapigetter import AsyncPokeApiGetter
+
+            api_call = AsyncPokeApiGetter(pokedex_requests, self.arguments.max_in_flight, in_order, keep_going,
+                                          in_processes)
+        else:
+            from pokeapigetter import PokeApiGetter
+
+            # The getter's threads mostly wait on fetches, so there are as many as fetches in flight.
+            threads = self.arguments.max_in_flight if in_processes else self.arguments.workers
+            api_call = PokeApiGetter(pokedex_requests, threads or self.arguments.max_in_flight,
+                                     self.arguments.max_in_flight, in_order, keep_going, in_processes,
+                                     self.arguments.concurrency == 'adaptive')
+
+        # Results are streamed, so invalid objects surface while the report is being written.
+        results = api_call.get_pokedexobjects_from_api()
+        if in_processes:
+            from renderpool import RenderPool
+            from report import Report
+
+            workers = self.arguments.workers or os.cpu_count() or 1
+            separator = Report.CONSOLE_SEPARATOR if self.arguments.output_file is None else Report.FILE_SEPARATOR
+            results = RenderPool(workers, self.arguments.output_format, separator, in_order=in_order,
+                                 keep_going=keep_going).render(results)
+        self.pokedex_objects = self.collect_failures(results)
+        if journal is not None:
+            # Results finished by an earlier run are replayed from the journal, not requested again.
+            self.pokedex_objects = itertools.chain(journal.replay() if self.arguments.resume else (),
+                                                   journal.journaled(self.pokedex_objects))
         try:
-            self.pokedex_objects = api_call.get_pokedexobjects_from_api()
-        except InvalidObjectException as e:
+            with Metrics.timer('batch'):
+                self.execute_report()
+        except (InvalidObjectException, RequestFailedException) as e:
             print(e)
             sys.exit(2)
+        except ImportError as e:
+            print(e)
+            sys.exit(1)
+        finally:
+            if journal is not None:
+                journal.close()
+            if index is not None:
+                index.save()
 
-        self.execute_report()
+        if api_call.coalescer is not None and api_call.coalescer.saved:
+            print(f'Deduplicated {api_call.coalescer.saved} of {api_call.coalescer.requested} fetches',
+                  file=sys.stderr)
 
-    @staticmethod
-    def get_pokemon_in_file(file_name) -> list:
-        with open(file_name, mode='r', encoding='utf-8') as file:
-            return [line.strip('\n') for line in file]
+        from pokeretriever.pokeapiretriever import PokeApiRetriever
+
+        cache = PokeApiRetriever.cache
+        if cache is not None and cache.revalidated:
+            print(f'Revalidated {cache.revalidated} cached responses, saving {cache.bytes_saved} bytes',
+                  file=sys.stderr)
+
+        if Metrics.enabled:
+            self.report_metrics(api_call.coalescer, api_call.controller)
+
+        self.report_failures()
+
+    def make_request(self, item: str):
+        """
+        Return the Request of an input identifier in the mode of the program. An identifier prefixed
+        with the mode of a resource, like 'type:fire' or 'species:eevee', requests that resource
+        instead, so one batch can report on several resources.
+
+        :param item: name / id of the entry, optionally prefixed with 'mode:'.
+        :return: a Request.
+        """
+        from pokedexrequest import Request
+        from pokeretriever.resources import ResourceRegistry
+
+        mode, separator, identifier = item.partition(':')
+        mode = mode.strip().lower()
+        if separator and mode in ResourceRegistry.resources:
+            return Request(mode, identifier.strip(), self.arguments.expanded)
+        return Request(self.arguments.mode, item, self.arguments.expanded)
+
+    @classmethod
+    def get_pokemon_in_file(cls, file_name):
+        """
+        Open the file and return an iterator of the pokemon names in it.
+        The file is opened immediately so errors surface before any work begins.
+
+        :param file_name: path of the file.
+        :return: an iterator of pokemon names.
+        """
+        return cls.read_identifiers(open(file_name, mode='r', encoding='utf-8'))
+
+    @classmethod
+    def read_identifiers(cls, file):
+        """
+        Yield each identifier of an open file one line at a time, and close the file once it is
+        exhausted.
+
+        :param file: an open text file.
+        :return: a generator of identifiers.
+        """
+        with file:
+            yield from cls.unique_identifiers(file)
+
+    @classmethod
+    def unique_identifiers(cls, lines):
+        """
+        Yield each identifier of the lines, expanding ranges of ids such as '1-151' into every id,
+        and skipping blank and duplicate identifiers.
+
+        :param lines: iterable of strings.
+        :return: a generator of identifiers.
+        """
+        seen = set()
+        for line in lines:
+            identifier = line.strip()
+            match = cls.ID_RANGE.match(identifier)
+            if match is not None and int(match.group(1)) <= int(match.group(2)):
+                identifiers = map(str, range(int(match.group(1)), int(match.group(2)) + 1))
+            else:
+                identifiers = (identifier,)
+            for identifier in identifiers:
+                key = identifier.lower()
+                if not identifier or key in seen:
+                    continue
+                seen.add(key)
+                yield identifier
 
 
 def main():
@@ -0,0 +1,117 @@
+"""
+Thin command line client of a pokedex.py server, for quick lookups without paying the startup of a
+full run.
+
+usage: python pokedexclient.py [--url URL | --socket PATH] [--expanded] [--format FORMAT] mode identifier...
+"""
+import argparse
+import http.client
+import socket
+import sys
+from urllib.parse import quote, urlsplit
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    Http connection over a unix socket.
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor.
+
+        :param path: path of the unix socket.
+        """
+        super().__init__('localhost')
+        self.path = path
+
+    def connect(self):
+        """
+        Connect to the unix socket.
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+class PokedexClient:
+    """
+    Looks entries up on a pokedex.py server over one keep-alive connection.
+    """
+
+    def __init__(self, url: str = 'http://127.0.0.1:8787', socket_path: str = None):
+        """
+        Constructor.
+
+        :param url: url of a server listening on tcp.
+        :param socket_path: path of the unix socket of a server, used instead of url.
+        """
+        if socket_path is not None:
+            self.connection = UnixHTTPConnection(socket_path)
+        else:
+            parts = urlsplit(url)
+            self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+
+    def lookup(self, mode: str, identifier: str, expanded: bool = False, output_format: str = 'text') -> tuple:
+        """
+        Look an entry up.
+
+        :param mode: mode of the entry.
+        :param identifier: name / id of the entry.
+        :param expanded: expanded information about a pokemon.
+        :param output_format: format of the answer.
+        :return: a tuple of the http status and the body bytes.
+        """
+        path = f'/{mode}/{quote(identifier.strip(), safe="")}?format={output_format}'
+        if expanded:
+            path += '&expanded=1'
+        self.connection.request('GET', path)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        self.connection.close()
+
+
+def main():
+    """
+    Look up every identifier given and print the answers, exiting with 2 if any lookup failed.
+    """
+    parser = argparse.ArgumentParser(description='Look entries up on a running "pokedex.py serve".')
+    parser.add_argument('--url', default='http://127.0.0.1:8787', help='Url of the server.')
+    parser.add_argument('--socket', dest='socket_path', help='Path of the unix socket of the server.')
+    parser.add_argument('--expanded', action='store_true', help='Expanded information about a pokemon.')
+    parser.add_argument('--format', dest='output_format', default='text', choices=['text', 'jsonl', 'csv', 'msgpack'],
+                        help="Format of the answers. Defaults to 'text'.")
+    # The server rejects modes it has no resource for, so the client does not repeat the list.
+    parser.add_argument('mode', help="Mode of the lookups, a resource of the server like 'pokemon' or 'type'.")
+    parser.add_argument('identifiers', nargs='+', help='Names / ids to look up.')
+    arguments = parser.parse_args()
+
+    client = PokedexClient(arguments.url, arguments.socket_path)
+    failed = False
+    try:
+        for identifier in arguments.identifiers:
+            status, body = client.lookup(arguments.mode, identifier, arguments.expanded, arguments.output_format)
+            if status != 200:
+                failed = True
+                print(body.decode(errors='replace'), file=sys.stderr)
+            elif arguments.output_format == 'msgpack':
+                sys.stdout.buffer.write(body)
+            else:
+                sys.stdout.write(body.decode())
+                if arguments.output_format == 'text':
+                    sys.stdout.write('\n')
+    except OSError as e:
+        print(f'Could not reach the server: {e}', file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+    if failed:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,11 @@
 """
 Module contains the classes to make requests from the pokemon api.
 """
-
-from pokeretriever.jsonparser import JSONParser
-from pokeretriever.pokeapiretriever import PokeApiRetriever
+from exceptions import InvalidObjectException, RequestFailedException
+from pokeretriever.coalescer import AsyncRequestCoalescer
+from pokeretriever.metrics import Metrics
 from pokeretriever.pokeretriever import *
+from pokeretriever.resources import ResourceRegistry
 
 
 class Request:
@@ -12,39 +13,98 @@ class Request:
     Contains the data gathered by argparse.
     """
 
-    def __init__(self, mode: str, identifier: str, expanded: bool,
-                 threads=1):
+    def __init__(self, mode: str, identifier: str, expanded: bool):
         """
         Constructor.
 
         :param mode: mode the program is ran in.
         :param identifier: the name / id number of the Pokemon
         :param expanded: an option of getting more information about a pokemon.
-        :param threads: max num_threads the request can use.
         """
         self.mode = mode
         self.identifier = identifier
         self.expanded = expanded
-        self.threads = threads
 
     def __str__(self):
         """Returns the current state of the request"""
         return f'current state of Request={str(vars(self))}'
 
 
+class FailedRequest:
+    """
+    Result of a request that could not be turned into a PokedexObject.
+    """
+
+    def __init__(self, request: Request, error: Exception):
+        """
+        Constructor.
+
+        :param request: the Request that failed.
+        :param error: the exception it failed with.
+        """
+        self.request = request
+        self.error = error
+
+    def __str__(self):
+        """Returns the identifier of the request and why it failed"""
+        return f'{self.request.mode} "{self.request.identifier}": {self.error}'
+
+
+class ResolvedRequest:
+    """
+    A request whose json has been fetched, ready to be parsed without the api.
+    """
+
+    def __init__(self, request: Request, json, sub_resource_jsons=None):
+        """
+        Constructor.
+
+        :param request: the Request that was fetched.
+        :param json: json of the requested entry.
+        :param sub_resource_jsons: dict of mode to list of json, for an expanded entry.
+        """
+        self.request = request
+        self.json = json
+        self.sub_resource_jsons = sub_resource_jsons
+
+    def parse(self) -> PokedexObject:
+        """
+        Creates the concrete inheritor of PokedexObject from the fetched json.
+
+        :return: a PokedexObject
+        :raises MalformedObjectException: if the json does not have the shape the parser reads.
+        """
+        with Metrics.timer('parse'):
+            return ResourceRegistry.get(self.request.mode).build(self.request.identifier, self.json,
+                                                                 self.sub_resource_jsons)
+
+
 class PokedexRequest:
     """
     Represents a pokedex request.
     """
     instance = None
 
-    def __init__(self, session):
+    def __init__(self, scheduler):
         """
         Constructor.
 
-        :param session: Current session.
+        :param scheduler: FetchScheduler every fetch of the batch runs on.
         """
-        PokedexRequest.instance = session
+        PokedexRequest.instance = scheduler
+
+    @classmethod
+    def get_json(cls, instance, mode: str, name: str, coalesce: bool = True):
+        """
+        Gets json from api through the shared scheduler, waiting for the fetch to finish.
+
+        :param instance: The FetchScheduler.
+        :param mode: Mode the program is ran in.
+        :param name: name / id of the entry
+        :param coalesce: share the fetch with identical lookups, False for entries looked up only once.
+        :return: Json response.
+        """
+        return instance.submit(mode, name, coalesce).result()
 
     @classmethod
     def execute_request(cls, request: Request) -> PokedexObject:
@@ -54,67 +114,148 @@ class PokedexRequest:
         :param request: a PokedexObject
         :return: a PokedexObject
         """
-        mode = request.mode
-        if mode == 'pokemon':
-            return cls.get_pokemon(cls.instance, mode, request.identifier, request.expanded, request.threads)
-        elif mode == 'stat':
-            return cls.get_stats(cls.instance, mode, request.identifier)
-        elif mode == 'ability':
-            return cls.get_ability(cls.instance, mode, request.identifier)
-        elif mode == 'move':
-            return cls.get_move(cls.instance, mode, request.identifier)
+        return cls.fetch_request(request).parse()
 
     @classmethod
-    def get_pokemon(cls, instance, mode: str, name: str, expanded=False, threads=1):
+    def execute_request_or_fail(cls, request: Request):
         """
-        Gets the pokemon from api by name.
+        Creates a concrete inheritor of PokedexObject from request, returning a FailedRequest instead
+        of raising if the entry is invalid or malformed, or the api could not be reached.
 
-        :param mode: Mode the program is ran in.
-        :param instance: The thread instance.
-        :param name: name / id of the pokemon
-        :param expanded: if expanded info is requested
-        :param threads: max number of num_threads allowed
-        :return: a Pokemon object.
-        """
-        json = PokeApiRetriever.get_json_from_api(instance, mode, name)
-        if expanded:
-            return JSONParser.parse_json_to_pokemon_extended(json, threads)
-        else:
-            return JSONParser.parse_json_to_pokemon_not_extended(json)
+        :param request: a Request
+        :return: a PokedexObject or a FailedRequest
+        """
+        try:
+            return cls.execute_request(request)
+        except (InvalidObjectException, RequestFailedException) as error:
+            return FailedRequest(request, error)
 
     @classmethod
-    def get_stats(cls, instance, mode: str, name: str):
+    def fetch_request(cls, request: Request) -> ResolvedRequest:
         """
-        Gets the stats from api by name.
+        Fetches the json of request and of its sub resources, leaving the parsing to the caller.
 
-        :param mode: Mode the program is ran in.
-        :param instance: The thread instance.
-        :param name: name / id of the stats
-        :return: a Stats object.
+        :param request: a Request
+        :return: a ResolvedRequest
         """
-        json = PokeApiRetriever.get_json_from_api(instance, mode, name)
-        return JSONParser.parse_json_to_stats(json)
+        resource = ResourceRegistry.get(request.mode)
+        # Identifiers of a batch are unique, so only sub resources are worth coalescing and retaining.
+        json = cls.get_json(cls.instance, resource.endpoint, request.identifier, coalesce=False)
+        if request.expanded and resource.expandable:
+            sub_resource_jsons = cls.get_sub_resource_jsons(cls.instance, json, resource, request.identifier)
+            return ResolvedRequest(request, json, sub_resource_jsons)
+        return ResolvedRequest(request, json)
 
     @classmethod
-    def get_ability(cls, instance, mode: str, name: str):
+    def fetch_request_or_fail(cls, request: Request):
         """
-        Gets the ability from api by name.
+        Fetches the json of request, returning a FailedRequest instead of raising if the entry is
+        invalid or malformed, or the api could not be reached.
 
-        :param mode: Mode the program is ran in.
-        :param instance: The thread instance.
-        :param name: name / id of the ability
-        :return: an Ability object.
+        :param request: a Request
+        :return: a ResolvedRequest or a FailedRequest
         """
-        json = PokeApiRetriever.get_json_from_api(instance, mode, name)
-        return JSONParser.parse_for_abilities(json)
+        try:
+            return cls.fetch_request(request)
+        except (InvalidObjectException, RequestFailedException) as error:
+            return FailedRequest(request, error)
 
-    @classmethod
-    def get_move(cls, instance, mode: str, name: str):
+    @staticmethod
+    def get_sub_resource_jsons(instance, json, resource, identifier: str) -> dict:
+        """
+        Gets the json of every sub resource of an entry, like the stats, abilities and moves of a
+        pokemon.
+
+        :param instance: The FetchScheduler.
+        :param json: json of the entry.
+        :param resource: the Resource of the entry.
+        :param identifier: name / id the entry was requested by.
+        :return: dict of mode to list of json.
+        """
+        # Schedule every sub resource before waiting on any, so they are fetched concurrently.
+        futures = {sub_mode: [instance.submit(ResourceRegistry.get(sub_mode).endpoint, sub_name) for sub_name in names]
+                   for sub_mode, names in resource.sub_resources(identifier, json).items()}
+        return {sub_mode: [future.result() for future in sub_futures] for sub_mode, sub_futures in futures.items()}
+
+
+class AsyncPokedexRequest:
+    """
+    Represents a pokedex request executed on an asyncio event loop.
+    """
+    def __init__(self, retriever):
+        """
+        Constructor.
+
+        :param retriever: an AsyncPokeApiRetriever shared by every request on the loop.
+        """
+        self.retriever = retriever
+        self.coalescer = AsyncRequestCoalescer()
+
+    async def execute_request_or_fail(self, request: Request):
+        """
+        Creates a concrete inheritor of PokedexObject from request, returning a FailedRequest instead
+        of raising if the entry is invalid or malformed, or the api could not be reached.
+
+        :param request: a Request
+        :return: a PokedexObject or a FailedRequest
+        """
+        try:
+            return await self.execute_request(request)
+        except (InvalidObjectException, RequestFailedException) as error:
+            return FailedRequest(request, error)
+
+    async def get_json(self, mode: str, name: str, coalesce: bool = True):
         """
+        Gets json from api, sharing identical lookups across the batch.
+
         :param mode: Mode the program is ran in.
-        :param instance: The thread instance.
-        :param name: name / id of the move
-        :return: Move
+        :param name: name / id of the entry
+        :param coalesce: share the fetch with identical lookups, False for entries looked up only once.
+        :return: Json response.
+        """
+        if not coalesce:
+            return await self.retriever.get_json_from_api(mode, name)
+        return await self.coalescer.get(mode, name, lambda: self.retriever.get_json_from_api(mode, name))
+
+    async def execute_request(self, request: Request) -> PokedexObject:
+        """
+        Creates a concrete inheritor of PokedexObject from request.
+
+        :param request: a Request
+        :return: a PokedexObject
+        """
+        resolved = await self.fetch_request(request)
+        return resolved.parse()
+
+    async def fetch_request_or_fail(self, request: Request):
         """
-        json = PokeApiRetriever.get_json_from_api(instance, mode, name)
-        return JSONParser.parse_json_to_move(json)
+        Fetches the json of request, returning a FailedRequest instead of raising if the entry is
+        invalid or malformed, or the api could not be reached.
+
+        :param request: a Request
+        :return: a ResolvedRequest or a FailedRequest
+        """
+        try:
+            return await self.fetch_request(request)
+        except (InvalidObjectException, RequestFailedException) as error:
+            return FailedRequest(request, error)
+
+    async def fetch_request(self, request: Request) -> ResolvedRequest:
+        """
+        Fetches the json of request and of its sub resources, leaving the parsing to the caller.
+
+        :param request: a Request
+        :return: a ResolvedRequest
+        """
+        import asyncio
+
+        resource = ResourceRegistry.get(request.mode)
+        json = await self.get_json(resource.endpoint, request.identifier, coalesce=False)
+        if not request.expanded or not resource.expandable:
+            return ResolvedRequest(request, json)
+
+        sub_resources = resource.sub_resources(request.identifier, json)
+        jsons = await asyncio.gather(
+            *(asyncio.gather(*(self.get_json(ResourceRegistry.get(mode).endpoint, name) for name in names))
+              for mode, names in sub_resources.items()))
+        return ResolvedRequest(request, json, dict(zip(sub_resources, jsons)))
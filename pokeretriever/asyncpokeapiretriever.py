@@ -0,0 +1,230 @@
+"""
+Module contains class that gets JSON from api on an asyncio event loop.
+"""
+import asyncio
+from urllib.parse import urljoin, urlsplit
+
+from exceptions import RequestFailedException
+from pokeretriever.metrics import Metrics
+from pokeretriever.pokeapiretriever import PokeApiRetriever
+
+
+class AsyncPokeApiRetriever:
+    """
+    Class responsible for getting information from url without blocking the event loop.
+
+    Keeps idle keep-alive connections open per host so consecutive requests reuse them, and
+    limits the number of requests in flight across the whole loop with a semaphore. Redirects are
+    followed up to MAX_REDIRECTS times, as requests does for the thread engine.
+    """
+    REDIRECTS = (301, 302, 303, 307, 308)
+    MAX_REDIRECTS = 5
+
+    def __init__(self, max_in_flight: int):
+        """
+        Constructor.
+
+        :param max_in_flight: max number of requests allowed in flight at once.
+        """
+        self.max_in_flight = max_in_flight
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._idle_connections = {}
+        self._ssl_context = None
+
+    async def get_json_from_api(self, mode, name):
+        """
+        Return json from the snapshot or cache if present, otherwise from url.
+
+        :param mode: Mode of api, a string.
+        :param name: Name of entry, a string.
+        :return: Json response.
+        """
+        data, stale = PokeApiRetriever.get_local_json(mode, name)
+        if data is not None:
+            return data
+
+        url = f"{PokeApiRetriever.BASE_URL}/{mode}/{name}"
+        headers = stale.conditional_headers() if stale is not None else {}
+        for _ in range(self.MAX_REDIRECTS + 1):
+            status, response_headers, body = await self._get_with_retries(url, name, headers)
+            if status not in self.REDIRECTS or 'location' not in response_headers:
+                break
+            url = urljoin(url, response_headers['location'])
+        else:
+            raise RequestFailedException(name, f'more than {self.MAX_REDIRECTS} redirects')
+        return PokeApiRetriever.resolve_response(mode, name, status, body, stale, response_headers.get('etag'),
+                                                 response_headers.get('last-modified'))
+
+    async def _get_with_retries(self, url, name, headers):
+        """
+        Send a GET request with the timeout, retries, backoff and rate limit of the transport.
+
+        :param url: url to request, a string.
+        :param name: Name of entry, a string, reported if the request fails.
+        :param headers: extra request headers, a dict.
+        :return: a tuple of the status code, lower case headers and body bytes.
+        """
+        transport = PokeApiRetriever.transport
+        attempt = 0
+        while True:
+            if transport.limiter is not None:
+                await asyncio.sleep(transport.limiter.reserve())
+            try:
+                async with self._semaphore:
+                    Metrics.track('http', 1)
+                    try:
+                        with Metrics.timer('http'):
+                            status, response_headers, body = await asyncio.wait_for(self._get(url, headers),
+                                                                                    transport.timeout)
+                    finally:
+                        Metrics.track('http', -1)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+                Metrics.count('http.errors')
+                if attempt >= transport.retries:
+                    raise RequestFailedException(name, repr(error))
+                await asyncio.sleep(transport.retry_delay(attempt))
+            else:
+                Metrics.count(f'http.status.{status}')
+                Metrics.count('http.bytes', len(body))
+                if not transport.should_retry(attempt, status):
+                    return status, response_headers, body
+                await asyncio.sleep(transport.retry_delay(attempt, response_headers.get('retry-after')))
+            attempt += 1
+
+    async def _get(self, url, headers):
+        """
+        Send a GET request, retrying once on a fresh connection if a reused one was closed.
+
+        :param url: url to request, a string.
+        :param headers: extra request headers, a dict.
+        :return: a tuple of the status code, headers and body bytes.
+        """
+        parts = urlsplit(url)
+        host_key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path += f'?{parts.query}'
+
+        connection, reused = await self._acquire(host_key)
+        send = self._send
+        try:
+            status, response_headers, body, keep_alive = await send(connection, parts.hostname, path, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            connection[1].close()
+            if not reused:
+                raise
+            connection = await self._open(host_key)
+            try:
+                status, response_headers, body, keep_alive = await send(connection, parts.hostname, path, headers)
+            except BaseException:
+                connection[1].close()
+                raise
+        except BaseException:
+            # Cancelled or timed out mid response, the connection can not be reused.
+            connection[1].close()
+            raise
+
+        if keep_alive:
+            self._idle_connections.setdefault(host_key, []).append(connection)
+        else:
+            connection[1].close()
+        return status, response_headers, body
+
+    async def _acquire(self, host_key):
+        """
+        Return an idle connection to the host, opening a new one if none is idle.
+
+        :param host_key: tuple of the scheme, host and port.
+        :return: a tuple of the connection and whether it was reused.
+        """
+        idle = self._idle_connections.get(host_key)
+        while idle:
+            connection = idle.pop()
+            if not connection[0].at_eof():
+                return connection, True
+            connection[1].close()
+        return await self._open(host_key), False
+
+    async def _open(self, host_key):
+        """
+        Open a new connection to the host.
+
+        :param host_key: tuple of the scheme, host and port.
+        :return: a tuple of a StreamReader and StreamWriter.
+        """
+        scheme, host, port = host_key
+        if scheme == 'https':
+            import ssl
+
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return await asyncio.open_connection(host, port or 443, ssl=self._ssl_context)
+        return await asyncio.open_connection(host, port or 80)
+
+    @staticmethod
+    async def _send(connection, host, path, headers):
+        """
+        Write a GET request on the connection and read the response.
+
+        :param connection: tuple of a StreamReader and StreamWriter.
+        :param host: host header value, a string.
+        :param path: path of the request, a string.
+        :param headers: extra request headers, a dict.
+        :return: a tuple of the status code, headers, body bytes and whether the connection can be reused.
+        """
+        reader, writer = connection
+        extra_headers = ''.join(f'{key}: {value}\r\n' for key, value in headers.items())
+        writer.write(f'GET {path} HTTP/1.1\r\n'
+                     f'Host: {host}\r\n'
+                     f'Accept: application/json\r\n'
+                     f'Accept-Encoding: identity\r\n'
+                     f'{extra_headers}'
+                     f'Connection: keep-alive\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+
+        # A 1xx response, like 103 Early Hints, is an interim message: the final response follows it.
+        status = 100
+        while 100 <= status < 200:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError('Connection closed by server')
+            status = int(status_line.split()[1])
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if status in (204, 304):
+            # These responses never have a body, whatever their headers say (RFC 7230 3.3.3).
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, headers, body, keep_alive
+
+    async def close(self):
+        """
+        Close every idle connection.
+        """
+        for connections in self._idle_connections.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle_connections.clear()
@@ -0,0 +1,247 @@
+"""
+Module contains class that caches api responses on disk.
+"""
+import collections
+import json
+import os
+import threading
+import time
+from urllib.parse import quote
+
+from pokeretriever.fieldextractor import FieldExtractor
+
+
+class CacheEntry:
+    """
+    A cached response with the validators the api sent with it.
+    """
+
+    def __init__(self, data, stored_at: float, fresh: bool, size: int, etag: str = None,
+                 last_modified: str = None, body_size: int = 0):
+        """
+        Constructor.
+
+        :param data: Json of the response.
+        :param stored_at: time the response was stored or last revalidated.
+        :param fresh: whether the entry is still within the cache ttl.
+        :param size: size of the stored entry in bytes.
+        :param etag: ETag header of the response.
+        :param last_modified: Last-Modified header of the response.
+        :param body_size: size in bytes of the response body the json was decoded from.
+        """
+        self.data = data
+        self.stored_at = stored_at
+        self.fresh = fresh
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_size = body_size
+
+    def conditional_headers(self) -> dict:
+        """
+        Return the headers that ask the api to answer 304 Not Modified if the entry is unchanged.
+        :return: a dict.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of api responses, keyed by (mode, identifier).
+
+    Each entry is stored as its own json file under cache_dir/mode/, with the
+    ETag and Last-Modified validators of the response. Entries older than ttl
+    seconds are stale: they are revalidated with a conditional request instead
+    of downloaded again. The least recently used entries are evicted once the
+    total size of the cache exceeds max_bytes, down to LOW_WATER of it so the next
+    puts do not evict again. The directory is only scanned for the sizes of the stored
+    entries on the first put of a cache with a max_bytes, so runs answered from the
+    cache never walk it.
+    """
+    LOW_WATER = 0.9
+
+    def __init__(self, cache_dir: str, ttl: float = None, max_bytes: int = None):
+        """
+        Constructor.
+
+        :param cache_dir: path of the directory the cache is stored in.
+        :param ttl: seconds an entry stays fresh, None to never expire.
+        :param max_bytes: max size of the cache in bytes, None for unbounded.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        # Size of every stored entry by path, least recently used first. None until loaded.
+        self._sizes = None
+        self._total_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _load_sizes(self):
+        """
+        Scan the cache directory to find the size of every stored entry, ordered by the time they
+        were last used. Must be called while holding the lock.
+        """
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if file_name.endswith('.json'):
+                    try:
+                        stat = os.stat(os.path.join(root, file_name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, os.path.join(root, file_name), stat.st_size))
+        entries.sort()
+        self._sizes = collections.OrderedDict((path, size) for _, path, size in entries)
+        self._total_bytes = sum(self._sizes.values())
+
+    def _touch(self, path: str):
+        """
+        Mark an entry as the most recently used one.
+
+        :param path: path of the entry.
+        """
+        with self._lock:
+            if self._sizes is not None and path in self._sizes:
+                self._sizes.move_to_end(path)
+
+    def _path(self, mode: str, identifier) -> str:
+        """
+        Return the path of the file an entry is stored in.
+
+        :param mode: mode of the entry, a string.
+        :param identifier: name / id of the entry.
+        :return: a String.
+        """
+        key = quote(str(identifier).strip().lower(), safe='')
+        return os.path.join(self.cache_dir, mode, f'{key}.json')
+
+    def lookup(self, mode: str, identifier):
+        """
+        Return the cached entry, fresh or stale, or None if it is missing.
+
+        :param mode: mode of the entry, a string.
+        :param identifier: name / id of the entry.
+        :return: a CacheEntry, or None.
+        """
+        path = self._path(mode, identifier)
+        try:
+            with open(path, mode='r', encoding='utf-8') as file:
+                content = file.read()
+            entry = json.loads(content)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        fresh = self.ttl is None or time.time() - entry['stored_at'] <= self.ttl
+        if not fresh:
+            with self._lock:
+                self.misses += 1
+            return CacheEntry(entry['data'], entry['stored_at'], False, len(content),
+                              entry.get('etag'), entry.get('last_modified'), entry['body_size'])
+
+        # The modification time doubles as the last access time when the LRU order is loaded.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._touch(path)
+        with self._lock:
+            self.hits += 1
+        return CacheEntry(entry['data'], entry['stored_at'], True, len(content),
+                          entry.get('etag'), entry.get('last_modified'), entry['body_size'])
+
+    def get(self, mode: str, identifier):
+        """
+        Return the cached json of an entry, or None if it is missing or stale.
+
+        :param mode: mode of the entry, a string.
+        :param identifier: name / id of the entry.
+        :return: Json, or None.
+        """
+        entry = self.lookup(mode, identifier)
+        return entry.data if entry is not None and entry.fresh else None
+
+    def refresh(self, mode: str, identifier, entry: CacheEntry, etag: str = None, last_modified: str = None):
+        """
+        Mark a stale entry fresh again after the api answered 304 Not Modified, counting the size of
+        the response body it avoided downloading.
+
+        :param mode: mode of the entry, a string.
+        :param identifier: name / id of the entry.
+        :param entry: the stale CacheEntry.
+        :param etag: ETag header of the 304 response, if it sent a new one.
+        :param last_modified: Last-Modified header of the 304 response, if it sent a new one.
+        """
+        self.put(mode, identifier, entry.data, etag or entry.etag, last_modified or entry.last_modified,
+                 entry.body_size)
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += entry.body_size
+
+    def put(self, mode: str, identifier, data, etag: str = None, last_modified: str = None, body_size: int = 0):
+        """
+        Store the json of an entry, evicting old entries if the cache is full.
+
+        :param mode: mode of the entry, a string.
+        :param identifier: name / id of the entry.
+        :param data: Json to store, projected to the fields the parser reads.
+        :param etag: ETag header of the response.
+        :param last_modified: Last-Modified header of the response.
+        :param body_size: size in bytes of the response body the json was decoded from, which can be
+        far larger than the stored json.
+        """
+        path = self._path(mode, identifier)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        content = json.dumps({'stored_at': time.time(), 'etag': etag, 'last_modified': last_modified,
+                              'body_size': body_size, 'data': FieldExtractor.extract(mode, data)})
+
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, mode='w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(temp_path, path)
+
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            if self._sizes is None:
+                self._load_sizes()
+            self._total_bytes += len(content) - self._sizes.get(path, 0)
+            self._sizes[path] = len(content)
+            self._sizes.move_to_end(path)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Remove least recently used entries until the cache is within LOW_WATER of max_bytes.
+        Must be called while holding the lock.
+        """
+        low_water = self.max_bytes * self.LOW_WATER
+        while self._sizes and self._total_bytes > low_water:
+            path, size = self._sizes.popitem(last=False)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._total_bytes -= size
+
+    def __str__(self):
+        """
+        String representation of instance.
+        :return: a string.
+        """
+        entries = 'unknown' if self._sizes is None else len(self._sizes)
+        return f'ResponseCache(dir={self.cache_dir}, entries={entries}, ' \
+               f'bytes={self._total_bytes}, hits={self.hits}, misses={self.misses}, ' \
+               f'revalidated={self.revalidated}, bytes_saved={self.bytes_saved})'
@@ -0,0 +1,145 @@
+"""
+Module contains classes that deduplicate identical api lookups across a batch.
+"""
+import concurrent.futures
+import threading
+from collections import OrderedDict
+
+
+class RequestCoalescer:
+    """
+    Shares one fetch between every thread that asks for the same (mode, name) key.
+
+    Callers asking for a key that is already being fetched wait on the same future instead of
+    issuing another http call. The most recently completed results are retained so repeated
+    lookups later in the batch are also served without a fetch.
+    """
+
+    def __init__(self, max_retained: int = 2048):
+        """
+        Constructor.
+
+        :param max_retained: max number of completed results kept for reuse.
+        """
+        self.max_retained = max_retained
+        self.requested = 0
+        self.fetched = 0
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def saved(self) -> int:
+        """
+        Number of fetches avoided by sharing results.
+        :return: an int.
+        """
+        return self.requested - self.fetched
+
+    @staticmethod
+    def make_key(mode: str, name) -> tuple:
+        """
+        Return the key a lookup is deduplicated by.
+
+        :param mode: mode of the lookup, a string.
+        :param name: name / id of the lookup.
+        :return: a tuple.
+        """
+        return mode, str(name).strip().lower()
+
+    def get_future(self, mode: str, name, start) -> concurrent.futures.Future:
+        """
+        Return the future of the lookup for the key, starting it only if no other caller has.
+
+        :param mode: mode of the lookup, a string.
+        :param name: name / id of the lookup.
+        :param start: callable without arguments that starts the lookup and returns its Future.
+        :return: a Future.
+        """
+        key = self.make_key(mode, name)
+        with self._lock:
+            self.requested += 1
+            future = self._futures.get(key)
+            if future is not None:
+                self._futures.move_to_end(key)
+                return future
+            self.fetched += 1
+            future = start()
+            self._futures[key] = future
+
+        future.add_done_callback(lambda done: self._on_done(key, done))
+        return future
+
+    def _on_done(self, key: tuple, future: concurrent.futures.Future):
+        """
+        Forget failed lookups so they can be retried, and drop the least recently used
+        completed results past max_retained.
+
+        :param key: key of the lookup, a tuple.
+        :param future: the completed Future of the lookup.
+        """
+        with self._lock:
+            if future.exception() is not None and self._futures.get(key) is future:
+                del self._futures[key]
+            while len(self._futures) > self.max_retained:
+                oldest, oldest_future = next(iter(self._futures.items()))
+                if not oldest_future.done():
+                    break
+                del self._futures[oldest]
+
+
+class AsyncRequestCoalescer:
+    """
+    Shares one fetch between every coroutine on the event loop that asks for the same (mode, name) key.
+    """
+
+    def __init__(self, max_retained: int = 2048):
+        """
+        Constructor.
+
+        :param max_retained: max number of completed results kept for reuse.
+        """
+        self.max_retained = max_retained
+        self.requested = 0
+        self.fetched = 0
+        self._futures = OrderedDict()
+
+    @property
+    def saved(self) -> int:
+        """
+        Number of fetches avoided by sharing results.
+        :return: an int.
+        """
+        return self.requested - self.fetched
+
+    async def get(self, mode: str, name, fetch):
+        """
+        Return the result of awaiting fetch for the key, sharing it with every other caller of the key.
+
+        :param mode: mode of the lookup, a string.
+        :param name: name / id of the lookup.
+        :param fetch: callable without arguments that returns an awaitable doing the lookup.
+        :return: the result of fetch.
+        """
+        import asyncio
+
+        key = RequestCoalescer.make_key(mode, name)
+        self.requested += 1
+        future = self._futures.get(key)
+        if future is not None:
+            self._futures.move_to_end(key)
+            return await asyncio.shield(future)
+
+        self.fetched += 1
+        future = asyncio.ensure_future(fetch())
+        self._futures[key] = future
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            self._futures.pop(key, None)
+            raise
+        finally:
+            while len(self._futures) > self.max_retained:
+                oldest = next(iter(self._futures))
+                if not self._futures[oldest].done():
+                    break
+                del self._futures[oldest]
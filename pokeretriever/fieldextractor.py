@@ -0,0 +1,114 @@
+"""
+Module contains class that decodes api responses, and projects pokemon to the fields JSONParser reads.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Select:
+    """
+    Projection of a list that keeps only the items a function selects.
+    """
+
+    def __init__(self, spec, select):
+        """
+        Constructor.
+
+        :param spec: projection of the items.
+        :param select: callable taking the decoded list and returning the list of items to keep.
+        """
+        self.spec = spec
+        self.select = select
+
+
+def first_and_lowest_level_up(details: list) -> list:
+    """
+    Select the version group details of a move of a pokemon that are read: the first one, whose
+    level JSONParser shows, and the one with the lowest level up level, which ReverseIndex records.
+
+    :param details: the decoded version_group_details of a move.
+    :return: a list of at most two details.
+    """
+    lowest = None
+    for detail in details:
+        if detail['move_learn_method']['name'] == 'level-up' and \
+                (lowest is None or detail['level_learned_at'] < lowest['level_learned_at']):
+            lowest = detail
+    return details[:1] if lowest is None or lowest is details[0] else [details[0], lowest]
+
+
+class FieldExtractor:
+    """
+    Class containing methods to decode json and project it down to the fields JSONParser reads,
+    in the same nested layout.
+
+    Pokemon responses carry large moves[].version_group_details and game_indices arrays of which
+    the parser and ReverseIndex read at most two learn levels per move, so a projected pokemon
+    keeps a fraction of the bytes of the decoded response. Projecting runs after a full decode and
+    nearly doubles its time, so responses are decoded whole for parsing, and only the documents the
+    cache and snapshot persist are projected. The other resources are kept whole: their responses
+    are small, and projecting them costs more than it saves. orjson is used to decode when it is
+    installed.
+    """
+    NAMED = {'name': None}
+    FIELDS = {
+        'pokemon': {
+            'name': None,
+            'id': None,
+            'height': None,
+            'weight': None,
+            'stats': [{'base_stat': None, 'stat': NAMED}],
+            'types': [{'type': NAMED}],
+            'abilities': [{'ability': NAMED}],
+            'moves': [{'move': NAMED,
+                       'version_group_details': Select({'level_learned_at': None, 'move_learn_method': NAMED},
+                                                       first_and_lowest_level_up)}]
+        }
+    }
+
+    @staticmethod
+    def loads(body):
+        """
+        Decode json text.
+
+        :param body: json bytes or string.
+        :return: the decoded json.
+        """
+        if orjson is not None:
+            return orjson.loads(body)
+        return json.loads(body)
+
+    @classmethod
+    def extract(cls, mode: str, document):
+        """
+        Return the fields of a decoded response that the parser of its mode reads. Modes without a
+        projection are returned whole.
+
+        :param mode: mode of the response, a string.
+        :param document: decoded json of the response.
+        :return: the projected json.
+        """
+        spec = cls.FIELDS.get(mode)
+        return document if spec is None else cls.project(spec, document)
+
+    @classmethod
+    def project(cls, spec, value):
+        """
+        Return value projected by spec: None keeps the value, a dict keeps its keys, a one item list
+        projects every item of a list, and Select keeps only the items it selects of a list.
+
+        :param spec: the projection.
+        :param value: decoded json.
+        :return: the projected json.
+        """
+        if spec is None or value is None:
+            return value
+        if isinstance(spec, dict):
+            return {key: cls.project(field_spec, value[key]) for key, field_spec in spec.items() if key in value}
+        if isinstance(spec, Select):
+            return [cls.project(spec.spec, item) for item in spec.select(value)]
+        return [cls.project(spec[0], item) for item in value]
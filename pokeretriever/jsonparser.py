@@ -1,15 +1,38 @@
 """
 Module contains class to parse json into objects.
 """
-import concurrent
-from pokeretriever.pokeretriever import Ability, Move, Pokemon, Stat
-import concurrent.futures
+import sys
+
+from pokeretriever.pokeretriever import Ability, EvolutionChain, Move, MoveList, Pokemon, Species, Stat, Type
 
 
 class JSONParser:
     """
     Class containing methods to parse json into objects.
+
+    Stats, abilities, moves and evolution chains are interned by id, so every expanded pokemon or
+    species shares one object per sub resource instead of holding its own copy. When index is set,
+    every pokemon and ability parsed is also recorded in that ReverseIndex.
     """
+    interned = {}
+    index = None
+
+    @classmethod
+    def get_interned(cls, a_class, json, parse):
+        """
+        Return the shared instance of a_class for the json's id, parsing it on first use.
+
+        :param a_class: class of the object.
+        :param json: Json of the object.
+        :param parse: callable taking the json and returning a new object.
+        :return: the shared object.
+        """
+        key = (a_class, json['id'])
+        pokedex_object = cls.interned.get(key)
+        if pokedex_object is None:
+            pokedex_object = cls.interned.setdefault(key, parse(json))
+        return pokedex_object
+
     @classmethod
     def parse_json_to_pokemon_not_extended(cls, json):
         """
@@ -18,49 +41,72 @@ class JSONParser:
         :param json: Json to parse.
         :return: a Pokemon object.
         """
+        if cls.index is not None:
+            cls.index.add_pokemon(json)
         return Pokemon(
             name=json['name'],
             id=json['id'],
             height=json['height'],
             weight=json['weight'],
-            stats=[(stat['stat']['name'], stat['base_stat']) for stat in json['stats']],
-            types=[a_type['type']['name'] for a_type in json['types']],
-            abilities=[ability['ability']['name'] for ability in json['abilities']],
-            move=[(move['move']['name'], move['version_group_details'][0]['level_learned_at'])
-                  for move in json['moves']],
+            stats=tuple((sys.intern(stat['stat']['name']), stat['base_stat']) for stat in json['stats']),
+            types=tuple(sys.intern(a_type['type']['name']) for a_type in json['types']),
+            abilities=tuple(sys.intern(ability['ability']['name']) for ability in json['abilities']),
+            move=MoveList((move['move']['name'], move['version_group_details'][0]['level_learned_at'])
+                          for move in json['moves']),
             expanded=False
         )
 
     @classmethod
-    def parse_json_to_pokemon_extended(cls, json, threads):
+    def parse_json_to_pokemon_extended(cls, json, sub_resource_jsons):
         """
         Parse json into pokemon object, with extended information.
 
-        :param threads: number of num_threads available, int.
         :param json: Json to parse.
+        :param sub_resource_jsons: dict of 'stat', 'ability' and 'move' to the list of json of each sub
+        resource, in the order get_sub_resource_names returns them.
         :return: a Pokemon object.
         """
-        with concurrent.futures.ThreadPoolExecutor(
-                max_workers=threads) as executor:
-            stats = [stat['stat']['name'] for stat in json['stats']]
-
-            list_of_stats = list(executor.map(cls.parse_json_to_stats, stats))
-
-            abilities = [ability['ability']['name'] for ability in json['abilities']]
+        if cls.index is not None:
+            cls.index.add_pokemon(json)
+        return cls.build_pokemon_extended(
+            json,
+            [cls.parse_json_to_stats(stat) for stat in sub_resource_jsons['stat']],
+            [cls.parse_for_abilities(ability) for ability in sub_resource_jsons['ability']],
+            [cls.parse_json_to_move(move) for move in sub_resource_jsons['move']]
+        )
 
-            list_of_abilities = list(executor.map(cls.parse_for_abilities, abilities))
+    @classmethod
+    def get_sub_resource_names(cls, json):
+        """
+        Return the names of the stats, abilities and moves a pokemon json refers to.
 
-            moves = [move['move']['name'] for move in json['moves']]
+        :param json: Json of a pokemon.
+        :return: a dict of mode to a list of names.
+        """
+        return {
+            'stat': [stat['stat']['name'] for stat in json['stats']],
+            'ability': [ability['ability']['name'] for ability in json['abilities']],
+            'move': [move['move']['name'] for move in json['moves']]
+        }
 
-            list_of_moves = list(executor.map(cls.parse_json_to_move, moves))
+    @classmethod
+    def build_pokemon_extended(cls, json, list_of_stats, list_of_abilities, list_of_moves):
+        """
+        Build an extended pokemon object from its json and its already parsed sub resources.
 
+        :param json: Json of the pokemon.
+        :param list_of_stats: list of Stat objects.
+        :param list_of_abilities: list of Ability objects.
+        :param list_of_moves: list of Move objects.
+        :return: a Pokemon object.
+        """
         return Pokemon(
             name=json['name'],
             id=json['id'],
             height=json['height'],
             weight=json['weight'],
             stats=list_of_stats,
-            types=[a_type['type']['name'] for a_type in json['types']],
+            types=tuple(sys.intern(a_type['type']['name']) for a_type in json['types']),
             abilities=list_of_abilities,
             move=list_of_moves,
             expanded=True
@@ -71,6 +117,16 @@ class JSONParser:
         """
         Parse json into stats object.
 
+        :param json: Json to parse.
+        :return: a Stats object.
+        """
+        return cls.get_interned(Stat, json, cls._parse_stat)
+
+    @classmethod
+    def _parse_stat(cls, json):
+        """
+        Parse json into a new stats object.
+
         :param json: Json to parse.
         :return: a Stats object.
         """
@@ -88,6 +144,18 @@ class JSONParser:
         :param json: Json to parse.
         :return: an Ability object.
         """
+        return cls.get_interned(Ability, json, cls._parse_ability)
+
+    @classmethod
+    def _parse_ability(cls, json):
+        """
+        Parse json into a new ability object.
+
+        :param json: Json to parse.
+        :return: an Ability object.
+        """
+        if cls.index is not None:
+            cls.index.add_ability(json)
         return Ability(
             name=json['name'],
             id=json['id'],
@@ -102,6 +170,16 @@ class JSONParser:
         """
         Parse json into move object.
 
+        :param json: Json to parse.
+        :return: a Move object.
+        """
+        return cls.get_interned(Move, json, cls._parse_move)
+
+    @classmethod
+    def _parse_move(cls, json):
+        """
+        Parse json into a new move object.
+
         :param json: Json to parse.
         :return: a Move object.
         """
@@ -116,3 +194,128 @@ class JSONParser:
             damage_class=json['damage_class']['name'],
             effect_short=json['effect_entries'][0]['short_effect']
         )
+
+    @staticmethod
+    def name_of(named):
+        """
+        Return the name of a named api resource reference that may be null.
+
+        :param named: a dict with a 'name', or None.
+        :return: a string, or None.
+        """
+        return None if named is None else named['name']
+
+    @classmethod
+    def parse_json_to_type(cls, json):
+        """
+        Parse json into a type object.
+
+        :param json: Json to parse.
+        :return: a Type object.
+        """
+        relations = json['damage_relations']
+        return Type(
+            name=json['name'],
+            id=json['id'],
+            generation=json['generation']['name'],
+            damage_class=cls.name_of(json.get('move_damage_class')),
+            **{relation: [a_type['name'] for a_type in relations[relation]]
+               for relation in ('double_damage_to', 'half_damage_to', 'no_damage_to', 'double_damage_from',
+                                'half_damage_from', 'no_damage_from')},
+            pokemon=[pokemon['pokemon']['name'] for pokemon in json['pokemon']]
+        )
+
+    @classmethod
+    def parse_json_to_species_not_extended(cls, json):
+        """
+        Parse json into a species object, with the id of its evolution chain.
+
+        :param json: Json to parse.
+        :return: a Species object.
+        """
+        names = cls.get_species_sub_resource_names(json)['evolution-chain']
+        return cls.build_species(json, int(names[0]) if names else None, expanded=False)
+
+    @classmethod
+    def parse_json_to_species_extended(cls, json, sub_resource_jsons):
+        """
+        Parse json into a species object, with its evolution chain.
+
+        :param json: Json to parse.
+        :param sub_resource_jsons: dict of 'evolution-chain' to the list of json of the chain, in the
+        order get_species_sub_resource_names returns them.
+        :return: a Species object.
+        """
+        chains = [cls.parse_json_to_evolution_chain(chain) for chain in sub_resource_jsons['evolution-chain']]
+        return cls.build_species(json, chains[0] if chains else None, expanded=True)
+
+    @classmethod
+    def get_species_sub_resource_names(cls, json):
+        """
+        Return the id of the evolution chain a species json refers to.
+
+        :param json: Json of a species.
+        :return: a dict of mode to a list of names.
+        """
+        chain = json.get('evolution_chain')
+        return {'evolution-chain': [chain['url'].rstrip('/').rsplit('/', 1)[-1]] if chain else []}
+
+    @classmethod
+    def build_species(cls, json, evolution_chain, expanded: bool):
+        """
+        Build a species object from its json and its evolution chain.
+
+        :param json: Json of the species.
+        :param evolution_chain: id of the evolution chain, or the EvolutionChain object if expanded.
+        :param expanded: if the evolution chain is an EvolutionChain object.
+        :return: a Species object.
+        """
+        return Species(
+            name=json['name'],
+            id=json['id'],
+            generation=json['generation']['name'],
+            color=cls.name_of(json.get('color')),
+            habitat=cls.name_of(json.get('habitat')),
+            capture_rate=json['capture_rate'],
+            is_legendary=json['is_legendary'],
+            is_mythical=json['is_mythical'],
+            evolves_from=cls.name_of(json.get('evolves_from_species')),
+            varieties=[variety['pokemon']['name'] for variety in json['varieties']],
+            evolution_chain=evolution_chain,
+            expanded=expanded
+        )
+
+    @classmethod
+    def parse_json_to_evolution_chain(cls, json):
+        """
+        Parse json into an evolution chain object.
+
+        :param json: Json to parse.
+        :return: an EvolutionChain object.
+        """
+        return cls.get_interned(EvolutionChain, json, cls._parse_evolution_chain)
+
+    @classmethod
+    def _parse_evolution_chain(cls, json):
+        """
+        Parse json into a new evolution chain object, walking the chain depth first.
+
+        :param json: Json to parse.
+        :return: an EvolutionChain object.
+        """
+        species, evolves_from, min_levels = [], [], []
+        links = [(json['chain'], None)]
+        while links:
+            link, parent = links.pop()
+            details = link['evolution_details']
+            species.append(link['species']['name'])
+            evolves_from.append(parent)
+            min_levels.append(details[0]['min_level'] if details else None)
+            links.extend((child, link['species']['name']) for child in reversed(link['evolves_to']))
+        return EvolutionChain(
+            name=species[0],
+            id=json['id'],
+            species=species,
+            evolves_from=evolves_from,
+            min_levels=min_levels
+        )
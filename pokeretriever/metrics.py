@@ -0,0 +1,217 @@
+"""
+Module contains classes that collect timings and counters of a run.
+"""
+import math
+import threading
+import time
+
+
+class Histogram:
+    """
+    Distribution of durations in log spaced buckets, four per doubling, so percentiles are
+    estimated within 19% in constant memory.
+    """
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def observe(self, seconds: float):
+        """
+        Add a duration.
+
+        :param seconds: the duration.
+        """
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = math.floor(math.log2(seconds * 1e6) * self.BUCKETS_PER_DOUBLING) if seconds > 1e-6 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Return the upper bound of the bucket holding the given fraction of the durations.
+
+        :param fraction: between 0 and 1.
+        :return: seconds.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 1) / self.BUCKETS_PER_DOUBLING) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """
+        :return: the summary of the distribution, in seconds.
+        """
+        return {'count': self.count, 'total': self.total, 'mean': self.total / self.count if self.count else 0.0,
+                'p50': self.percentile(0.5), 'p90': self.percentile(0.9), 'p99': self.percentile(0.99),
+                'max': self.max}
+
+
+class Timer:
+    """
+    Context manager adding the time spent in its block to a stage of Metrics.
+    """
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage: str):
+        """
+        Constructor.
+
+        :param stage: name of the stage.
+        """
+        self.stage = stage
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        Metrics.observe(self.stage, time.perf_counter() - self.start)
+
+
+class NullTimer:
+    """
+    Context manager that does nothing, handed out while Metrics are disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class Metrics:
+    """
+    Timings per stage, counters and queue depths of a run, shared by every module.
+
+    Disabled by default, in which case timer() returns a shared do nothing context manager and the
+    other methods return at once, so instrumented hot paths cost one attribute lookup.
+    """
+    enabled = False
+    stages = {}
+    counters = {}
+    levels = {}
+    peaks = {}
+    _lock = threading.Lock()
+    _null_timer = NullTimer()
+
+    @classmethod
+    def enable(cls):
+        """
+        Start collecting, discarding anything collected before.
+        """
+        cls.stages = {}
+        cls.counters = {}
+        cls.levels = {}
+        cls.peaks = {}
+        cls.enabled = True
+
+    @classmethod
+    def timer(cls, stage: str):
+        """
+        Return a context manager timing its block as part of a stage.
+
+        :param stage: name of the stage, such as 'http' or 'parse'.
+        :return: a Timer, or a NullTimer while disabled.
+        """
+        return Timer(stage) if cls.enabled else cls._null_timer
+
+    @classmethod
+    def observe(cls, stage: str, seconds: float):
+        """
+        Add a duration to a stage.
+
+        :param stage: name of the stage.
+        :param seconds: the duration.
+        """
+        if not cls.enabled:
+            return
+        with cls._lock:
+            histogram = cls.stages.get(stage)
+            if histogram is None:
+                histogram = cls.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @classmethod
+    def count(cls, counter: str, amount: int = 1):
+        """
+        Add to a counter.
+
+        :param counter: name of the counter.
+        :param amount: number to add.
+        """
+        if not cls.enabled:
+            return
+        with cls._lock:
+            cls.counters[counter] = cls.counters.get(counter, 0) + amount
+
+    @classmethod
+    def track(cls, queue: str, delta: int):
+        """
+        Move the depth of a queue up or down, recording the deepest it has been.
+
+        :param queue: name of the queue.
+        :param delta: number of items added, negative for items removed.
+        """
+        if not cls.enabled:
+            return
+        with cls._lock:
+            level = cls.levels.get(queue, 0) + delta
+            cls.levels[queue] = level
+            if level > cls.peaks.get(queue, 0):
+                cls.peaks[queue] = level
+
+    @classmethod
+    def depth(cls, queue: str, level: int):
+        """
+        Record the current depth of a queue, keeping the deepest it has been.
+
+        :param queue: name of the queue.
+        :param level: number of items in the queue.
+        """
+        if not cls.enabled:
+            return
+        with cls._lock:
+            if level > cls.peaks.get(queue, 0):
+                cls.peaks[queue] = level
+
+    @classmethod
+    def to_dict(cls) -> dict:
+        """
+        :return: everything collected, with durations in seconds.
+        """
+        with cls._lock:
+            return {'stages': {stage: histogram.to_dict() for stage, histogram in cls.stages.items()},
+                    'counters': dict(cls.counters),
+                    'max_queue_depths': dict(cls.peaks)}
+
+    @classmethod
+    def summary(cls) -> str:
+        """
+        :return: a table of the stages, counters and queue depths, for humans.
+        """
+        metrics = cls.to_dict()
+        lines = [f'{"stage":<12}{"count":>9}{"total s":>10}{"mean ms":>10}{"p50 ms":>10}{"p99 ms":>10}{"max ms":>10}']
+        for stage, histogram in sorted(metrics['stages'].items()):
+            lines.append(f'{stage:<12}{histogram["count"]:>9}{histogram["total"]:>10.3f}'
+                         + ''.join(f'{histogram[key] * 1000:>10.2f}' for key in ('mean', 'p50', 'p99', 'max')))
+        for counter, value in sorted(metrics['counters'].items()):
+            lines.append(f'{counter:<30}{value:>12}')
+        for queue, depth in sorted(metrics['max_queue_depths'].items()):
+            lines.append(f'{"max depth " + queue:<30}{depth:>12}')
+        return '\n'.join(lines)
@@ -1,7 +1,10 @@
 """
 Module contains class that gets JSON from api.
 """
-from exceptions import InvalidObjectException
+from exceptions import CacheMissException, InvalidObjectException, MalformedObjectException, RequestFailedException
+from pokeretriever.fieldextractor import FieldExtractor
+from pokeretriever.metrics import Metrics
+from pokeretriever.transport import Transport
 
 
 class PokeApiRetriever:
@@ -9,19 +12,153 @@ class PokeApiRetriever:
     Class responsible for handling getting information from url.
     """
     BASE_URL = "https://pokeapi.co/api/v2/"
+    transport = Transport()
+    snapshot = None
+    cache = None
+    offline = False
+
+    @classmethod
+    def get_local_json(cls, mode, name):
+        """
+        Return json from the snapshot or the cache, without calling the api. Offline, an entry missing
+        from the snapshot is still looked up in the cache, and is invalid if neither has it.
+
+        :param mode: Mode of api, a string.
+        :param name: Name of entry, a string.
+        :return: a tuple of the json, or None if the entry must be fetched from the api, and the stale
+        CacheEntry to revalidate, if any.
+        """
+        if cls.snapshot is not None:
+            json = cls.snapshot.get(mode, name)
+            if json is not None:
+                Metrics.count('snapshot.hits')
+                return json, None
+
+        if cls.cache is not None:
+            entry = cls.cache.lookup(mode, name)
+            if entry is not None:
+                if entry.fresh or cls.offline:
+                    return entry.data, None
+                return None, entry
+
+        if cls.offline:
+            # The snapshot holds every entry of the api, so one missing from it does not exist.
+            raise InvalidObjectException(name) if cls.snapshot is not None else CacheMissException(name)
+        return None, None
+
+    @classmethod
+    def store_json(cls, mode, name, json, etag=None, last_modified=None, body_size=0):
+        """
+        Store json fetched from the api in the cache, if there is one.
+
+        :param mode: Mode of api, a string.
+        :param name: Name of entry, a string.
+        :param json: Json to store.
+        :param etag: ETag header of the response.
+        :param last_modified: Last-Modified header of the response.
+        :param body_size: size in bytes of the response body the json was decoded from.
+        """
+        if cls.cache is not None:
+            cls.cache.put(mode, name, json, etag, last_modified, body_size)
+
+    @classmethod
+    def resolve_response(cls, mode, name, status, body, stale=None, etag=None, last_modified=None):
+        """
+        Return the json of an api response, refreshing the stale cache entry on 304 Not Modified.
+
+        :param mode: Mode of api, a string.
+        :param name: Name of entry, a string.
+        :param status: status code of the response.
+        :param body: bytes of the response body.
+        :param stale: the stale CacheEntry the request revalidated, if any.
+        :param etag: ETag header of the response.
+        :param last_modified: Last-Modified header of the response.
+        :return: Json.
+        :raises MalformedObjectException: if the body is not json, like a proxy's html error page.
+        """
+        if status == 304 and stale is not None:
+            cls.cache.refresh(mode, name, stale, etag, last_modified)
+            return stale.data
+        if status == 404:
+            raise InvalidObjectException(name)
+        if status >= 300:
+            # Redirects are followed before this, so one left is a response without the entry.
+            raise RequestFailedException(name, status)
+
+        try:
+            with Metrics.timer('decode'):
+                json = FieldExtractor.loads(body)
+        except ValueError as error:
+            raise MalformedObjectException(name, error) from error
+        cls.store_json(mode, name, json, etag, last_modified, len(body))
+        return json
 
     @classmethod
     def get_json_from_api(cls, instance, mode, name):
         """
-        Return json from url.
+        Return json from the snapshot or cache if present, otherwise from url. A stale cache entry is
+        revalidated with a conditional request, so an unchanged entry is not downloaded again.
 
         :param instance: Thread instance to use for api.
         :param mode: Mode of api, a string.
         :param name: Name of entry, a string.
         :return: Json response.
         """
+        json, stale = cls.get_local_json(mode, name)
+        if json is not None:
+            return json
+
         url = f"{cls.BASE_URL}/{mode}/{name}"
-        with instance.get(url) as response:
-            if str(response.content) == "b'Not Found'":
-                raise InvalidObjectException(name)
+        headers = stale.conditional_headers() if stale is not None else None
+        with cls.send(instance, url, name, headers) as response:
+            return cls.resolve_response(mode, name, response.status_code, response.content, stale,
+                                        response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    @classmethod
+    def get_list_page(cls, instance, mode, offset, limit):
+        """
+        Return one page of a paginated list endpoint, always from url.
+
+        :param instance: Thread instance to use for api.
+        :param mode: Mode of api, a string.
+        :param offset: index of the first entry of the page, an int.
+        :param limit: max number of entries in the page, an int.
+        :return: Json response, with the total 'count' and the page's 'results'.
+        """
+        url = f"{cls.BASE_URL}/{mode}/?offset={offset}&limit={limit}"
+        with cls.send(instance, url, mode) as response:
+            if response.status_code >= 400:
+                raise RequestFailedException(mode, response.status_code)
             return response.json()
+
+    @classmethod
+    def send(cls, instance, url, name, headers=None):
+        """
+        Send a GET request through the transport.
+
+        :param instance: Thread instance to use for api.
+        :param url: url to request, a string.
+        :param name: Name of entry, a string, reported if the request fails.
+        :param headers: extra request headers, a dict.
+        :return: a requests Response.
+        """
+        import requests
+
+        if not Metrics.enabled:
+            try:
+                return cls.transport.get(instance, url, headers)
+            except requests.RequestException as error:
+                raise RequestFailedException(name, error)
+
+        Metrics.track('http', 1)
+        try:
+            with Metrics.timer('http'):
+                response = cls.transport.get(instance, url, headers)
+        except requests.RequestException as error:
+            Metrics.count('http.errors')
+            raise RequestFailedException(name, error)
+        finally:
+            Metrics.track('http', -1)
+        Metrics.count(f'http.status.{response.status_code}')
+        Metrics.count('http.bytes', len(response.content))
+        return response
@@ -1,12 +1,15 @@
 """
 This module contains the pokedex object and its concrete implementations.
 """
+import array
+import sys
 
 
 class PokedexObject:
     """
     Represents a pokedex object.
     """
+    __slots__ = ('name', 'id')
 
     def __init__(self, name: str, id: int):
         """
@@ -17,18 +20,101 @@ class PokedexObject:
         self.name = name
         self.id = id
 
+    @classmethod
+    def fields(cls) -> tuple:
+        """
+        Return the names of every field of the class, base class fields first.
+        :return: a tuple of strings.
+        """
+        return tuple(slot for a_class in reversed(cls.__mro__) for slot in getattr(a_class, '__slots__', ()))
+
+    def to_dict(self) -> dict:
+        """
+        Return the fields of this instance as plain python values, converting nested PokedexObjects
+        to dicts and sequences to lists, ready to be serialized.
+        :return: a dict.
+        """
+        return {field: to_plain(getattr(self, field)) for field in self.fields()}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Return an instance from the fields returned by to_dict.
+
+        :param data: a dict.
+        :return: an instance of the class.
+        """
+        return cls(**data)
+
     def __str__(self):
         """
         String representation of instance.
         :return: a string.
         """
-        return f'PokedexObject={str(vars(self))}'
+        fields = {field: getattr(self, field) for field in self.fields()}
+        return f'PokedexObject={str(fields)}'
+
+
+def to_plain(value):
+    """
+    Return a value as plain python values, see PokedexObject.to_dict.
+
+    :param value: a field value.
+    :return: a dict, list or the value itself.
+    """
+    if isinstance(value, PokedexObject):
+        return value.to_dict()
+    if isinstance(value, (list, tuple, MoveList)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+class MoveList:
+    """
+    Compact columnar list of the (move name, level acquired) pairs of a non expanded pokemon.
+    Names are interned so every pokemon shares the same string objects, and levels are packed
+    in an unsigned short array instead of one int object per move.
+    """
+    __slots__ = ('names', 'levels')
+
+    def __init__(self, moves):
+        """
+        Constructor.
+
+        :param moves: iterable of (move name, level acquired) tuples.
+        """
+        names = []
+        self.levels = array.array('H')
+        for name, level in moves:
+            names.append(sys.intern(name))
+            self.levels.append(level)
+        self.names = tuple(names)
+
+    def __len__(self):
+        """
+        :return: number of moves, an int.
+        """
+        return len(self.names)
+
+    def __getitem__(self, index):
+        """
+        :param index: index of the move.
+        :return: a (move name, level acquired) tuple.
+        """
+        return self.names[index], self.levels[index]
+
+    def __iter__(self):
+        """
+        :return: iterator of (move name, level acquired) tuples.
+        """
+        return zip(self.names, self.levels)
 
 
 class Pokemon(PokedexObject):
     """
     Class that stores a pokemon's information.
     """
+    __slots__ = ('height', 'weight', 'stats', 'types', 'abilities', 'move', 'expanded')
 
     def __init__(self, name: str, id: int, height: int, weight: int, stats,
                  types: list, abilities, move, expanded: bool):
@@ -51,60 +137,58 @@ class Pokemon(PokedexObject):
         self.move = move
         self.expanded = expanded
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Return a pokemon from the fields returned by to_dict.
+
+        :param data: a dict.
+        :return: a Pokemon.
+        """
+        data = dict(data)
+        if data['expanded']:
+            data['stats'] = [Stat.from_dict(stat) for stat in data['stats']]
+            data['abilities'] = [Ability.from_dict(ability) for ability in data['abilities']]
+            data['move'] = [Move.from_dict(move) for move in data['move']]
+        else:
+            data['stats'] = tuple(tuple(stat) for stat in data['stats'])
+            data['abilities'] = tuple(data['abilities'])
+            data['move'] = MoveList(data['move'])
+        data['types'] = tuple(data['types'])
+        return cls(**data)
+
     def ability_str(self):
         """
         Return a string representation of the pokemon's abilities.
         :return: a String.
         """
-        result = ''
-
-        for ability in self.abilities:
-            if self.expanded:
-                ability = str(ability).replace('\n', "\n\t\t")
-                result += f'{ability}'
-            else:
-                result += f'\n\t\t{ability}'
-
-        return result
+        if self.expanded:
+            return ''.join(str(ability).replace('\n', "\n\t\t") for ability in self.abilities)
+        return ''.join(f'\n\t\t{ability}' for ability in self.abilities)
 
     def type_str(self):
         """
         Return a string representation of the pokemon's mode.
         :return: a String.
         """
-        result = ''
-        for a_type in self.types:
-            result += f'\n\t\t Name: {a_type}'
-        return result
+        return ''.join(f'\n\t\t Name: {a_type}' for a_type in self.types)
 
     def move_str(self):
         """
         Return a string representation of the pokemon's moves.
         :return: a String.
         """
-        result = ''
         if self.expanded:
-            for move in self.move:
-                move = str(move).replace('\n', "\n\t\t")
-                result += f'\n\t\t{move}'
-            return result
-        else:
-            result = ''
-            for move in self.move:
-                result += f'\n\t\t(Move name: {move[0]}, Level acquired: {move[1]})'
-            return result
+            return ''.join('\n\t\t' + str(move).replace('\n', "\n\t\t") for move in self.move)
+        return ''.join(f'\n\t\t(Move name: {name}, Level acquired: {level})' for name, level in self.move)
 
     def stat_str(self):
         """
         Return a string representation of the pokemon's stats.
-        :return: a String.
+        :return: a String, or None if the pokemon is not expanded.
         """
-        result = ''
         if self.expanded:
-            for stat in self.stats:
-                stat = str(stat).replace('\n', "\n\t\t")
-                result += f'\n\t\t{stat}'
-            return result
+            return ''.join('\n\t\t' + str(stat).replace('\n', "\n\t\t") for stat in self.stats)
 
     def __str__(self):
         """Returns the current Pokemon's details"""
@@ -124,6 +208,7 @@ class Ability(PokedexObject):
     """
     Class that stores the information of an ability.
     """
+    __slots__ = ('generation', 'effect', 'effect_short', 'pokemon')
 
     def __init__(self, name: str, id: int, generation: str, effect: str,
                  effect_short: str, pokemon: list):
@@ -135,14 +220,14 @@ class Ability(PokedexObject):
         :param generation: generation the ability was made
         :param effect: effect's ability
         :param effect_short: short description of effect
-        :param pokemon: list of pokemon with this ability
+        :param pokemon: list of pokemon with this ability, stored as a tuple of interned names
 
         """
         super().__init__(name, id)
-        self.generation = generation
+        self.generation = sys.intern(generation)
         self.effect = effect
         self.effect_short = effect_short
-        self.pokemon = pokemon
+        self.pokemon = tuple(sys.intern(pokemon_name) for pokemon_name in pokemon)
 
     def __str__(self):
         """
@@ -157,15 +242,14 @@ class Ability(PokedexObject):
                  f'\nEffect: {effect}, ' \
                  f'\nEffect short: {effect_short}' \
                  f'\nPokemon:'
-        for pokemon in self.pokemon:
-            result += f' {pokemon}'
-        return result
+        return result + ''.join(f' {pokemon}' for pokemon in self.pokemon)
 
 
 class Move(PokedexObject):
     """
     Stores the information about a move a pokemon can do (attacks/ actions).
     """
+    __slots__ = ('generation', 'accuracy', 'powerpoints', 'power', 'type', 'damage_class', 'effect_short')
 
     def __init__(self, name: str, id: int, generation: str, accuracy: int,
                  powerpoints: int, power: int, type: str, damage_class: str,
@@ -182,12 +266,12 @@ class Move(PokedexObject):
         :param effect_short: description of pokemons effect
         """
         super().__init__(name, id)
-        self.generation = generation
+        self.generation = sys.intern(generation)
         self.accuracy = accuracy
         self.powerpoints = powerpoints
         self.power = power
-        self.type = type
-        self.damage_class = damage_class
+        self.type = sys.intern(type)
+        self.damage_class = sys.intern(damage_class)
         self.effect_short = effect_short
 
     def __str__(self):
@@ -207,6 +291,7 @@ class Stat(PokedexObject):
     """
     Class that contains the stats of the pokemon.
     """
+    __slots__ = ('is_battle_only',)
 
     def __init__(self, name: str, id: int, is_battle_only: bool):
         """
@@ -223,3 +308,157 @@ class Stat(PokedexObject):
         return f'\nName: {self.name}' \
                f'\nID: {self.id}' \
                f'\nIs_Battle_Only: {self.is_battle_only}'
+
+
+class Type(PokedexObject):
+    """
+    Class that stores the damage relations of a type, and the pokemon of that type.
+    """
+    __slots__ = ('generation', 'damage_class', 'double_damage_to', 'half_damage_to', 'no_damage_to',
+                 'double_damage_from', 'half_damage_from', 'no_damage_from', 'pokemon')
+
+    def __init__(self, name: str, id: int, generation: str, damage_class: str, double_damage_to: list,
+                 half_damage_to: list, no_damage_to: list, double_damage_from: list, half_damage_from: list,
+                 no_damage_from: list, pokemon: list):
+        """
+        Constructor.
+
+        :param generation: generation the type was introduced in
+        :param damage_class: damage class of the moves of this type, None for types without one
+        :param double_damage_to: types this type deals double damage to
+        :param half_damage_to: types this type deals half damage to
+        :param no_damage_to: types this type deals no damage to
+        :param double_damage_from: types this type takes double damage from
+        :param half_damage_from: types this type takes half damage from
+        :param no_damage_from: types this type takes no damage from
+        :param pokemon: list of pokemon of this type, stored as a tuple of interned names
+        """
+        super().__init__(name, id)
+        self.generation = sys.intern(generation)
+        self.damage_class = damage_class
+        self.double_damage_to = tuple(sys.intern(a_type) for a_type in double_damage_to)
+        self.half_damage_to = tuple(sys.intern(a_type) for a_type in half_damage_to)
+        self.no_damage_to = tuple(sys.intern(a_type) for a_type in no_damage_to)
+        self.double_damage_from = tuple(sys.intern(a_type) for a_type in double_damage_from)
+        self.half_damage_from = tuple(sys.intern(a_type) for a_type in half_damage_from)
+        self.no_damage_from = tuple(sys.intern(a_type) for a_type in no_damage_from)
+        self.pokemon = tuple(sys.intern(pokemon_name) for pokemon_name in pokemon)
+
+    def __str__(self):
+        """
+        Return string representation of this instance.
+        :return: a String.
+        """
+        relations = (('Double damage to', self.double_damage_to), ('Half damage to', self.half_damage_to),
+                     ('No damage to', self.no_damage_to), ('Double damage from', self.double_damage_from),
+                     ('Half damage from', self.half_damage_from), ('No damage from', self.no_damage_from))
+        result = f'\nName: {self.name}' \
+                 f'\nId: {self.id}' \
+                 f'\nGeneration: {self.generation}' \
+                 f'\nDamage Class: {self.damage_class}'
+        result += ''.join(f'\n{label}:' + ''.join(f' {a_type}' for a_type in types) for label, types in relations)
+        return result + '\nPokemon:' + ''.join(f' {pokemon}' for pokemon in self.pokemon)
+
+
+class EvolutionChain(PokedexObject):
+    """
+    Class that stores an evolution chain, flattened into one entry per species in depth first
+    order. The chain is named after its first species.
+    """
+    __slots__ = ('species', 'evolves_from', 'min_levels')
+
+    def __init__(self, name: str, id: int, species: list, evolves_from: list, min_levels: list):
+        """
+        Constructor.
+
+        :param species: names of the species of the chain
+        :param evolves_from: name of the species each species evolves from, None for the first one
+        :param min_levels: level each species evolves at, None if it does not evolve by level
+        """
+        super().__init__(name, id)
+        self.species = tuple(sys.intern(species_name) for species_name in species)
+        self.evolves_from = tuple(evolves_from)
+        self.min_levels = tuple(min_levels)
+
+    def __str__(self):
+        """
+        Return string representation of this instance.
+        :return: a String.
+        """
+        result = f'\nName: {self.name}' \
+                 f'\nId: {self.id}' \
+                 f'\nEvolutions:'
+        for species, evolves_from, min_level in zip(self.species, self.evolves_from, self.min_levels):
+            result += f'\n\t{species}'
+            if evolves_from is not None:
+                result += f', from {evolves_from}' + (f' at level {min_level}' if min_level is not None else '')
+        return result
+
+
+class Species(PokedexObject):
+    """
+    Class that stores the information of a pokemon species, shared by all of its varieties.
+    """
+    __slots__ = ('generation', 'color', 'habitat', 'capture_rate', 'is_legendary', 'is_mythical', 'evolves_from',
+                 'varieties', 'evolution_chain', 'expanded')
+
+    def __init__(self, name: str, id: int, generation: str, color: str, habitat: str, capture_rate: int,
+                 is_legendary: bool, is_mythical: bool, evolves_from: str, varieties: list, evolution_chain,
+                 expanded: bool):
+        """
+        Constructor.
+
+        :param generation: generation the species was introduced in
+        :param color: color of the species in the pokedex
+        :param habitat: habitat of the species, None if it has none
+        :param capture_rate: base capture rate, up to 255
+        :param is_legendary: if the species is legendary
+        :param is_mythical: if the species is mythical
+        :param evolves_from: name of the species it evolves from, None if it does not evolve from one
+        :param varieties: list of the names of the pokemon of the species
+        :param evolution_chain: id of the evolution chain, or the EvolutionChain if expanded
+        :param expanded: if the evolution chain was requested
+        """
+        super().__init__(name, id)
+        self.generation = sys.intern(generation)
+        self.color = color
+        self.habitat = habitat
+        self.capture_rate = capture_rate
+        self.is_legendary = is_legendary
+        self.is_mythical = is_mythical
+        self.evolves_from = evolves_from
+        self.varieties = tuple(sys.intern(pokemon_name) for pokemon_name in varieties)
+        self.evolution_chain = evolution_chain
+        self.expanded = expanded
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Return a species from the fields returned by to_dict.
+
+        :param data: a dict.
+        :return: a Species.
+        """
+        data = dict(data)
+        if data['expanded'] and data['evolution_chain'] is not None:
+            data['evolution_chain'] = EvolutionChain.from_dict(data['evolution_chain'])
+        return cls(**data)
+
+    def __str__(self):
+        """
+        Return string representation of this instance.
+        :return: a String.
+        """
+        evolution_chain = str(self.evolution_chain).replace('\n', '\n\t\t') if self.expanded else self.evolution_chain
+        return f'\nName: {self.name}' \
+               f'\nId: {self.id}' \
+               f'\nGeneration: {self.generation}' \
+               f'\nColor: {self.color}' \
+               f'\nHabitat: {self.habitat}' \
+               f'\nCapture rate: {self.capture_rate}' \
+               f'\nLegendary: {self.is_legendary}' \
+               f'\nMythical: {self.is_mythical}' \
+               f'\nEvolves from: {self.evolves_from}' \
+               f'\nVarieties:' + ''.join(f' {pokemon}' for pokemon in self.varieties) + \
+               f'\nEvolution chain: {evolution_chain}' \
+               f'\nExpanded: {self.expanded}'
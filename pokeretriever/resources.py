@@ -0,0 +1,148 @@
+"""
+Module contains the registry of the resources of the api the pokedex can request.
+"""
+from exceptions import MalformedObjectException
+from pokeretriever.jsonparser import JSONParser
+from pokeretriever.pokeretriever import Ability, EvolutionChain, Move, Pokemon, Species, Stat, Type
+
+
+class Resource:
+    """
+    A resource of the api: the endpoint its entries are fetched from, the PokedexObject class they
+    are parsed into and rendered by, and for a resource with an expanded form, the sub resources it
+    is built from.
+    """
+    __slots__ = ('mode', 'endpoint', 'object_class', 'parse', 'sub_resource_names', 'parse_expanded')
+    # Errors of a parser reading json that does not have the shape it expects.
+    PARSE_ERRORS = (AttributeError, IndexError, KeyError, TypeError)
+
+    def __init__(self, mode: str, object_class, parse, endpoint: str = None, sub_resource_names=None,
+                 parse_expanded=None):
+        """
+        Constructor.
+
+        :param mode: mode of the resource on the command line.
+        :param object_class: the PokedexObject class of its entries.
+        :param parse: callable taking the json of an entry and returning a PokedexObject.
+        :param endpoint: path of the resource in the api, the mode by default.
+        :param sub_resource_names: callable taking the json of an entry and returning a dict of the
+        mode of each sub resource to the list of its names, None if the resource has no expanded form.
+        :param parse_expanded: callable taking the json of an entry and the dict of the mode of each sub
+        resource to the list of their json, returning the expanded PokedexObject.
+        """
+        self.mode = mode
+        self.endpoint = endpoint or mode
+        self.object_class = object_class
+        self.parse = parse
+        self.sub_resource_names = sub_resource_names
+        self.parse_expanded = parse_expanded
+
+    @property
+    def expandable(self) -> bool:
+        """
+        :return: if the resource has an expanded form.
+        """
+        return self.sub_resource_names is not None
+
+    def build(self, identifier: str, json, sub_resource_jsons: dict = None):
+        """
+        Parse the json of an entry, in its expanded form if the json of its sub resources is given.
+
+        :param identifier: name / id of the entry.
+        :param json: json of the entry.
+        :param sub_resource_jsons: dict of the mode of each sub resource to the list of their json.
+        :return: a PokedexObject.
+        :raises MalformedObjectException: if the json does not have the shape the parser reads.
+        """
+        try:
+            if sub_resource_jsons is None:
+                return self.parse(json)
+            return self.parse_expanded(json, sub_resource_jsons)
+        except self.PARSE_ERRORS as error:
+            raise MalformedObjectException(identifier, error) from error
+
+    def sub_resources(self, identifier: str, json) -> dict:
+        """
+        Return the sub resources of an entry.
+
+        :param identifier: name / id of the entry.
+        :param json: json of the entry.
+        :return: a dict of the mode of each sub resource to the list of its names.
+        :raises MalformedObjectException: if the json does not have the shape the parser reads.
+        """
+        try:
+            return self.sub_resource_names(json)
+        except self.PARSE_ERRORS as error:
+            raise MalformedObjectException(identifier, error) from error
+
+
+class ResourceRegistry:
+    """
+    Resources by mode. Requests, the journal and the server look resources up here in one dict
+    lookup, so a resource is added by registering it, without touching their dispatch.
+    """
+    resources = {}
+
+    @classmethod
+    def register(cls, resource: Resource) -> Resource:
+        """
+        Add a resource, replacing any resource of the same mode.
+
+        :param resource: the Resource.
+        :return: the Resource.
+        """
+        cls.resources[resource.mode] = resource
+        return resource
+
+    @classmethod
+    def get(cls, mode: str) -> Resource:
+        """
+        Return the resource of a mode.
+
+        :param mode: mode of the resource.
+        :return: a Resource.
+        :raises KeyError: if no resource has this mode.
+        """
+        return cls.resources[mode]
+
+    @classmethod
+    def modes(cls) -> tuple:
+        """
+        :return: the mode of every resource, in the order they were registered.
+        """
+        return tuple(cls.resources)
+
+    @classmethod
+    def endpoints(cls) -> tuple:
+        """
+        :return: the api endpoint of every resource, in the order they were registered.
+        """
+        return tuple(resource.endpoint for resource in cls.resources.values())
+
+    @classmethod
+    def classes(cls) -> dict:
+        """
+        :return: a dict of the name of the PokedexObject class of each resource to the class.
+        """
+        return {resource.object_class.__name__: resource.object_class for resource in cls.resources.values()}
+
+    @classmethod
+    def class_modes(cls) -> dict:
+        """
+        :return: a dict of the name of the PokedexObject class of each resource to its mode.
+        """
+        return {resource.object_class.__name__: resource.mode for resource in cls.resources.values()}
+
+
+ResourceRegistry.register(Resource('pokemon', Pokemon, JSONParser.parse_json_to_pokemon_not_extended,
+                                   sub_resource_names=JSONParser.get_sub_resource_names,
+                                   parse_expanded=JSONParser.parse_json_to_pokemon_extended))
+ResourceRegistry.register(Resource('ability', Ability, JSONParser.parse_for_abilities))
+ResourceRegistry.register(Resource('move', Move, JSONParser.parse_json_to_move))
+ResourceRegistry.register(Resource('stat', Stat, JSONParser.parse_json_to_stats))
+ResourceRegistry.register(Resource('type', Type, JSONParser.parse_json_to_type))
+ResourceRegistry.register(Resource('species', Species, JSONParser.parse_json_to_species_not_extended,
+                                   endpoint='pokemon-species',
+                                   sub_resource_names=JSONParser.get_species_sub_resource_names,
+                                   parse_expanded=JSONParser.parse_json_to_species_extended))
+ResourceRegistry.register(Resource('evolution-chain', EvolutionChain, JSONParser.parse_json_to_evolution_chain))
@@ -0,0 +1,139 @@
+"""
+Module contains class that answers which pokemon learn a move, have an ability or are of a type.
+"""
+import json
+import os
+import sys
+import threading
+
+
+class ReverseIndex:
+    """
+    Inverted indexes from moves, abilities and types to the pokemon that have them, built from
+    the json JSONParser parses and persisted as a json file, so inverse queries are answered with
+    dict lookups instead of one api request per pokemon.
+
+    A move records the lowest level a pokemon learns it at by leveling up, across version groups,
+    and None for a pokemon that only learns it another way, such as from a machine, an egg or a
+    tutor, whose level_learned_at is 0.
+    """
+    KINDS = ('move', 'ability', 'type')
+    VERSION = 2
+    LEVEL_UP = 'level-up'
+
+    def __init__(self, path: str = None):
+        """
+        Constructor.
+
+        :param path: path of the json file the index is loaded from and saved to, or None to only
+        keep it in memory.
+        """
+        self.path = path
+        self.entries = {kind: {} for kind in self.KINDS}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Return the index saved at path, or an empty one if there is no file yet.
+
+        :param path: path of the json file.
+        :return: a ReverseIndex.
+        """
+        index = cls(path)
+        try:
+            with open(path, mode='r', encoding='utf-8') as file:
+                saved = json.load(file)
+        except FileNotFoundError:
+            return index
+        if saved.get('version') == cls.VERSION:
+            for kind in cls.KINDS:
+                index.entries[kind] = {
+                    sys.intern(name): {sys.intern(pokemon): level for pokemon, level in found.items()}
+                    for name, found in saved.get(kind, {}).items()}
+        return index
+
+    def save(self):
+        """
+        Write the index to its file, replacing the previous one atomically.
+        """
+        temp_path = f'{self.path}.tmp'
+        with self._lock:
+            with open(temp_path, mode='w', encoding='utf-8') as file:
+                json.dump(dict(self.entries, version=self.VERSION), file, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+    def add(self, kind: str, name: str, pokemon: str, level: int = None):
+        """
+        Record that a pokemon has a move, ability or type.
+
+        :param kind: 'move', 'ability' or 'type'.
+        :param name: name of the move, ability or type.
+        :param pokemon: name of the pokemon.
+        :param level: level the pokemon learns a move at, None otherwise.
+        """
+        with self._lock:
+            self.entries[kind].setdefault(sys.intern(name), {})[sys.intern(pokemon)] = level
+
+    def add_pokemon(self, json):
+        """
+        Record every move, ability and type of a pokemon.
+
+        :param json: Json of the pokemon.
+        """
+        pokemon = sys.intern(json['name'])
+        with self._lock:
+            moves, abilities, types = (self.entries[kind] for kind in self.KINDS)
+            for move in json['moves']:
+                moves.setdefault(sys.intern(move['move']['name']), {})[pokemon] = \
+                    self.level_up_level(move['version_group_details'])
+            for ability in json['abilities']:
+                abilities.setdefault(sys.intern(ability['ability']['name']), {})[pokemon] = None
+            for a_type in json['types']:
+                types.setdefault(sys.intern(a_type['type']['name']), {})[pokemon] = None
+
+    @classmethod
+    def level_up_level(cls, version_group_details: list):
+        """
+        Return the lowest level a move is learned at by leveling up.
+
+        :param version_group_details: the version_group_details of a move of a pokemon.
+        :return: an int, or None if the move is never learned by leveling up.
+        """
+        levels = [detail['level_learned_at'] for detail in version_group_details
+                  if detail['move_learn_method']['name'] == cls.LEVEL_UP]
+        return min(levels) if levels else None
+
+    def add_ability(self, json):
+        """
+        Record every pokemon an ability lists.
+
+        :param json: Json of the ability.
+        """
+        ability = sys.intern(json['name'])
+        with self._lock:
+            found = self.entries['ability'].setdefault(ability, {})
+            for pokemon in json['pokemon']:
+                found.setdefault(sys.intern(pokemon['pokemon']['name']), None)
+
+    def query(self, kind: str, name: str, max_level: int = None) -> list:
+        """
+        Return the pokemon that have a move, ability or type, ordered by level then name, pokemon
+        that do not learn a move by leveling up last.
+
+        :param kind: 'move', 'ability' or 'type'.
+        :param name: name of the move, ability or type.
+        :param max_level: only pokemon that learn the move by leveling up by this level, if given.
+        :return: a list of tuples of pokemon name and level, None for abilities, types and moves not
+        learned by leveling up.
+        """
+        found = self.entries[kind].get(name.strip().lower(), {})
+        if max_level is not None and kind == 'move':
+            found = {pokemon: level for pokemon, level in found.items() if level is not None and level <= max_level}
+        return sorted(found.items(), key=lambda item: (item[1] is None, item[1] or 0, item[0]))
+
+    def __len__(self):
+        """
+        :return: the number of moves, abilities and types indexed.
+        """
+        return sum(len(found) for found in self.entries.values())
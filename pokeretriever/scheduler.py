@@ -0,0 +1,108 @@
+"""
+Module contains class that schedules every api fetch of a batch on one bounded pool.
+"""
+import concurrent.futures
+
+from pokeretriever.coalescer import RequestCoalescer
+from pokeretriever.metrics import Metrics
+from pokeretriever.pokeapiretriever import PokeApiRetriever
+
+
+class FetchScheduler:
+    """
+    Runs every http fetch of a batch, top level and sub resource alike, on a single pool of
+    max_workers threads. Total concurrency therefore stays fixed no matter how many requests
+    wait on fetches at once, and identical sub resource lookups share one future through a
+    RequestCoalescer.
+    """
+
+    def __init__(self, session, max_workers: int):
+        """
+        Constructor.
+
+        :param session: session used for every fetch.
+        :param max_workers: max number of fetches running at once.
+        """
+        self.session = session
+        self.max_workers = max_workers
+        self.coalescer = RequestCoalescer()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix='fetch')
+
+    def submit(self, mode: str, name, coalesce: bool = True) -> concurrent.futures.Future:
+        """
+        Schedule the fetch of an entry.
+
+        :param mode: mode of the entry, a string.
+        :param name: name / id of the entry.
+        :param coalesce: share the fetch with identical lookups, False for entries looked up only once.
+        :return: a Future of the entry's json.
+        """
+        def start():
+            future = self._executor.submit(PokeApiRetriever.get_json_from_api, self.session, mode, name)
+            if Metrics.enabled:
+                Metrics.track('fetches', 1)
+                future.add_done_callback(lambda done: Metrics.track('fetches', -1))
+            return future
+
+        if not coalesce:
+            return start()
+        return self.coalescer.get_future(mode, name, start)
+
+    def submit_list_page(self, mode: str, offset: int, limit: int) -> concurrent.futures.Future:
+        """
+        Schedule the fetch of one page of a paginated list endpoint.
+
+        :param mode: mode of the list, a string.
+        :param offset: index of the first entry of the page.
+        :param limit: max number of entries in the page.
+        :return: a Future of the page's json.
+        """
+        return self._executor.submit(PokeApiRetriever.get_list_page, self.session, mode, offset, limit)
+
+    def list_names(self, mode: str, page_size: int = 200):
+        """
+        Yield the name of every entry of a mode. The first page gives the total count, then every
+        remaining page is fetched concurrently. Entries listed without a name, like evolution chains,
+        yield the id at the end of their url.
+
+        :param mode: mode of the list, a string.
+        :param page_size: number of entries per page.
+        :return: a generator of names.
+        """
+        first_page = self.submit_list_page(mode, 0, page_size).result()
+        pages = [self.submit_list_page(mode, offset, page_size)
+                 for offset in range(page_size, first_page['count'], page_size)]
+        for result in first_page['results']:
+            yield self.entry_name(result)
+        for page in pages:
+            for result in page.result()['results']:
+                yield self.entry_name(result)
+
+    @staticmethod
+    def entry_name(result: dict) -> str:
+        """
+        Return the name of an entry of a list page, or its id when the entry has no name.
+
+        :param result: dict of an entry of the results of a list page.
+        :return: a string.
+        """
+        return result.get('name') or result['url'].rstrip('/').rsplit('/', 1)[-1]
+
+    def shutdown(self):
+        """
+        Wait for scheduled fetches to finish and release the pool.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        """
+        :return: this FetchScheduler.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Shut down the pool when leaving the with block.
+        """
+        self.shutdown()
@@ -0,0 +1,137 @@
+"""
+Module contains classes that store a full offline snapshot of the api.
+"""
+import collections
+import json
+import sqlite3
+import threading
+
+from pokeretriever.fieldextractor import FieldExtractor
+from pokeretriever.resources import ResourceRegistry
+
+
+class SnapshotStore:
+    """
+    Indexed offline store of api json in a single SQLite file.
+
+    Every entry is indexed by (mode, name) and (mode, id), so lookups by either never scan the
+    store. Each thread reading the store gets its own connection.
+    """
+    MODES = ResourceRegistry.endpoints()
+
+    def __init__(self, path: str):
+        """
+        Constructor.
+
+        :param path: path of the SQLite file.
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS resources ('
+                               'mode TEXT NOT NULL, name TEXT NOT NULL, id INTEGER NOT NULL, json TEXT NOT NULL, '
+                               'PRIMARY KEY (mode, name))')
+            connection.execute('CREATE UNIQUE INDEX IF NOT EXISTS resources_by_id ON resources (mode, id)')
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return the connection of the current thread, opening it if needed.
+        :return: a sqlite3 Connection.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            self._local.connection = connection
+        return connection
+
+    def get(self, mode: str, identifier):
+        """
+        Return the json of an entry by name or id.
+
+        :param mode: mode of the entry, a string.
+        :param identifier: name / id of the entry.
+        :return: Json, or None if the entry is not in the store.
+        """
+        identifier = str(identifier).strip().lower()
+        if identifier.isdigit():
+            query = 'SELECT json FROM resources WHERE mode = ? AND id = ?'
+            key = int(identifier)
+        else:
+            query = 'SELECT json FROM resources WHERE mode = ? AND name = ?'
+            key = identifier
+        row = self._connection().execute(query, (mode, key)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_many(self, mode: str, jsons):
+        """
+        Store entries, replacing any existing entry with the same name or id. Entries without a
+        name, like evolution chains, are stored under their id.
+
+        :param mode: mode of the entries, a string.
+        :param jsons: iterable of the json of each entry, projected to the fields the parser reads.
+        """
+        with self._connection() as connection:
+            connection.executemany('INSERT OR REPLACE INTO resources (mode, name, id, json) VALUES (?, ?, ?, ?)',
+                                   ((mode, data.get('name') or str(data['id']), data['id'],
+                                     json.dumps(FieldExtractor.extract(mode, data)))
+                                    for data in jsons))
+
+    def count(self, mode: str) -> int:
+        """
+        Return the number of entries of a mode.
+
+        :param mode: mode of the entries, a string.
+        :return: an int.
+        """
+        return self._connection().execute('SELECT COUNT(*) FROM resources WHERE mode = ?', (mode,)).fetchone()[0]
+
+    def names(self, mode: str):
+        """
+        Yield the name of every entry of a mode, in id order.
+
+        :param mode: mode of the entries, a string.
+        :return: a generator of names.
+        """
+        for (name,) in self._connection().execute('SELECT name FROM resources WHERE mode = ? ORDER BY id', (mode,)):
+            yield name
+
+
+class SnapshotBuilder:
+    """
+    Crawls every entry of the api into a SnapshotStore through a FetchScheduler.
+    """
+
+    def __init__(self, store: SnapshotStore, scheduler, batch_size: int = 100):
+        """
+        Constructor.
+
+        :param store: SnapshotStore to write to.
+        :param scheduler: FetchScheduler to fetch with.
+        :param batch_size: number of entries written per transaction.
+        """
+        self.store = store
+        self.scheduler = scheduler
+        self.batch_size = batch_size
+
+    def build(self, mode: str) -> int:
+        """
+        Fetch every entry of a mode and write it to the store.
+
+        :param mode: mode to crawl, a string.
+        :return: number of entries written.
+        """
+        window = self.scheduler.max_workers * 2
+        pending = collections.deque()
+        batch = []
+        written = 0
+        for name in self.scheduler.list_names(mode):
+            pending.append(self.scheduler.submit(mode, name, coalesce=False))
+            while len(pending) >= window or (pending and pending[0].done()):
+                batch.append(pending.popleft().result())
+                if len(batch) >= self.batch_size:
+                    self.store.put_many(mode, batch)
+                    written += len(batch)
+                    batch = []
+        batch.extend(future.result() for future in pending)
+        self.store.put_many(mode, batch)
+        return written + len(batch)
@@ -0,0 +1,193 @@
+"""
+Module contains class that filters, sorts and aggregates the base stats of many pokemon at once.
+"""
+import array
+import math
+import operator
+import re
+import statistics
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class StatTable:
+    """
+    Columnar table of base stats, one row per pokemon and one column per stat plus their total.
+
+    With numpy the stats are one 2d array and every operation is vectorized over a column.
+    Without it each column is an array of ints and rows are selected by index, which keeps the
+    same results at a lower speed. Filters and sorts only narrow or reorder the selected rows,
+    the stats themselves are never copied.
+    """
+    OPERATORS = {
+        '>=': operator.ge,
+        '<=': operator.le,
+        '==': operator.eq,
+        '!=': operator.ne,
+        '>': operator.gt,
+        '<': operator.lt,
+        '=': operator.eq
+    }
+    CONDITION = re.compile(r'^\s*([a-z-]+)\s*(>=|<=|==|!=|>|<|=)\s*(-?\d+)\s*$')
+    AGGREGATES = ('count', 'sum', 'mean', 'min', 'max', 'median', 'std')
+
+    def __init__(self, names: list, columns: list, values):
+        """
+        Constructor.
+
+        :param names: list of pokemon names, one per row.
+        :param columns: list of column names.
+        :param values: rows of stats, a 2d numpy array, or a list of one array of ints per column
+        without numpy.
+        """
+        self.names = names
+        self.columns = columns
+        self.values = values
+        self.rows = numpy.arange(len(names)) if numpy is not None else list(range(len(names)))
+
+    @classmethod
+    def from_pokemon(cls, pokemon_list):
+        """
+        Build the table from non expanded pokemon.
+
+        :param pokemon_list: iterable of Pokemon, whose stats are (name, base stat) tuples.
+        :return: a StatTable.
+        """
+        names = []
+        stat_rows = []
+        columns = []
+        for pokemon in pokemon_list:
+            stats = dict(pokemon.stats)
+            for stat in stats:
+                if stat not in columns:
+                    columns.append(stat)
+            names.append(pokemon.name)
+            stat_rows.append(stats)
+        columns.append('total')
+
+        rows = ([stats.get(stat, 0) for stat in columns[:-1]] for stats in stat_rows)
+        rows = [row + [sum(row)] for row in rows]
+        if numpy is not None:
+            values = numpy.array(rows, dtype=numpy.int32).reshape(len(rows), len(columns))
+        else:
+            values = [array.array('l', (row[column] for row in rows)) for column in range(len(columns))]
+        return cls(names, columns, values)
+
+    @classmethod
+    def parse_condition(cls, condition: str) -> tuple:
+        """
+        Parse a condition such as 'speed>=100'.
+
+        :param condition: a string.
+        :return: a tuple of column name, comparison function and number.
+        :raises ValueError: if the condition is not a column, a comparison and a number.
+        """
+        match = cls.CONDITION.match(condition.lower())
+        if match is None:
+            raise ValueError(f'Invalid condition: "{condition}", expected a stat, one of '
+                             f'{" ".join(cls.OPERATORS)} and a number, like "speed>=100"')
+        column, comparison, number = match.groups()
+        return column, cls.OPERATORS[comparison], int(number)
+
+    def column(self, name: str):
+        """
+        Return the values of a column for every row, selected or not.
+
+        :param name: name of the column.
+        :return: a numpy array, or an array of ints.
+        :raises ValueError: if there is no such column.
+        """
+        if name not in self.columns:
+            raise ValueError(f'Unknown stat: "{name}", expected one of {", ".join(self.columns)}')
+        index = self.columns.index(name)
+        return self.values[:, index] if numpy is not None else self.values[index]
+
+    def where(self, condition: str):
+        """
+        Keep only the selected rows that meet a condition.
+
+        :param condition: a condition such as 'speed>=100'.
+        :return: the StatTable.
+        """
+        name, compare, number = self.parse_condition(condition)
+        column = self.column(name)
+        if numpy is not None:
+            self.rows = self.rows[compare(column[self.rows], number)]
+        else:
+            self.rows = [row for row in self.rows if compare(column[row], number)]
+        return self
+
+    def sort(self, name: str, descending: bool = False):
+        """
+        Order the selected rows by a column, keeping the input order of ties.
+
+        :param name: name of the column.
+        :param descending: highest values first.
+        :return: the StatTable.
+        """
+        column = self.column(name)
+        if numpy is not None:
+            selected = column[self.rows].astype(numpy.int64)
+            self.rows = self.rows[numpy.argsort(-selected if descending else selected, kind='stable')]
+        else:
+            self.rows = sorted(self.rows, key=column.__getitem__, reverse=descending)
+        return self
+
+    def top(self, count: int):
+        """
+        Keep only the first selected rows.
+
+        :param count: number of rows to keep.
+        :return: the StatTable.
+        """
+        self.rows = self.rows[:count]
+        return self
+
+    def aggregate(self, function: str) -> list:
+        """
+        Return an aggregate of every column over the selected rows.
+
+        :param function: one of AGGREGATES.
+        :return: a list of numbers, one per column.
+        :raises ValueError: if the function is unknown.
+        """
+        if function not in self.AGGREGATES:
+            raise ValueError(f'Unknown aggregate: "{function}", expected one of {", ".join(self.AGGREGATES)}')
+        count = len(self.rows)
+        if function == 'count':
+            return [count] * len(self.columns)
+        if count == 0:
+            return [0 if function == 'sum' else math.nan] * len(self.columns)
+
+        if numpy is not None:
+            selected = self.values[self.rows].astype(numpy.float64)
+            results = {'sum': numpy.sum, 'mean': numpy.mean, 'min': numpy.min, 'max': numpy.max,
+                       'median': numpy.median, 'std': numpy.std}[function](selected, axis=0)
+            return [int(value) if function in ('sum', 'min', 'max') else float(value) for value in results]
+
+        functions = {'sum': sum, 'mean': statistics.fmean, 'min': min, 'max': max,
+                     'median': statistics.median, 'std': statistics.pstdev}
+        results = (functions[function]([column[row] for row in self.rows]) for column in self.values)
+        return [value if function in ('sum', 'min', 'max') else float(value) for value in results]
+
+    def selected(self):
+        """
+        Yield the name and the stats of each selected row, in order.
+
+        :return: a generator of tuples of a name and a list of ints.
+        """
+        for row in self.rows:
+            row = int(row)
+            if numpy is not None:
+                yield self.names[row], self.values[row].tolist()
+            else:
+                yield self.names[row], [column[row] for column in self.values]
+
+    def __len__(self):
+        """
+        :return: the number of selected rows.
+        """
+        return len(self.rows)
@@ -0,0 +1,333 @@
+"""
+Module contains the classes that send http requests to the api.
+"""
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Client side token bucket. Tokens refill at rate per second up to burst, and every request
+    takes one, so requests never leave faster than the api allows.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Constructor.
+
+        :param rate: tokens added per second.
+        :param burst: max number of tokens saved up.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, and return how long the caller must wait before the token is valid.
+        :return: seconds to wait, a float.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Block until a token is available.
+        """
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class ConcurrencyController:
+    """
+    Additive increase, multiplicative decrease limit of the requests in flight, tuned from the
+    responses. The limit doubles every round trip until the first sign of congestion, then grows
+    by one per round trip while it is in use. A 429, 5xx or connection error halves it, and a
+    smoothed latency over TOLERANCE times the baseline cuts it by a tenth, at most once per round
+    trip so one burst of bad responses counts once. Latency is timed to the response headers, and
+    both TOLERANCE and the drift of the baseline are wide, because threads sharing a CPU with the
+    parsing slow each other down by 2-3 times without the server queuing anything.
+    """
+    BACKOFF = 0.5
+    LATENCY_BACKOFF = 0.9
+    TOLERANCE = 3.0
+    SMOOTHING = 0.2
+    BASELINE_DRIFT = 0.05
+
+    def __init__(self, maximum: int, initial: int = 4, minimum: int = 1):
+        """
+        Constructor.
+
+        :param maximum: max number of requests in flight.
+        :param initial: number of requests in flight allowed at first.
+        :param minimum: min number of requests in flight allowed.
+        """
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = float(max(self.minimum, min(initial, self.maximum)))
+        self.in_flight = 0
+        self.peak = int(self.limit)
+        self.decreases = 0
+        self.throttled = 0
+        self.slow_start = True
+        self.baseline = None
+        self.latency = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """
+        Block until fewer requests than the limit are in flight, and count one more.
+        :return: the time the request starts at, to hand back to release.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float, status: int = None, latency: float = None):
+        """
+        Count one less request in flight, and adjust the limit from its outcome.
+
+        :param started: the time returned by acquire.
+        :param status: status code of the response, None if the request raised.
+        :param latency: seconds until the response headers arrived, the time since started if None.
+        """
+        now = time.monotonic()
+        with self._condition:
+            self.in_flight -= 1
+            if status is None or status == 429 or status >= 500:
+                self.throttled += 1
+                self._decrease(now, self.BACKOFF)
+            else:
+                self._observe(now - started if latency is None else latency)
+                if self.latency > self.TOLERANCE * self.baseline:
+                    self._decrease(now, self.LATENCY_BACKOFF)
+                elif self.in_flight + 1 >= int(self.limit):
+                    # Only a limit that is reached holds requests back, so only then is it raised.
+                    self.limit = min(self.maximum, self.limit + (1 if self.slow_start else 1 / self.limit))
+                    self.peak = max(self.peak, int(self.limit))
+            self._condition.notify_all()
+
+    def _observe(self, latency: float):
+        """
+        Fold the latency of a response into the smoothed latency and the baseline. The baseline is
+        the fastest latency seen, drifting up slowly so one lucky response does not pin it.
+
+        :param latency: seconds.
+        """
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * self.BASELINE_DRIFT
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += (latency - self.latency) * self.SMOOTHING
+
+    def _decrease(self, now: float, factor: float):
+        """
+        Cut the limit by factor, unless it was cut less than a round trip ago.
+
+        :param now: the current monotonic time.
+        :param factor: between 0 and 1.
+        """
+        if now - self._last_decrease < (self.latency or 0.0):
+            return
+        self.limit = max(self.minimum, self.limit * factor)
+        self.slow_start = False
+        self.decreases += 1
+        self._last_decrease = now
+
+    def stats(self) -> dict:
+        """
+        :return: the current and peak limit, the number of cuts and of throttled responses.
+        """
+        with self._condition:
+            return {'limit': int(self.limit), 'peak': self.peak, 'decreases': self.decreases,
+                    'throttled': self.throttled}
+
+
+class LazySession:
+    """
+    Stands in for a requests Session until the first request is sent, so runs answered from the
+    cache or snapshot never import the http stack.
+    """
+
+    def __init__(self, factory):
+        """
+        Constructor.
+
+        :param factory: callable without arguments that returns the requests Session.
+        """
+        self._factory = factory
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The requests Session, created on first use.
+        :return: a requests Session.
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._factory()
+        return self._session
+
+    def get(self, url: str, **kwargs):
+        """
+        Send a GET request with the session.
+
+        :param url: url to request, a string.
+        :return: a requests Response.
+        """
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        """
+        Close the session, if one was created.
+        """
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Transport:
+    """
+    Sends GET requests with a per request timeout, retrying connection errors, timeouts, 429 and 5xx
+    responses with exponential backoff and jitter, and honouring Retry-After headers. While a
+    ConcurrencyController is set, every attempt waits for a slot under its limit.
+    """
+    RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+    def __init__(self, pool_size: int = 10, timeout: float = 10, retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 30, rate_limit: float = None):
+        """
+        Constructor.
+
+        :param pool_size: max number of connections kept open per host, set to the request concurrency.
+        :param timeout: seconds to wait to connect and between bytes read.
+        :param retries: max number of retries of a request.
+        :param backoff: seconds waited before the first retry, doubled every retry.
+        :param max_backoff: max seconds waited between retries.
+        :param rate_limit: max requests per second, None for no limit.
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = None if not rate_limit else RateLimiter(rate_limit, max(1, int(rate_limit)))
+        self.controller = None
+
+    def create_session(self) -> LazySession:
+        """
+        Return a session whose connection pool fits pool_size concurrent requests, created when the
+        first request is sent.
+        :return: a LazySession.
+        """
+        return LazySession(self.new_session)
+
+    def new_session(self):
+        """
+        Return a session whose connection pool fits pool_size concurrent requests.
+        :return: a requests Session.
+        """
+        import requests
+        import requests.adapters
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def retry_delay(self, attempt: int, retry_after=None) -> float:
+        """
+        Return the seconds to wait before a retry.
+
+        :param attempt: number of the retry, starting at 0.
+        :param retry_after: value of the Retry-After header of the response, if any.
+        :return: a float.
+        """
+        if retry_after is not None and str(retry_after).isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def should_retry(self, attempt: int, status: int) -> bool:
+        """
+        Return whether a response with this status should be retried.
+
+        :param attempt: number of retries already made.
+        :param status: status code of the response.
+        :return: a bool.
+        """
+        return status in self.RETRY_STATUSES and attempt < self.retries
+
+    def send(self, session, url: str, headers: dict = None):
+        """
+        Send one GET request, within the limit of the ConcurrencyController if one is set.
+
+        :param session: LazySession or requests Session to send the request with.
+        :param url: url to request, a string.
+        :param headers: extra request headers, a dict.
+        :return: a requests Response.
+        """
+        if self.controller is None:
+            return session.get(url, headers=headers, timeout=self.timeout)
+        started = self.controller.acquire()
+        status = None
+        latency = None
+        try:
+            response = session.get(url, headers=headers, timeout=self.timeout)
+            status = response.status_code
+            # Time to the response headers, so the size of the body and the client's own work do not
+            # count as latency.
+            latency = response.elapsed.total_seconds()
+            return response
+        finally:
+            self.controller.release(started, status, latency)
+
+    def get(self, session, url: str, headers: dict = None):
+        """
+        Send a GET request, retrying it when it fails transiently.
+
+        :param session: LazySession or requests Session to send the request with.
+        :param url: url to request, a string.
+        :param headers: extra request headers, a dict.
+        :return: the final requests Response.
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire()
+            try:
+                response = self.send(session, url, headers)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self.retry_delay(attempt))
+            else:
+                if not self.should_retry(attempt, response.status_code):
+                    return response
+                response.close()
+                time.sleep(self.retry_delay(attempt, response.headers.get('Retry-After')))
+            attempt += 1
@@ -0,0 +1,123 @@
+"""
+Module containing class to parse and render fetched requests in worker processes.
+"""
+import collections
+import concurrent.futures
+
+from exceptions import MalformedObjectException
+from pokedexrequest import FailedRequest
+from report import Report
+
+
+def render_chunk(resolved_requests: list, output_format: str, separator: str):
+    """
+    Parse a chunk of fetched requests and render them. Runs in a worker process. Whether the chunk
+    needs a csv header row depends on the chunk written before it, so the report decides.
+
+    :param resolved_requests: list of ResolvedRequests.
+    :param output_format: key of the writer in Report.WRITERS.
+    :param separator: text written after each PokedexObject.
+    :return: a tuple of the Rendered of the requests that parsed, and a list of FailedRequests for
+    those whose json is malformed.
+    """
+    pokedexobjects = []
+    failures = []
+    for resolved in resolved_requests:
+        try:
+            pokedexobjects.append(resolved.parse())
+        except MalformedObjectException as error:
+            failures.append(FailedRequest(resolved.request, error))
+    return Report.render(pokedexobjects, output_format, separator, first=False), failures
+
+
+class RenderPool:
+    """
+    Parses and renders chunks of fetched requests on a pool of worker processes, so the cpu bound
+    stages of a large batch are not serialized by the GIL. Only json goes to the workers and only
+    rendered output comes back.
+    """
+
+    def __init__(self, num_workers: int, output_format: str, separator: str, chunk_size: int = 32,
+                 in_order: bool = True, keep_going: bool = False):
+        """
+        :param num_workers: number of worker processes.
+        :param output_format: key of the writer in Report.WRITERS.
+        :param separator: text written after each PokedexObject.
+        :param chunk_size: number of requests sent to a worker at once.
+        :param in_order: Yield chunks in input order if True, otherwise in completion order.
+        :param keep_going: Yield a FailedRequest for requests whose json is malformed instead of raising.
+        """
+        self.num_workers = num_workers
+        self.output_format = output_format
+        self.separator = separator
+        self.chunk_size = chunk_size
+        self.in_order = in_order
+        self.keep_going = keep_going
+
+    def chunks(self, resolved_requests):
+        """
+        Group the fetched requests into chunks, yielding FailedRequests as they come.
+
+        :param resolved_requests: iterable of ResolvedRequests and FailedRequests.
+        :return: a generator of lists of ResolvedRequests and of FailedRequests.
+        """
+        chunk = []
+        for resolved in resolved_requests:
+            if isinstance(resolved, FailedRequest):
+                yield resolved
+                continue
+            chunk.append(resolved)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def chunk_results(self, future):
+        """
+        Yield the FailedRequests of a rendered chunk, then its Rendered output.
+
+        :param future: the future of a render_chunk.
+        :return: a generator of FailedRequests and a Rendered.
+        :raises MalformedObjectException: if a request of the chunk failed and keep_going is False.
+        """
+        rendered, failures = future.result()
+        if failures and not self.keep_going:
+            raise failures[0].error
+        yield from failures
+        yield rendered
+
+    def render(self, resolved_requests):
+        """
+        Yield the Rendered output of each chunk of fetched requests, and each FailedRequest.
+
+        Only a window of chunks twice the size of the pool is in progress at once.
+        :param resolved_requests: iterable of ResolvedRequests and FailedRequests.
+        :return: a generator of Rendered and FailedRequests.
+        """
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            window = self.num_workers * 2
+            pending = collections.deque() if self.in_order else set()
+            for chunk in self.chunks(resolved_requests):
+                if isinstance(chunk, FailedRequest):
+                    yield chunk
+                    continue
+                future = executor.submit(render_chunk, chunk, self.output_format, self.separator)
+                if self.in_order:
+                    pending.append(future)
+                    if len(pending) >= window:
+                        yield from self.chunk_results(pending.popleft())
+                else:
+                    pending.add(future)
+                    while len(pending) >= window:
+                        done, pending = concurrent.futures.wait(
+                            pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for finished in done:
+                            yield from self.chunk_results(finished)
+
+            if self.in_order:
+                while pending:
+                    yield from self.chunk_results(pending.popleft())
+            else:
+                for finished in concurrent.futures.as_completed(pending):
+                    yield from self.chunk_results(finished)
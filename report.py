@@ -1,35 +1,518 @@
 """
 Module containing class to output the report.
 """
-
+import csv
+import io
+import json
+import sys
 from datetime import datetime
 
+from pokeretriever.metrics import Metrics
+from pokeretriever.pokeretriever import PokedexObject, Pokemon
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Renderer:
+    """
+    Renders PokedexObjects straight to an output stream, byte for byte in the same format as their
+    __str__ methods, without building the whole text of a pokemon first.
+
+    Stats, abilities and moves are shared between pokemon, so the indented text of each one is
+    rendered once and reused for every pokemon that has it.
+    """
+
+    def __init__(self, max_cached: int = 4096):
+        """
+        Constructor.
+
+        :param max_cached: max number of rendered sub resources kept.
+        """
+        self.max_cached = max_cached
+        self._fragments = {}
+
+    def fragment(self, pokedexobject, prefix: str = '\n\t\t') -> str:
+        """
+        Return the indented text of a stat, ability or move nested in a pokemon.
+
+        :param pokedexobject: a Stat, Ability or Move.
+        :param prefix: text written before the object.
+        :return: a String.
+        """
+        key = (id(pokedexobject), prefix)
+        cached = self._fragments.get(key)
+        if cached is None or cached[0] is not pokedexobject:
+            if len(self._fragments) >= self.max_cached:
+                self._fragments.clear()
+            cached = (pokedexobject, prefix + str(pokedexobject).replace('\n', '\n\t\t'))
+            self._fragments[key] = cached
+        return cached[1]
+
+    def write(self, stream, pokedexobject):
+        """
+        Write the text of a PokedexObject to the stream.
+
+        :param stream: a writable text stream.
+        :param pokedexobject: a PokedexObject.
+        """
+        if not isinstance(pokedexobject, Pokemon):
+            stream.write(str(pokedexobject))
+            return
+
+        write = stream.write
+        expanded = pokedexobject.expanded
+        write(f'Pokemon: {pokedexobject.name} '
+              f'\n\tID: {pokedexobject.id}'
+              f'\n\tHeight: {pokedexobject.height}'
+              f'\n\tWeight: {pokedexobject.weight}'
+              f'\n\tTypes: ')
+        for a_type in pokedexobject.types:
+            write(f'\n\t\t Name: {a_type}')
+
+        write('\n\tStats: ')
+        if expanded:
+            for stat in pokedexobject.stats:
+                write(self.fragment(stat))
+        else:
+            write('None')
+
+        write('\n\t--------- \n\tAbilities: ')
+        for ability in pokedexobject.abilities:
+            write(self.fragment(ability, '') if expanded else f'\n\t\t{ability}')
+
+        write('\n\tMoves: ')
+        if expanded:
+            for move in pokedexobject.move:
+                write(self.fragment(move))
+        else:
+            write(''.join(f'\n\t\t(Move name: {name}, Level acquired: {level})' for name, level in pokedexobject.move))
+
+        write(f'\n\tExpanded: {expanded}')
+
+    def render(self, pokedexobject) -> str:
+        """
+        Return the text of a PokedexObject.
+
+        :param pokedexobject: a PokedexObject.
+        :return: a String.
+        """
+        stream = io.StringIO()
+        self.write(stream, pokedexobject)
+        return stream.getvalue()
+
+
+class Rendered:
+    """
+    Output of a chunk of PokedexObjects already rendered by a writer, written to the report as is.
+    """
+    __slots__ = ('data', 'count', 'header', 'first_class', 'last_class')
+
+    def __init__(self, data, count: int, header: str = None, first_class: type = None, last_class: type = None):
+        """
+        Constructor.
+
+        :param data: the rendered text, or bytes for a binary format.
+        :param count: number of PokedexObjects rendered.
+        :param header: csv header row of the first object, left out of data, None if there is none.
+        :param first_class: class of the first object rendered, for a csv chunk.
+        :param last_class: class of the last object rendered, for a csv chunk.
+        """
+        self.data = data
+        self.count = count
+        self.header = header
+        self.first_class = first_class
+        self.last_class = last_class
+
+
+class TextWriter:
+    """
+    Writes PokedexObjects in the human readable report format.
+    """
+    binary = False
+    newline = None
+
+    def __init__(self, stream, separator: str = ''):
+        """
+        Constructor.
+
+        :param stream: a writable text stream.
+        :param separator: text written after each PokedexObject.
+        """
+        self.stream = stream
+        self.separator = separator
+        self.renderer = Renderer()
+
+    def write_header(self, header: str):
+        """
+        Write the line the report starts with.
+
+        :param header: the line, without its line break.
+        """
+        self.stream.write(header + '\n')
+
+    def write(self, pokedexobject):
+        """
+        Write a PokedexObject.
+
+        :param pokedexobject: a PokedexObject.
+        """
+        self.renderer.write(self.stream, pokedexobject)
+        self.stream.write(self.separator)
+
+
+class JsonLinesWriter:
+    """
+    Writes each PokedexObject as one json object per line.
+    """
+    binary = False
+    newline = None
+
+    def __init__(self, stream, separator: str = ''):
+        """
+        Constructor.
+
+        :param stream: a writable text stream.
+        :param separator: unused, every object is already on its own line.
+        """
+        self.stream = stream
+
+    def write_header(self, header: str):
+        """
+        Json lines have no header.
+
+        :param header: ignored.
+        """
+
+    def write(self, pokedexobject):
+        """
+        Write a PokedexObject.
+
+        :param pokedexobject: a PokedexObject.
+        """
+        json.dump(pokedexobject.to_dict(), self.stream, ensure_ascii=False, separators=(',', ':'))
+        self.stream.write('\n')
+
+
+class CsvWriter:
+    """
+    Writes PokedexObjects as csv rows.
+
+    Abilities, moves, stats, types, species and evolution chains get one row each, with list fields
+    joined by spaces and nested objects written as their id. Pokemon are flattened into one row per
+    stat, ability and move, repeating the pokemon's own fields. The value column holds the base stat
+    and level acquired of a non expanded pokemon, and the id of the stat, ability or move of an
+    expanded one. A header row starts the rows of each class of object in the report.
+    """
+    binary = False
+    newline = ''
+    POKEMON_COLUMNS = ('pokemon', 'pokemon_id', 'height', 'weight', 'types', 'expanded', 'table', 'name', 'value')
+
+    def __init__(self, stream, separator: str = ''):
+        """
+        Constructor.
+
+        :param stream: a writable text stream.
+        :param separator: unused, every row is already on its own line.
+        """
+        self.stream = stream
+        self.writer = csv.writer(stream, lineterminator='\n')
+        self.columns = None
+        self.object_class = None
+        self.write_columns = True
+
+    def write_header(self, header: str):
+        """
+        The csv header depends on the first object, so it is written by write.
+
+        :param header: ignored.
+        """
+
+    def write(self, pokedexobject):
+        """
+        Write the rows of a PokedexObject.
+
+        :param pokedexobject: a PokedexObject.
+        """
+        if type(pokedexobject) is not self.object_class:
+            self.start(type(pokedexobject))
+            if self.write_columns:
+                self.writer.writerow(self.columns)
+            self.write_columns = True
+
+        if isinstance(pokedexobject, Pokemon):
+            self.writer.writerows(self.pokemon_rows(pokedexobject))
+        else:
+            self.writer.writerow(self.cell(getattr(pokedexobject, field)) for field in self.columns)
+
+    def write_rendered(self, rendered: Rendered):
+        """
+        Write a chunk rendered by another writer, preceded by its header row unless the rows written
+        before it are of the same class.
+
+        :param rendered: a Rendered csv chunk.
+        """
+        if rendered.header is not None and rendered.first_class is not self.object_class:
+            self.stream.write(rendered.header)
+        if rendered.last_class is not None:
+            self.start(rendered.last_class)
+        self.stream.write(rendered.data)
+
+    def start(self, object_class: type):
+        """
+        Start the rows of a class of object.
+
+        :param object_class: a PokedexObject class.
+        """
+        self.object_class = object_class
+        self.columns = self.columns_of(object_class)
+
+    @classmethod
+    def columns_of(cls, object_class: type) -> tuple:
+        """
+        :param object_class: a PokedexObject class.
+        :return: the columns of the rows of the class.
+        """
+        return cls.POKEMON_COLUMNS if issubclass(object_class, Pokemon) else object_class.fields()
+
+    @classmethod
+    def header_row(cls, object_class: type) -> str:
+        """
+        :param object_class: a PokedexObject class.
+        :return: the text of the header row of the class.
+        """
+        stream = io.StringIO()
+        csv.writer(stream, lineterminator='\n').writerow(cls.columns_of(object_class))
+        return stream.getvalue()
+
+    @staticmethod
+    def cell(value):
+        """
+        Return the csv cell of a field: lists are joined by spaces and nested objects give their id.
+
+        :param value: value of a field of a PokedexObject.
+        :return: the value of the cell.
+        """
+        if isinstance(value, PokedexObject):
+            return value.id
+        if isinstance(value, (list, tuple)):
+            return ' '.join(map(str, value))
+        return value
+
+    @staticmethod
+    def pokemon_rows(pokemon: Pokemon):
+        """
+        Return the flattened rows of a pokemon.
+
+        :param pokemon: a Pokemon.
+        :return: a generator of rows.
+        """
+        prefix = (pokemon.name, pokemon.id, pokemon.height, pokemon.weight, ' '.join(pokemon.types),
+                  pokemon.expanded)
+        if pokemon.expanded:
+            for table, sub_resources in (('stat', pokemon.stats), ('ability', pokemon.abilities),
+                                         ('move', pokemon.move)):
+                for sub_resource in sub_resources:
+                    yield prefix + (table, sub_resource.name, sub_resource.id)
+        else:
+            for name, base_stat in pokemon.stats:
+                yield prefix + ('stat', name, base_stat)
+            for name in pokemon.abilities:
+                yield prefix + ('ability', name, '')
+            for name, level in pokemon.move:
+                yield prefix + ('move', name, level)
+
+
+class MsgpackWriter:
+    """
+    Writes each PokedexObject as one msgpack map, back to back in a binary stream.
+    Requires the optional msgpack package.
+    """
+    binary = True
+    newline = None
+
+    def __init__(self, stream, separator: str = ''):
+        """
+        Constructor.
+
+        :param stream: a writable binary stream.
+        :param separator: unused.
+        """
+        if msgpack is None:
+            raise ImportError("The 'msgpack' output format requires the msgpack package: pip install msgpack")
+        self.stream = stream
+        self.packer = msgpack.Packer()
+
+    def write_header(self, header: str):
+        """
+        Msgpack streams have no header.
+
+        :param header: ignored.
+        """
+
+    def write(self, pokedexobject):
+        """
+        Write a PokedexObject.
+
+        :param pokedexobject: a PokedexObject.
+        """
+        self.stream.write(self.packer.pack(pokedexobject.to_dict()))
+
 
 class Report:
     """
     Contains methods that to output results.
     """
+    WRITERS = {
+        'text': TextWriter,
+        'jsonl': JsonLinesWriter,
+        'csv': CsvWriter,
+        'msgpack': MsgpackWriter
+    }
+    FILE_SEPARATOR = ''
+    CONSOLE_SEPARATOR = '\n'
+
+    @staticmethod
+    def render(pokedexobject_list, output_format: str = 'text', separator: str = '', first: bool = True) -> Rendered:
+        """
+        Render PokedexObjects the way a report writes them, so the output can be written later or
+        in another process.
+
+        :param pokedexobject_list: list of PokedexObjects.
+        :param output_format: key of the writer in WRITERS.
+        :param separator: text written after each PokedexObject.
+        :param first: if the objects start the report. Otherwise the csv header row of the first object
+        is left out of the data and kept apart, for the report to write only if the rows before the
+        chunk are of another class.
+        :return: a Rendered.
+        """
+        writer_class = Report.WRITERS[output_format]
+        stream = io.BytesIO() if writer_class.binary else io.StringIO()
+        writer = writer_class(stream, separator)
+        if isinstance(writer, CsvWriter):
+            writer.write_columns = first
+        for pokedexobject in pokedexobject_list:
+            writer.write(pokedexobject)
+        rendered = Rendered(stream.getvalue(), len(pokedexobject_list))
+        if isinstance(writer, CsvWriter) and pokedexobject_list:
+            rendered.first_class = type(pokedexobject_list[0])
+            rendered.last_class = writer.object_class
+            if not first:
+                rendered.header = CsvWriter.header_row(rendered.first_class)
+        return rendered
+
+    @staticmethod
+    def write_all(writer, pokedexobject_list):
+        """
+        Write each PokedexObject, or the Rendered output of a chunk of them, as soon as the iterable
+        yields it.
+
+        :param writer: a writer from WRITERS.
+        :param pokedexobject_list: iterable of PokedexObjects and Rendered.
+        """
+        for pokedexobject in pokedexobject_list:
+            with Metrics.timer('render'):
+                if isinstance(pokedexobject, Rendered) and isinstance(writer, CsvWriter):
+                    writer.write_rendered(pokedexobject)
+                elif isinstance(pokedexobject, Rendered):
+                    writer.stream.write(pokedexobject.data)
+                else:
+                    writer.write(pokedexobject)
+
     @staticmethod
-    def file_output_report(pokedexobject_list: list, file_name: str):
+    def file_output_report(pokedexobject_list, file_name: str, output_format: str = 'text'):
         """
-        Output report to file.
+        Output report to file, writing each PokedexObject as soon as the iterable yields it.
 
         :param file_name: path of file
-        :param pokedexobject_list:list of PokedexObjects.
+        :param pokedexobject_list: iterable of PokedexObjects and Rendered.
+        :param output_format: key of the writer in WRITERS.
         """
+        writer_class = Report.WRITERS[output_format]
+        with open(file_name, 'wb' if writer_class.binary else 'w', newline=writer_class.newline) as file:
+            writer = writer_class(file, Report.FILE_SEPARATOR)
+            writer.write_header('Timestamp: ' + str(datetime.now()))
+            Report.write_all(writer, pokedexobject_list)
 
-        with open(file_name, 'w') as file:
-            file.write('Timestamp: ' + str(datetime.now()) + '\n')
-            for pokedexobject in pokedexobject_list:
-                file.write(str(pokedexobject))
+    @staticmethod
+    def query_report(query_results, file_name: str = None):
+        """
+        Output the answers of reverse index queries, to the file if one is given, otherwise to the
+        console.
+
+        :param query_results: iterable of tuples of kind, name and the list of (pokemon, level) found.
+        :param file_name: path of file, or None.
+        """
+        file = sys.stdout if file_name is None else open(file_name, 'w')
+        try:
+            file.write('Console Report\n' if file_name is None else f'Timestamp: {datetime.now()}\n')
+            for kind, name, found in query_results:
+                file.write(f'Query: {kind} {name}')
+                for pokemon, level in found:
+                    file.write(f'\n\tPokemon: {pokemon}' if level is None
+                               else f'\n\tPokemon: {pokemon}, Level acquired: {level}')
+                if not found:
+                    file.write('\n\tNone')
+                file.write('\n')
+        finally:
+            if file_name is not None:
+                file.close()
 
     @staticmethod
-    def console_report(pokedexobject_list: list):
+    def analytics_report(table, aggregates: dict, file_name: str = None, output_format: str = 'text'):
         """
-        Print the report.
+        Output the selected rows of a StatTable followed by its aggregates, to the file if one is
+        given, otherwise to the console.
 
-        :param pokedexobject_list: list of PokedexObjects.
+        :param table: a StatTable.
+        :param aggregates: dict of aggregate function to its list of values, one per column.
+        :param file_name: path of file, or None.
+        :param output_format: 'text', 'csv' or 'jsonl'.
         """
-        print('Console Report')
-        for pokedexobject in pokedexobject_list:
-            print(pokedexobject)
+        def cell(value):
+            return f'{value:.2f}' if isinstance(value, float) else str(value)
+
+        file = sys.stdout if file_name is None else open(file_name, 'w', newline='' if output_format == 'csv' else None)
+        try:
+            if output_format == 'jsonl':
+                for name, values in table.selected():
+                    file.write(json.dumps(dict(zip(('pokemon',) + tuple(table.columns), [name] + values))) + '\n')
+                for function, values in aggregates.items():
+                    file.write(json.dumps(dict(zip(('aggregate',) + tuple(table.columns), [function] + values)))
+                               + '\n')
+            elif output_format == 'csv':
+                writer = csv.writer(file, lineterminator='\n')
+                writer.writerow(['pokemon'] + table.columns)
+                writer.writerows([name] + values for name, values in table.selected())
+                writer.writerows([f'({function})'] + [cell(value) for value in values]
+                                 for function, values in aggregates.items())
+            else:
+                file.write('Console Report\n' if file_name is None else f'Timestamp: {datetime.now()}\n')
+                widths = [max(len(column), 7) for column in table.columns]
+                file.write(f'{"Pokemon":<24}' + ' '.join(f'{column:>{width}}'
+                                                          for column, width in zip(table.columns, widths)) + '\n')
+                for name, values in table.selected():
+                    file.write(f'{name:<24}' + ' '.join(f'{value:>{width}}' for value, width in zip(values, widths))
+                               + '\n')
+                for function, values in aggregates.items():
+                    file.write(f'{"(" + function + ")":<24}' + ' '.join(f'{cell(value):>{width}}'
+                                                                        for value, width in zip(values, widths))
+                               + '\n')
+        finally:
+            if file_name is not None:
+                file.close()
+
+    @staticmethod
+    def console_report(pokedexobject_list, output_format: str = 'text'):
+        """
+        Print the report, printing each PokedexObject as soon as the iterable yields it.
+
+        :param pokedexobject_list: iterable of PokedexObjects and Rendered.
+        :param output_format: key of the writer in WRITERS.
+        """
+        writer_class = Report.WRITERS[output_format]
+        writer = writer_class(sys.stdout.buffer if writer_class.binary else sys.stdout, Report.CONSOLE_SEPARATOR)
+        writer.write_header('Console Report')
+        Report.write_all(writer, pokedexobject_list)
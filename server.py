@@ -0,0 +1,273 @@
+"""
+Module containing the classes of the long running lookup server.
+"""
+import collections
+import json
+import os
+import socket
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from exceptions import InvalidObjectException, MalformedObjectException, RequestFailedException
+from pokedexrequest import PokedexRequest, Request
+from pokeretriever.pokeapiretriever import PokeApiRetriever
+from pokeretriever.resources import ResourceRegistry
+from pokeretriever.scheduler import FetchScheduler
+from report import Report
+
+
+class ObjectCache:
+    """
+    Least recently used cache of PokedexObjects, with their rendered output per format.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Constructor.
+
+        :param max_entries: max number of PokedexObjects kept.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, output_format: str):
+        """
+        Return the rendered output of a cached PokedexObject, rendering it in the format on first use.
+
+        :param key: tuple of mode, lower case identifier and expanded.
+        :param output_format: key of the writer in Report.WRITERS.
+        :return: the text or bytes, or None if the object is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            pokedexobject, rendered = entry
+            data = rendered.get(output_format)
+        if data is None:
+            data = Report.render([pokedexobject], output_format).data
+            with self._lock:
+                rendered[output_format] = data
+        return data
+
+    def put(self, key: tuple, pokedexobject, output_format: str):
+        """
+        Cache a PokedexObject, evicting the least recently used one if the cache is full, and return
+        its rendered output.
+
+        :param key: tuple of mode, lower case identifier and expanded.
+        :param pokedexobject: the PokedexObject.
+        :param output_format: key of the writer in Report.WRITERS.
+        :return: the text or bytes.
+        """
+        data = Report.render([pokedexobject], output_format).data
+        with self._lock:
+            self._entries[key] = (pokedexobject, {output_format: data})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+    def __len__(self):
+        """
+        :return: the number of cached PokedexObjects.
+        """
+        return len(self._entries)
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /{mode}/{identifier}?expanded=1&format=text on one keep-alive connection, and
+    GET /_stats with the counters of the server.
+    """
+    protocol_version = 'HTTP/1.1'
+    CONTENT_TYPES = {
+        'text': 'text/plain; charset=utf-8',
+        'jsonl': 'application/json; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+        'msgpack': 'application/msgpack'
+    }
+
+    def setup(self):
+        """
+        Disable Nagle's algorithm on tcp connections, so small responses are sent at once.
+        """
+        super().setup()
+        if self.connection.family != socket.AF_UNIX:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        """
+        Lookups are not logged.
+        """
+
+    def do_GET(self):
+        """
+        Answer a lookup.
+        """
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        if parts == ['_stats']:
+            self.respond(200, json.dumps(self.server.lookups.stats()).encode(), 'jsonl')
+            return
+
+        query = parse_qs(url.query)
+        output_format = query.get('format', ['text'])[0]
+        expanded = query.get('expanded', ['0'])[0].lower() in ('1', 'true', 'yes')
+        if len(parts) != 2 or parts[0] not in LookupService.MODES or output_format not in Report.WRITERS:
+            self.respond(400, f'Expected /{{{"|".join(LookupService.MODES)}}}/{{name or id}}'
+                              f'?expanded=1&format={{{"|".join(Report.WRITERS)}}}'.encode())
+            return
+
+        try:
+            data = self.server.lookups.lookup(parts[0], parts[1], expanded, output_format)
+        except MalformedObjectException as e:
+            self.respond(502, str(e).encode())
+        except InvalidObjectException as e:
+            self.respond(404, str(e).encode())
+        except RequestFailedException as e:
+            self.respond(502, str(e).encode())
+        except ImportError as e:
+            self.respond(501, str(e).encode())
+        else:
+            self.respond(200, data if isinstance(data, bytes) else data.encode(), output_format)
+
+    def respond(self, status: int, body: bytes, output_format: str = 'text'):
+        """
+        Send a response.
+
+        :param status: http status.
+        :param body: bytes of the body.
+        :param output_format: format of the body.
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', self.CONTENT_TYPES[output_format])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ThreadingTCPHTTPServer(ThreadingHTTPServer):
+    """
+    Http server listening on a tcp port, one thread per connection.
+    """
+    daemon_threads = True
+    # The default listen backlog of 5 overflows under many concurrent callers, stalling their
+    # connects for a SYN retry of about a second.
+    request_queue_size = 1024
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Http server listening on a unix socket, one thread per connection.
+    """
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def server_bind(self):
+        """
+        Bind the socket, replacing the file of a server that did not shut down cleanly.
+        """
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+class LookupService:
+    """
+    Answers lookups with one warm http session, FetchScheduler and ObjectCache kept for the life
+    of the server, going through PokedexRequest like a batch does.
+    """
+    MODES = ResourceRegistry.modes()
+
+    def __init__(self, max_in_flight: int = 32, max_entries: int = 4096):
+        """
+        Constructor.
+
+        :param max_in_flight: max number of http fetches running at once, across every lookup.
+        :param max_entries: max number of PokedexObjects kept in the ObjectCache.
+        """
+        self.session = PokeApiRetriever.transport.create_session()
+        self.scheduler = FetchScheduler(self.session, max_in_flight)
+        self.cache = ObjectCache(max_entries)
+        self.lookups = 0
+        PokedexRequest(self.scheduler)
+
+    def lookup(self, mode: str, identifier: str, expanded: bool = False, output_format: str = 'text'):
+        """
+        Return the rendered output of an entry, from the ObjectCache when it was looked up before.
+
+        :param mode: mode of the entry.
+        :param identifier: name / id of the entry.
+        :param expanded: expanded information, for a resource with an expanded form.
+        :param output_format: key of the writer in Report.WRITERS.
+        :return: the text or bytes.
+        """
+        self.lookups += 1
+        key = (mode, identifier.strip().lower(), expanded and ResourceRegistry.get(mode).expandable)
+        data = self.cache.get(key, output_format)
+        if data is None:
+            data = self.cache.put(key, PokedexRequest.execute_request(Request(mode, identifier.strip(), expanded)),
+                                  output_format)
+        return data
+
+    def stats(self) -> dict:
+        """
+        :return: the counters of the service.
+        """
+        return {'lookups': self.lookups, 'cached': len(self.cache), 'hits': self.cache.hits,
+                'misses': self.cache.misses, 'fetches_saved': self.scheduler.coalescer.saved}
+
+    def close(self):
+        """
+        Release the session and the FetchScheduler.
+        """
+        self.scheduler.shutdown()
+        self.session.close()
+
+
+class PokedexServer:
+    """
+    Serves lookups over http on a tcp port or a unix socket until interrupted.
+    """
+
+    def __init__(self, service: LookupService, listen: str = '127.0.0.1:8787', socket_path: str = None):
+        """
+        Constructor.
+
+        :param service: the LookupService answering lookups.
+        :param listen: host:port to listen on, when socket_path is None.
+        :param socket_path: path of a unix socket to listen on instead.
+        """
+        if socket_path is not None:
+            self.httpd = ThreadingUnixHTTPServer(socket_path, LookupHandler)
+            self.address = socket_path
+        else:
+            host, _, port = listen.rpartition(':')
+            self.httpd = ThreadingTCPHTTPServer((host or '127.0.0.1', int(port)), LookupHandler)
+            self.address = 'http://{}:{}'.format(*self.httpd.server_address[:2])
+        self.httpd.lookups = service
+        self.socket_path = socket_path
+
+    def serve_forever(self):
+        """
+        Serve until interrupted, then release the socket.
+        """
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+            if self.socket_path is not None and os.path.exists(self.socket_path):
+                os.remove(self.socket_path)